@@ -0,0 +1,265 @@
+import os
+import struct
+import tempfile
+import threading
+import time
+from collections import deque
+from typing import IO, Any, Deque, Dict, List, Optional, Set, Tuple
+
+import dill
+
+LENGTH: struct.Struct = struct.Struct(">I")
+
+
+class WindowBuffer:
+    """
+    The items of one window, oldest first. The newest items are held in
+    memory; `spill` moves them to a temporary file, from which the oldest
+    are read back as they are evicted or the window is emitted. Each item is
+    kept with its arrival time and its (pickled) size.
+    """
+
+    def __init__(self, folder: Optional[str] = None) -> None:
+        self.folder: Optional[str] = folder
+        self.memory: Deque[Tuple[float, int, Any]] = deque()
+        self.memory_bytes: int = 0
+        self.count: int = 0
+        self.bytes: int = 0
+        self.opened: Optional[float] = None
+        self.context: Any = None  # of the newest item's message
+        self.unemitted: Deque[int] = deque()  # sequence numbers of the newest items no emitted window included
+        self._file: Optional[IO[bytes]] = None
+        self._spilled: Deque[Tuple[float, int]] = deque()  # (time, size) of every spilled item, oldest first
+        self._head: int = 0  # file offset of the oldest spilled item
+
+    def append(self, now: float, size: int, item: Any) -> None:
+        self.opened = now if self.opened is None else self.opened
+        self.memory.append((now, size, item))
+        self.memory_bytes += size
+        self.count += 1
+        self.bytes += size
+
+    def oldest(self) -> Tuple[float, int]:
+        """
+        `(time, size)` of the oldest item.
+        """
+        if self._spilled:
+            return self._spilled[0]
+        return self.memory[0][0], self.memory[0][1]
+
+    def spill(self) -> int:
+        """
+        Move the in-memory items to disk; returns the number of bytes freed.
+        """
+        if not self.memory:
+            return 0
+        if self._file is None:
+            self._file = tempfile.TemporaryFile(dir=self.folder)  # pylint: disable=consider-using-with
+        self._file.seek(0, os.SEEK_END)
+        for now, size, item in self.memory:
+            pickled: bytes = dill.dumps(item)
+            self._file.write(LENGTH.pack(len(pickled)) + pickled)
+            self._spilled.append((now, size))
+        freed: int = self.memory_bytes
+        self.memory.clear()
+        self.memory_bytes = 0
+        return freed
+
+    def _read(self) -> Any:
+        assert self._file is not None
+        self._file.seek(self._head)
+        (length,) = LENGTH.unpack(self._file.read(LENGTH.size))
+        item: Any = dill.loads(self._file.read(length))
+        self._head += LENGTH.size + length
+        return item
+
+    def evict(self) -> None:
+        """
+        Drop the oldest item.
+        """
+        if self._spilled:
+            _, size = self._spilled.popleft()
+            self._read()
+            if not self._spilled and self._file is not None:
+                # Everything on disk was evicted; start the file over.
+                self._file.truncate(0)
+                self._head = 0
+        else:
+            _, size, _ = self.memory.popleft()
+            self.memory_bytes -= size
+        self.count -= 1
+        self.bytes -= size
+        self.opened = self.oldest()[0] if self.count else None
+
+    def items(self) -> List[Any]:
+        """
+        Every item, oldest first, without removing them.
+        """
+        head: int = self._head
+        spilled: List[Any] = [self._read() for _ in self._spilled]
+        self._head = head
+        return spilled + [item for _, _, item in self.memory]
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class Aggregator:
+    """
+    Groups the bound arguments of many messages into windows, one set of
+    windows per key, and hands a window to the procedure when it closes.
+
+    A tumbling window closes once it holds `count` messages or `size` bytes,
+    or `seconds` after its first message arrived; the next message opens a
+    new one. A sliding window keeps the latest `count` messages (`size`
+    bytes, `seconds`) and is handed on after every `slide` new messages.
+    Windows only close when a message arrives (or on `flush`); time-closed
+    windows of other keys are handed on along with it.
+
+    Every message may come with a context (for the executor, the message's
+    substitution context), and every closed window with the context of its
+    own newest message, so a window closed by another key's message is still
+    routed and substituted as its own. Items are numbered in arrival order
+    (`added` counts them), and `held` tells which of them no emitted window
+    has included yet, so callers can hold back acknowledging their messages.
+
+    The in-memory items of all windows together stay within `memory` bytes:
+    beyond that, the largest window spills its items to a temporary file in
+    `spill`.
+
+    A closed window is turned into keyword arguments: each name in
+    `columns` (all of them by default) becomes the list of that argument's
+    values, oldest first; the other arguments are taken from the newest message.
+    """
+
+    def __init__(self, count: Optional[int] = None, size: Optional[int] = None, seconds: Optional[float] = None,
+                 mode: str = "tumbling", slide: int = 1, columns: Optional[List[str]] = None,
+                 memory: int = 64 << 20, spill: Optional[str] = None) -> None:
+        if mode not in ("tumbling", "sliding"):
+            raise ValueError(f"Unknown window mode: {mode}")
+        if count is None and size is None and seconds is None:
+            raise ValueError("A window needs a count, size or seconds limit")
+        self.count: Optional[int] = count
+        self.size: Optional[int] = size
+        self.seconds: Optional[float] = seconds
+        self.mode: str = mode
+        self.slide: int = slide
+        self.columns: Optional[List[str]] = columns
+        self.memory: int = memory
+        self.spill: Optional[str] = spill
+        self.spilled: int = 0
+        self.added: int = 0
+        self.windows: Dict[str, WindowBuffer] = {}
+        self._arrived: Dict[str, int] = {}
+        self._memory_bytes: int = 0
+        self._lock: threading.Lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, section: Dict[str, Any]) -> "Aggregator":
+        """
+        Build an aggregator from a config's `aggregate` section, e.g.
+        `{"count": 100, "seconds": 5, "mode": "tumbling", "key": "{input.payload.user}",
+        "columns": ["string_list"], "memory": 1048576, "spill": "/tmp"}`.
+        """
+        return cls(
+            count=section.get("count"),
+            size=section.get("bytes"),
+            seconds=section.get("seconds"),
+            mode=section.get("mode", "tumbling"),
+            slide=section.get("slide", 1),
+            columns=section.get("columns"),
+            memory=section.get("memory", 64 << 20),
+            spill=section.get("spill"),
+        )
+
+    def add(self, key: str, arguments: Dict[str, Any], now: Optional[float] = None,
+            context: Any = None) -> List[Tuple[Dict[str, Any], Any]]:
+        """
+        Add one message's bound arguments (and context) to the window of `key`.
+
+        Returns:
+            List[Tuple[Dict[str, Any], Any]]: The keyword arguments and context of every window this closed.
+        """
+        now = time.monotonic() if now is None else now
+        size: int = len(dill.dumps(arguments))
+        with self._lock:
+            closed: List[Tuple[Dict[str, Any], Any]] = self._expire(now) if self.mode == "tumbling" else []
+            window: WindowBuffer = self.windows.setdefault(key, WindowBuffer(self.spill))
+            window.append(now, size, arguments)
+            window.context = context
+            window.unemitted.append(self.added)
+            self.added += 1
+            self._memory_bytes += size
+            if self.mode == "tumbling":
+                if self._full(window):
+                    closed.append(self._close(key))
+            else:
+                self._slide(window, now)
+                self._arrived[key] = self._arrived.get(key, 0) + 1
+                if self._arrived[key] >= self.slide:
+                    self._arrived[key] = 0
+                    window.unemitted.clear()
+                    closed.append((self._collate(window.items()), context))
+            while self._memory_bytes > self.memory:
+                largest: WindowBuffer = max(self.windows.values(), key=lambda buffer: buffer.memory_bytes)
+                freed: int = largest.spill()
+                if not freed:
+                    break
+                self._memory_bytes -= freed
+                self.spilled += freed
+        return closed
+
+    def flush(self) -> List[Tuple[Dict[str, Any], Any]]:
+        """
+        Close every open window; returns their keyword arguments and contexts.
+        """
+        with self._lock:
+            return [self._close(key) for key in list(self.windows)]
+
+    def held(self) -> Set[int]:
+        """
+        Sequence numbers of the items that are still waiting in an open
+        window, i.e. that no emitted window has included yet.
+        """
+        with self._lock:
+            return {sequence for window in self.windows.values() for sequence in window.unemitted}
+
+    def _full(self, window: WindowBuffer) -> bool:
+        return (self.count is not None and window.count >= self.count) \
+            or (self.size is not None and window.bytes >= self.size)
+
+    def _expire(self, now: float) -> List[Tuple[Dict[str, Any], Any]]:
+        if self.seconds is None:
+            return []
+        expired: List[str] = [
+            key for key, window in self.windows.items()
+            if window.opened is not None and now - window.opened >= self.seconds]
+        return [self._close(key) for key in expired]
+
+    def _slide(self, window: WindowBuffer, now: float) -> None:
+        while window.count > 1 and (
+                (self.count is not None and window.count > self.count)
+                or (self.size is not None and window.bytes > self.size)
+                or (self.seconds is not None and now - window.oldest()[0] > self.seconds)):
+            in_memory: int = window.memory_bytes
+            window.evict()
+            self._memory_bytes -= in_memory - window.memory_bytes
+            # An item that slid out before any window was emitted is not waiting any more.
+            if len(window.unemitted) > window.count:
+                window.unemitted.popleft()
+
+    def _close(self, key: str) -> Tuple[Dict[str, Any], Any]:
+        window: WindowBuffer = self.windows.pop(key)
+        self._arrived.pop(key, None)
+        self._memory_bytes -= window.memory_bytes
+        items: List[Any] = window.items()
+        window.close()
+        return self._collate(items), window.context
+
+    def _collate(self, items: List[Dict[str, Any]]) -> Dict[str, Any]:
+        arguments: Dict[str, Any] = dict(items[-1])
+        for name in self.columns if self.columns is not None else list(arguments):
+            arguments[name] = [item.get(name) for item in items]
+        return arguments
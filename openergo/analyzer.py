@@ -0,0 +1,142 @@
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
+
+from openergo import routing
+from openergo.utility import Utility
+
+
+def component_graph(configs: List[Dict[str, Any]], seeds: List[str]) -> Tuple[Dict[str, Set[str]], Set[str]]:
+    """
+    Follow the seed routing keys through the configs the way messages would
+    flow: a component consumes every key one of its input keys matches and
+    produces the keys its output keys derive from it.
+
+    Returns:
+        Tuple[Dict[str, Set[str]], Set[str]]: The downstream components of
+            every reachable component, and the components consuming a seed.
+    """
+    downstream: Dict[str, Set[str]] = {}
+    entries: Set[str] = set()
+    producers: Dict[str, Set[str]] = {}
+    consumers: Dict[str, Set[str]] = {}
+    queue: Deque[str] = deque(routing.normalize(seed) for seed in seeds)
+    seed_keys: Set[str] = set(queue)
+
+    while queue:
+        routingkey: str = queue.popleft()
+        if routingkey in consumers:
+            continue
+        consumers[routingkey] = set()
+        for config in configs:
+            input_key: Optional[str] = routing.match(Utility.deep_get(config, "input.keys", None) or [], routingkey)
+            if input_key is None:
+                continue
+            name: str = config["name"]
+            consumers[routingkey].add(name)
+            downstream.setdefault(name, set())
+            if routingkey in seed_keys:
+                entries.add(name)
+            for producer in producers.get(routingkey, set()):
+                downstream[producer].add(name)
+            for output_key in Utility.deep_get(config, "output.keys", None) or []:
+                derived_key: str = routing.normalize(routing.derive(input_key, output_key, routingkey))
+                producers.setdefault(derived_key, set()).add(name)
+                # The key may already have been expanded through another producer.
+                downstream[name] |= consumers.get(derived_key, set())
+                queue.append(derived_key)
+    return downstream, entries
+
+
+def strongly_connected(graph: Dict[str, Set[str]]) -> List[List[str]]:
+    """
+    Tarjan's algorithm, iteratively. Components come out in reverse
+    topological order: every component precedes the ones pointing into it.
+    """
+    index: Dict[str, int] = {}
+    lowlink: Dict[str, int] = {}
+    stack: List[str] = []
+    on_stack: Set[str] = set()
+    result: List[List[str]] = []
+
+    for root in sorted(graph):
+        if root in index:
+            continue
+        work: List[Tuple[str, List[str]]] = [(root, sorted(graph[root]))]
+        index[root] = lowlink[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        while work:
+            node, children = work[-1]
+            if children:
+                child: str = children.pop()
+                if child not in index:
+                    index[child] = lowlink[child] = len(index)
+                    stack.append(child)
+                    on_stack.add(child)
+                    work.append((child, sorted(graph.get(child, set()))))
+                elif child in on_stack:
+                    lowlink[node] = min(lowlink[node], index[child])
+                continue
+            work.pop()
+            if work:
+                lowlink[work[-1][0]] = min(lowlink[work[-1][0]], lowlink[node])
+            if lowlink[node] == index[node]:
+                members: List[str] = []
+                while True:
+                    member: str = stack.pop()
+                    on_stack.discard(member)
+                    members.append(member)
+                    if member == node:
+                        break
+                result.append(sorted(members))
+    return result
+
+
+def longest_path(graph: Dict[str, Set[str]], weights: Dict[str, float]) -> Tuple[float, List[str]]:
+    """
+    The heaviest chain of components. A cycle is collapsed into one step that
+    passes through each of its members once.
+    """
+    sccs: List[List[str]] = strongly_connected(graph)
+    scc_of: Dict[str, int] = {member: number for number, scc in enumerate(sccs) for member in scc}
+    best: Dict[int, Tuple[float, List[str]]] = {}
+    # Reverse topological order: the best continuation of every successor is known.
+    for number, scc in enumerate(sccs):
+        tail: Tuple[float, List[str]] = max(
+            (best[scc_of[child]] for member in scc for child in sorted(graph[member]) if scc_of[child] != number),
+            key=lambda item: item[0], default=(0.0, []))
+        best[number] = (sum(weights.get(member, 0.0) for member in scc) + tail[0], scc + tail[1])
+    return max(best.values(), key=lambda item: item[0], default=(0.0, []))
+
+
+def analyze(configs: List[Dict[str, Any]], seeds: List[str],
+            latencies: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+    """
+    Static analysis of the pipeline the seed routing keys would trigger.
+
+    Args:
+        configs: The component configs of a deployment.
+        seeds: The routing keys entering the pipeline.
+        latencies: Optional latency per component name; missing ones count as 0.
+
+    Returns:
+        Dict[str, Any]: Fan-out per component, the maximum chain depth, cycles,
+            unreachable and dead-end components, and with `latencies` the
+            estimated end-to-end latency along the critical path.
+    """
+    downstream, entries = component_graph(configs, seeds)
+    depth, _ = longest_path(downstream, {name: 1.0 for name in downstream})
+    report: Dict[str, Any] = {
+        "entries": sorted(entries),
+        "fan_out": {name: len(children) for name, children in sorted(downstream.items())},
+        "depth": int(depth),
+        "cycles": sorted(scc for scc in strongly_connected(downstream)
+                         if len(scc) > 1 or scc[0] in downstream[scc[0]]),
+        "unreachable": sorted({config["name"] for config in configs} - set(downstream)),
+        "dead_ends": sorted(name for name, children in downstream.items() if not children),
+    }
+    if latencies is not None:
+        latency, critical_path = longest_path(downstream, latencies)
+        report["latency"] = latency
+        report["critical_path"] = critical_path
+    return report
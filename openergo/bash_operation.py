@@ -1,79 +1,235 @@
-# import json
-# import logging
-# import subprocess
-# from typing import Any
-
-# from .operation import Operation
-
-
-# class BashOperation(Operation):
-#     def __init__(self, command_template, bindings):
-#         super().__init__()
-#         self.command_template = command_template
-#         self.bindings = bindings
-
-#     def resolve_nested_bindings(self, bindings, kwargs):
-#         resolved = {}
-#         for key, value in bindings.items():
-#             if isinstance(value, str) and value.startswith('{') and value.endswith('}'):
-#                 path = value[1:-1].split('.')
-#                 try:
-#                     data = kwargs
-#                     for p in path:
-#                         data = data[p]
-#                     resolved[key] = data
-#                 except KeyError:
-#                     logging.error(f"Binding for {key} using path {value} not found in provided arguments")
-#                     raise ValueError(f"Binding for {key} not provided correctly")
-#             else:
-#                 resolved[key] = value
-#         return resolved
-
-#     def execute(self) -> Any:
-#         try:
-#             final_bindings = self.resolve_nested_bindings(self.bindings, kwargs)
-#             if 'name' in final_bindings:
-#                 command = f"./{
-#                     self.command_template} '{
-#                     final_bindings['name']}'"
-#                 print(f"Executing command: {command}")  # Debugging print
-#                 result = subprocess.check_output(command, shell=True, text=True).strip()
-#                 return json.dumps({"result": result})
-#             else:
-#                 return json.dumps({"error": "Binding for 'name' not resolved"})
-#         except ValueError as ve:
-#             return json.dumps({"error": str(ve)})
-#         except subprocess.CalledProcessError as e:
-#             logging.error(f"Bash command failed: {e}")
-#             return json.dumps({"error": str(e)})
-
-
-# def execute(self, **kwargs) -> Any:
-#     try:
-#         # Resolve bindings considering nested dictionary structures
-#         final_bindings = self.resolve_nested_bindings(self.bindings, kwargs)
-#         # Format the command with resolved bindings
-#         command = f"bash {
-#             self.command_template} {
-#             final_bindings['name']}"  # Update to format command correctly
-#         result = subprocess.check_output(command, shell=True, text=True).strip()
-#         return json.dumps({"result": result})
-#     except ValueError as ve:
-#         return json.dumps({"error": str(ve)})
-#     except subprocess.CalledProcessError as e:
-#         logging.error(f"Bash command failed: {e}")
-#         return json.dumps({"error": str(e)})
-
-#     def execute(self, **kwargs) -> Any:
-#         try:
-#             # Resolve bindings considering nested dictionary structures
-#             final_bindings = self.resolve_nested_bindings(self.bindings, kwargs)
-#             # Format the command with resolved bindings
-#             command = self.command_template.format(**final_bindings)
-#             result = subprocess.check_output(command, shell=True, text=True).strip()
-#             return json.dumps({"result": result})
-#         except ValueError as ve:
-#             return json.dumps({"error": str(ve)})
-#         except subprocess.CalledProcessError as e:
-#             logging.error(f"Bash command failed: {e}")
-#             return json.dumps({"error": str(e)})
+import contextlib
+import json
+import os
+import queue
+import selectors
+import shlex
+import subprocess
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from openergo.executor import Executor
+from openergo.python_executor import PythonExecutor
+from openergo.registry import ProcedureRegistry
+from openergo.utility import Utility
+
+
+def _encode(request: Dict[str, Any]) -> bytes:
+    return json.dumps(request, default=str).encode("utf-8") + b"\n"
+
+
+def _decode(output: bytes) -> Any:
+    text: str = output.decode("utf-8").strip()
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
+
+
+class Coprocess:
+    """
+    One long-lived child process answering one JSON line on stdout for every
+    JSON line it reads on stdin.
+    """
+
+    def __init__(self, command: List[str], cwd: Optional[str] = None) -> None:
+        self.command: List[str] = command
+        self.process: subprocess.Popen[bytes] = subprocess.Popen(
+            command, cwd=cwd, stdin=subprocess.PIPE, stdout=subprocess.PIPE, bufsize=0)
+        self._buffer: bytes = b""
+
+    def alive(self) -> bool:
+        return self.process.poll() is None
+
+    def request(self, line: bytes, timeout: Optional[float]) -> bytes:
+        """
+        Send one request line and read one reply line.
+
+        Raises:
+            TimeoutError: If no complete reply arrived within `timeout` seconds.
+            RuntimeError: If the child exited instead of replying.
+        """
+        assert self.process.stdin is not None and self.process.stdout is not None
+        try:
+            self.process.stdin.write(line)
+        except BrokenPipeError as e:
+            raise RuntimeError(f"{self.command[0]} exited with {self.process.wait()}") from e
+        deadline: Optional[float] = None if timeout is None else time.monotonic() + timeout
+        descriptor: int = self.process.stdout.fileno()
+        with selectors.DefaultSelector() as selector:
+            selector.register(descriptor, selectors.EVENT_READ)
+            while b"\n" not in self._buffer:
+                remaining: Optional[float] = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and (remaining <= 0 or not selector.select(remaining)):
+                    raise TimeoutError(f"{self.command[0]} did not answer within {timeout}s")
+                chunk: bytes = os.read(descriptor, 65536)
+                if not chunk:
+                    raise RuntimeError(f"{self.command[0]} exited with {self.process.wait()}")
+                self._buffer += chunk
+        reply, self._buffer = self._buffer.split(b"\n", 1)
+        return reply
+
+    def close(self) -> None:
+        if self.alive():
+            self.process.kill()
+        self.process.wait()
+        for stream in (self.process.stdin, self.process.stdout):
+            if stream is not None:
+                stream.close()
+
+
+class CoprocessPool:
+    """
+    A fixed number of resident coprocesses running `command`. Each call takes
+    an idle child, so up to `size` calls run concurrently. A call that fails
+    in any way (the child crashed, missed its `timeout`, or the call was
+    interrupted) kills and replaces its child before the error is raised, so
+    the pool stays at full strength.
+    """
+
+    def __init__(self, command: List[str], size: int = 1, timeout: Optional[float] = None,
+                 cwd: Optional[str] = None) -> None:
+        self.command: List[str] = command
+        self.timeout: Optional[float] = timeout
+        self.cwd: Optional[str] = cwd
+        self.restarts: int = 0
+        self._idle: "queue.Queue[Coprocess]" = queue.Queue()
+        self._children: List[Coprocess] = []
+        self._lock: threading.Lock = threading.Lock()
+        self._closed: bool = False
+        for _ in range(size):
+            self._spawn()
+
+    def _spawn(self) -> None:
+        child: Coprocess = Coprocess(self.command, self.cwd)
+        with self._lock:
+            self._children.append(child)
+        self._idle.put(child)
+
+    def _replace(self, child: Coprocess) -> None:
+        child.close()
+        with self._lock:
+            if child in self._children:
+                self._children.remove(child)
+            self.restarts += 1
+            if self._closed:
+                return
+        self._spawn()
+
+    def call(self, request: Dict[str, Any]) -> Any:
+        """
+        Raises:
+            RuntimeError: If the pool has been closed.
+        """
+        if self._closed:
+            raise RuntimeError("CoprocessPool is closed")
+        line: bytes = _encode(request)
+        child: Coprocess = self._idle.get()
+        if not child.alive():
+            self._replace(child)
+            child = self._idle.get()
+        replaced: bool = False
+        try:
+            reply: bytes = child.request(line, self.timeout)
+        except BaseException:
+            # The child may be midway through the request; it cannot be reused.
+            replaced = True
+            self._replace(child)
+            raise
+        finally:
+            if not replaced:
+                self._idle.put(child)
+        return _decode(reply)
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            children, self._children = self._children, []
+        for child in children:
+            child.close()
+
+
+class BashExecutor(Executor):
+    """
+    Runs an external command as a component's procedure. The bound arguments
+    are sent as one JSON object line on stdin; the reply is parsed as JSON
+    when it is JSON and passed on as text otherwise.
+
+    By default (`shell.mode` "resident") the command is kept running in a
+    pool of `shell.pool` coprocesses that answer one line per request line.
+    Commands that cannot stay resident use `shell.mode` "oneshot" and are
+    started once per message. `shell.timeout` limits each call in seconds.
+    """
+
+    def __init__(self, config: Dict[str, Any], cwd: Optional[str] = None) -> None:
+        command: Any = Utility.deep_get(config, "shell.command", None)
+        if not command:
+            raise ValueError(f"{config.get('name', 'config')} has no shell.command to run")
+        self.command: List[str] = shlex.split(command) if isinstance(command, str) else list(command)
+        self.mode: str = Utility.deep_get(config, "shell.mode", "resident")
+        self.timeout: Optional[float] = Utility.deep_get(config, "shell.timeout", None)
+        self.cwd: Optional[str] = cwd
+        self.pool: Optional[CoprocessPool] = None
+        if self.mode == "resident":
+            self.pool = CoprocessPool(self.command, Utility.deep_get(config, "shell.pool", 1), self.timeout, cwd)
+            procedure = self.pool.call
+        elif self.mode == "oneshot":
+            procedure = self.oneshot
+        else:
+            raise ValueError(f"Unknown shell mode: {self.mode}")
+
+        def run(**kwargs: Any) -> Any:
+            return procedure(kwargs)
+
+        super().__init__(run, config)
+        # Every child handles one request at a time; the pool hands out idle
+        # children, so calls from several threads may overlap.
+        self.procedure_lock = contextlib.nullcontext()  # type: ignore[assignment]
+
+    def oneshot(self, request: Dict[str, Any]) -> Any:
+        try:
+            completed: subprocess.CompletedProcess[bytes] = subprocess.run(
+                self.command, cwd=self.cwd, input=_encode(request), stdout=subprocess.PIPE,
+                timeout=self.timeout, check=True)
+        except subprocess.TimeoutExpired as e:
+            raise TimeoutError(f"{self.command[0]} did not finish within {self.timeout}s") from e
+        except subprocess.CalledProcessError as e:
+            raise RuntimeError(f"{self.command[0]} exited with {e.returncode}") from e
+        return _decode(completed.stdout)
+
+    def close(self) -> None:
+        # Open windows still need the pool.
+        try:
+            super().close()
+        finally:
+            if self.pool is not None:
+                self.pool.close()
+
+
+def runnable(config: Dict[str, Any]) -> bool:
+    """
+    Whether a component config names something to execute: a Python
+    `shell.procedure`, or a `shell.command` for any other language.
+    """
+    return bool(Utility.deep_get(config, "shell.command", None)) or (
+        Utility.deep_get(config, "shell.language", "python") == "python"
+        and bool(Utility.deep_get(config, "shell.procedure", None)))
+
+
+def build_executor(config: Dict[str, Any], cwd: Optional[str] = None,
+                   registry: Optional[ProcedureRegistry] = None) -> Executor:
+    """
+    The executor a component config asks for: a `PythonExecutor` for a Python
+    `shell.procedure` (resolved through `registry`), a `BashExecutor` for a
+    `shell.command`.
+
+    Raises:
+        ValueError: If the config names neither.
+    """
+    if Utility.deep_get(config, "shell.language", "python") == "python" \
+            and Utility.deep_get(config, "shell.procedure", None):
+        return PythonExecutor(config["shell"]["procedure"], config, registry=registry)
+    if Utility.deep_get(config, "shell.command", None):
+        return BashExecutor(config, cwd)
+    raise ValueError(f"{config.get('name', 'config')} has neither a Python shell.procedure nor a shell.command")
@@ -0,0 +1,138 @@
+import json
+import mmap
+import os
+import sys
+from multiprocessing.util import Finalize
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from openergo.python_executor import PythonExecutor
+
+# The executor of the current worker process, built once by `_initialize`.
+_executor: Optional[PythonExecutor] = None
+
+
+def ranges(path: str, chunk_size: int, start: int = 0) -> List[Tuple[int, int]]:
+    """
+    Split an NDJSON file into byte ranges of roughly `chunk_size` bytes that
+    start and end on record boundaries, beginning at offset `start`.
+    """
+    size: int = os.path.getsize(path)
+    if size <= start:
+        return []
+    result: List[Tuple[int, int]] = []
+    with open(path, "rb") as stream, mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        while start < size:
+            newline: int = mapped.find(b"\n", min(start + chunk_size, size) - 1)
+            end: int = size if newline == -1 else newline + 1
+            result.append((start, end))
+            start = end
+    return result
+
+
+def _initialize(procedure_path: str, config: Dict[str, Any], quiet: bool) -> None:
+    global _executor  # pylint: disable=global-statement
+    if quiet:
+        sys.stdout = open(os.devnull, "w", encoding="utf-8")  # pylint: disable=consider-using-with
+    _executor = PythonExecutor(procedure_path, config)
+    # Worker processes skip atexit; a finalizer still runs when the pool shuts them down.
+    Finalize(_executor, _executor.close, exitpriority=10)
+
+
+def _process(path: str, start: int, end: int) -> Tuple[bytes, int]:
+    """
+    Run every record of one byte range through the worker's executor.
+    Records that failed under a `retry` policy get every remaining attempt
+    before the range is finished; their results follow the range's others.
+    Windows do not span ranges: those still open at the end of the range are
+    handed to the procedure, and their results written as they are, before
+    the range counts as done.
+
+    Returns:
+        Tuple[bytes, int]: The NDJSON output of the range and its record count.
+    """
+    assert _executor is not None, "worker was not initialized"
+    output: List[bytes] = []
+    with open(path, "rb") as stream, mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        records: List[Any] = [json.loads(line) for line in mapped[start:end].splitlines() if line.strip()]
+    # Vectorized procedures get the range's records collated into batches.
+    for results in _executor.execute_batch(records):
+        output.extend(json.dumps(result).encode("utf-8") for result in results)
+    output.extend(json.dumps(result).encode("utf-8") for result in _executor.drain_retries(wait=True))
+    output.extend(json.dumps(result).encode("utf-8") for result in _executor.flush_windows())
+    return b"".join(line + b"\n" for line in output), len(records)
+
+
+def load_checkpoint(path: str) -> Dict[str, int]:
+    """
+    The checkpoint at `path`; a missing, unreadable or incomplete one counts
+    as no checkpoint at all.
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as stream:
+            stored: Any = json.load(stream)
+        return {"offset": int(stored["offset"]), "output": int(stored["output"])}
+    except (OSError, ValueError, TypeError, KeyError):
+        return {"offset": 0, "output": 0}
+
+
+def save_checkpoint(path: str, offset: int, output: int) -> None:
+    temporary: str = f"{path}.tmp"
+    with open(temporary, "w", encoding="utf-8") as stream:
+        json.dump({"offset": offset, "output": output}, stream)
+    os.replace(temporary, path)
+
+
+def run_bulk(procedure_path: str, config: Dict[str, Any], input_path: str, output_path: str,
+             workers: int = 4, chunk_size: int = 4 << 20, checkpoint_path: Optional[str] = None,
+             resume: bool = False, quiet: bool = True, context: Any = None) -> int:
+    """
+    Push every record of an NDJSON file through one component on a pool of
+    worker processes and write the results, in input order, as NDJSON.
+
+    After each range the output is flushed and the checkpoint records both
+    the input offset reached and the output size at that point; resuming
+    truncates the output back to that size and continues from the offset,
+    so no record is lost or written twice. A checkpoint whose output file is
+    missing or shorter than recorded cannot be resumed; the run starts over.
+
+    Returns:
+        int: The number of input records processed in this run.
+    """
+    checkpoint_path = checkpoint_path or f"{output_path}.checkpoint"
+    checkpoint: Dict[str, int] = load_checkpoint(checkpoint_path) if resume else {"offset": 0, "output": 0}
+    if checkpoint["offset"]:
+        written: int = os.path.getsize(output_path) if os.path.exists(output_path) else -1
+        if written < checkpoint["output"]:
+            print(f"\033[33mDiscarding checkpoint {checkpoint_path}: {output_path} is missing or shorter "
+                  f"than the {checkpoint['output']} bytes it records\033[0m")
+            checkpoint = {"offset": 0, "output": 0}
+        else:
+            print(f"Resuming {input_path} from offset {checkpoint['offset']}")
+
+    mode: str = "r+b" if checkpoint["offset"] else "wb"
+    processed: int = 0
+    with open(output_path, mode, buffering=1 << 20) as output, \
+            ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_initialize,
+                                initargs=(procedure_path, config, quiet)) as pool:
+        output.truncate(checkpoint["output"])
+        output.seek(checkpoint["output"])
+        pending: Deque[Tuple[int, Future[Tuple[bytes, int]]]] = deque()
+
+        def complete() -> None:
+            nonlocal processed
+            end, future = pending.popleft()
+            data, count = future.result()
+            output.write(data)
+            output.flush()
+            processed += count
+            save_checkpoint(checkpoint_path, end, output.tell())
+
+        for start, end in ranges(input_path, chunk_size, checkpoint["offset"]):
+            pending.append((end, pool.submit(_process, input_path, start, end)))
+            if len(pending) >= 2 * workers:
+                complete()
+        while pending:
+            complete()
+    return processed
@@ -0,0 +1,157 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+import dill
+
+from openergo.utility import Utility
+
+
+class ResultCache:
+    """
+    A memoization cache for pure procedures, keyed by a hash of their bound
+    arguments. Entries are evicted least-recently-used first once `size`
+    entries or `max_bytes` pickled bytes are exceeded, and expire after `ttl`
+    seconds. With a `directory`, entries are also written through to disk and
+    memory misses fall back to it. Keys are scoped by `namespace`, so caches of
+    different procedures can share a directory without serving each other's
+    results.
+    """
+
+    def __init__(self, size: int = 1024, max_bytes: Optional[int] = None,
+                 ttl: Optional[float] = None, directory: Optional[str] = None,
+                 namespace: str = "") -> None:
+        self.size: int = size
+        self.max_bytes: Optional[int] = max_bytes
+        self.ttl: Optional[float] = ttl
+        self.directory: Optional[str] = directory
+        self.namespace: str = namespace
+        self.hits: int = 0
+        self.misses: int = 0
+        self.disk_hits: int = 0
+        self.evictions: int = 0
+        self.bytes: int = 0
+        self._entries: "OrderedDict[str, Tuple[Optional[float], bytes]]" = OrderedDict()
+        self._lock: threading.Lock = threading.Lock()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    @classmethod
+    def from_config(cls, section: Dict[str, Any], namespace: str = "") -> "ResultCache":
+        """
+        Build a cache from a config's `cache` section, e.g.
+        `{"size": 1024, "bytes": 67108864, "ttl": 300, "directory": ".cache"}`.
+        """
+        return cls(
+            size=section.get("size", 1024),
+            max_bytes=section.get("bytes"),
+            ttl=section.get("ttl"),
+            directory=section.get("directory"),
+            namespace=namespace,
+        )
+
+    @staticmethod
+    def key(*args: Any, **kwargs: Any) -> str:
+        """
+        Stable hash of a call's arguments: canonical JSON where possible, a
+        dill pickle for anything JSON cannot represent.
+        """
+        try:
+            canonical: Any = json.dumps([args, kwargs], sort_keys=True, separators=(",", ":"))
+        except (TypeError, ValueError):
+            canonical = dill.dumps([args, kwargs])
+        return Utility.fast_hash(canonical)
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """
+        Returns `(True, value)` on a hit and `(False, None)` on a miss.
+        """
+        key = self._scoped(key)
+        now: float = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires, pickled = entry
+                if expires is None or expires > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return True, dill.loads(pickled)
+                self._discard(key)
+            stored: Optional[bytes] = self._read(key)
+            if stored is None:
+                self.misses += 1
+                return False, None
+            self.hits += 1
+            self.disk_hits += 1
+            self._insert(key, stored, now)
+        return True, dill.loads(stored)
+
+    def put(self, key: str, value: Any) -> None:
+        key = self._scoped(key)
+        pickled: bytes = dill.dumps(value)
+        with self._lock:
+            self._insert(key, pickled, time.monotonic())
+            self._write(key, pickled)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def metrics(self) -> Dict[str, Any]:
+        lookups: int = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "disk_hits": self.disk_hits,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+    def _scoped(self, key: str) -> str:
+        return Utility.fast_hash(f"{self.namespace}:{key}") if self.namespace else key
+
+    def _insert(self, key: str, pickled: bytes, now: float) -> None:
+        if self.max_bytes is not None and len(pickled) > self.max_bytes:
+            return
+        self._discard(key)
+        self._entries[key] = (None if self.ttl is None else now + self.ttl, pickled)
+        self.bytes += len(pickled)
+        while len(self._entries) > self.size or (self.max_bytes is not None and self.bytes > self.max_bytes):
+            oldest: str = next(iter(self._entries))
+            self._discard(oldest)
+            self.evictions += 1
+
+    def _discard(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.bytes -= len(entry[1])
+
+    def _path(self, key: str) -> str:
+        return os.path.join(str(self.directory), f"{key}.pkl")
+
+    def _read(self, key: str) -> Optional[bytes]:
+        if not self.directory:
+            return None
+        path: str = self._path(key)
+        try:
+            if self.ttl is not None and time.time() - os.path.getmtime(path) > self.ttl:
+                os.remove(path)
+                return None
+            with open(path, "rb") as stream:
+                return stream.read()
+        except OSError:
+            return None
+
+    def _write(self, key: str, pickled: bytes) -> None:
+        if not self.directory:
+            return
+        temporary: str = f"{self._path(key)}.{threading.get_ident()}.tmp"
+        with open(temporary, "wb") as stream:
+            stream.write(pickled)
+        os.replace(temporary, self._path(key))
@@ -0,0 +1,143 @@
+import os
+import random
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Deque, Dict, Generator, Iterable, List, Optional, Tuple
+
+from openergo import wire
+from openergo.metrics import Metrics
+
+if TYPE_CHECKING:
+    from openergo.dispatcher import Dispatcher
+    from openergo.executor import Executor
+
+
+class Recorder:
+    """
+    Appends a sample of the messages an executor receives to a capture file:
+    one length-prefixed, lzma-compressed wire envelope per message holding
+    its arrival time. Every record is written with a single append, so the
+    executors of several processes may share one file.
+    """
+
+    def __init__(self, path: str, sample: float = 1.0) -> None:
+        self.path: str = path
+        self.sample: float = sample
+        self.recorded: int = 0
+        self._descriptor: Optional[int] = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+
+    @classmethod
+    def from_config(cls, section: Dict[str, Any]) -> "Recorder":
+        """
+        Build a recorder from a config's `capture` section, e.g.
+        `{"path": "traffic.capture", "sample": 0.1}`.
+        """
+        return cls(section["path"], section.get("sample", 1.0))
+
+    def record(self, message: Any, now: Optional[float] = None) -> None:
+        """
+        Record `message` as it arrived, unless it is not sampled.
+        """
+        if self._descriptor is None or (self.sample < 1 and random.random() >= self.sample):
+            return
+        routingkey: str = message.get("routingkey", "") if isinstance(message, dict) else ""
+        envelope: bytes = wire.pack(
+            {"routingkey": routingkey, "time": time.time() if now is None else now, "message": message},
+            compress=True)
+        os.write(self._descriptor, wire.LENGTH.pack(len(envelope)) + envelope)
+        self.recorded += 1
+
+    def close(self) -> None:
+        if self._descriptor is not None:
+            os.close(self._descriptor)
+            self._descriptor = None
+
+
+def read_capture(path: str) -> Generator[Tuple[float, Any], None, None]:
+    """
+    The `(time, message)` records of a capture file, in the order they were written.
+    """
+    with open(path, "rb") as stream:
+        for frame in wire.read_frames(stream):
+            record: Dict[str, Any] = wire.unpack(frame)
+            yield record["time"], record["message"]
+
+
+def schedule(records: Iterable[Tuple[float, Any]], speed: float = 1.0,
+             start: Optional[float] = None) -> Generator[Tuple[float, Any], None, None]:
+    """
+    Yield `(due, message)` as each message becomes due: the gaps between the
+    recorded times, divided by `speed`, are kept. A `speed` of 0 does not
+    wait at all. `due` is on the `time.monotonic` clock.
+    """
+    start = time.monotonic() if start is None else start
+    first: Optional[float] = None
+    for recorded, message in records:
+        first = recorded if first is None else first
+        if speed <= 0:
+            yield time.monotonic(), message
+            continue
+        due: float = start + (recorded - first) / speed
+        delay: float = due - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        yield due, message
+
+
+def replay(records: Iterable[Tuple[float, Any]], executor: "Executor", speed: float = 1.0,
+           concurrency: int = 1) -> Metrics:
+    """
+    Run recorded messages through one executor at `speed` times their
+    recorded rate. Latencies are measured from the time a message was due,
+    not from when it could be sent, so a slow procedure shows as latency
+    rather than as a quietly lower send rate. With a `concurrency` above 1,
+    messages are started on that many threads as they become due, whether or
+    not earlier ones have finished.
+    """
+    metrics: Metrics = Metrics()
+
+    def run(due: float, message: Any) -> None:
+        for _ in executor.execute(message):
+            pass
+        metrics.record(time.monotonic() - due)
+
+    metrics.start()
+    if concurrency <= 1:
+        for due, message in schedule(records, speed, metrics.started):
+            run(due, message)
+    else:
+        pending: Deque["Future[None]"] = deque()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            for due, message in schedule(records, speed, metrics.started):
+                pending.append(pool.submit(run, due, message))
+                while pending and pending[0].done():
+                    pending.popleft().result()
+            while pending:
+                pending.popleft().result()
+    metrics.stop()
+    return metrics
+
+
+def replay_deployment(records: Iterable[Tuple[float, Any]], dispatcher: "Dispatcher",
+                      speed: float = 1.0) -> Metrics:
+    """
+    Like `replay`, through a whole deployment: a message's latency lasts
+    until it and every follow-up message it caused have been handled.
+    """
+    metrics: Metrics = Metrics()
+    dues: List[float] = []
+
+    def messages() -> Generator[Any, None, None]:
+        for due, message in schedule(records, speed, metrics.started):
+            dues.append(due)
+            yield message
+
+    def complete(trace: int) -> None:
+        metrics.record(time.monotonic() - dues[trace])
+
+    metrics.start()
+    for _ in dispatcher.dispatch(messages(), on_complete=complete):
+        pass
+    metrics.stop()
+    return metrics
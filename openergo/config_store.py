@@ -0,0 +1,198 @@
+import glob
+import json
+import os
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Shape of a component config. Only `name` is required; every other section
+# is checked when present. `type` may be a type or a tuple of types.
+CONFIG_SCHEMA: Dict[str, Any] = {
+    "type": dict,
+    "required": ["name"],
+    "properties": {
+        "name": {"type": str},
+        "version": {"type": str},
+        "shell": {
+            "type": dict,
+            "properties": {
+                "language": {"type": str},
+                "procedure": {"type": str},
+                "command": {"type": (str, list), "items": {"type": str}},
+                "mode": {"type": str},
+                "pool": {"type": int},
+                "timeout": {"type": (int, float)},
+            },
+        },
+        "input": {
+            "type": dict,
+            "properties": {
+                "namespaces": {"type": list, "items": {"type": str}},
+                "keys": {"type": list, "items": {"type": str}},
+                "bindings": {"type": (dict, list)},
+            },
+        },
+        "output": {
+            "type": dict,
+            "properties": {
+                "namespaces": {"type": list, "items": {"type": str}},
+                "keys": {"type": list, "items": {"type": str}},
+            },
+        },
+    },
+}
+
+Validator = Callable[[Any, str], List[str]]
+
+
+def compile_schema(schema: Dict[str, Any]) -> Validator:
+    """
+    Turn a schema into a tree of closures once, so that validating a config
+    does not interpret the schema again.
+
+    Returns:
+        Validator: Called with a value and its path; returns error messages.
+    """
+    expected: Any = schema.get("type", object)
+    required: List[str] = schema.get("required", [])
+    properties: Dict[str, Validator] = {
+        key: compile_schema(subschema) for key, subschema in schema.get("properties", {}).items()}
+    items: Optional[Validator] = compile_schema(schema["items"]) if "items" in schema else None
+    type_name: str = " or ".join(t.__name__ for t in expected) if isinstance(expected, tuple) else expected.__name__
+
+    def validate(value: Any, path: str = "") -> List[str]:
+        if not isinstance(value, expected):
+            return [f"{path or '<config>'}: expected {type_name}, got {type(value).__name__}"]
+        errors: List[str] = [f"{path}.{key}".lstrip(".") + ": is required" for key in required if key not in value]
+        for key, validator in properties.items():
+            if key in value:
+                errors.extend(validator(value[key], f"{path}.{key}".lstrip(".")))
+        if items is not None:
+            for index, item in enumerate(value):
+                errors.extend(items(item, f"{path}.{index}"))
+        return errors
+
+    return validate
+
+
+validate_config: Validator = compile_schema(CONFIG_SCHEMA)
+
+
+def looks_like_config(value: Any) -> bool:
+    """
+    Whether a JSON value is meant as a component config: an object with at
+    least one of the config sections. Other JSON files in a deploy folder
+    (fixtures, tool settings, ...) are not configs and are skipped silently.
+    """
+    return isinstance(value, dict) and any(key in value for key in CONFIG_SCHEMA["properties"])
+
+
+class ConfigStore:
+    """
+    Parsed and validated configs of one or more deploy folders, cached per
+    file by (mtime, size). `refresh` only re-reads files that changed, so it
+    is cheap enough to call before every use or from a watcher thread.
+    """
+
+    def __init__(self, folders: List[str], validator: Validator = validate_config) -> None:
+        self.folders: List[str] = list(folders)
+        self.validator: Validator = validator
+        self.errors: Dict[str, List[str]] = {}
+        self._files: Dict[str, Tuple[Tuple[int, int], List[Dict[str, Any]]]] = {}
+        self._configs: Optional[List[Dict[str, Any]]] = None
+        self._lock: threading.RLock = threading.RLock()
+        self._stop: threading.Event = threading.Event()
+
+    def paths(self) -> List[str]:
+        return sorted({
+            path
+            for folder in self.folders
+            for path in glob.glob(os.path.join(folder, "**/*.json"), recursive=True)
+        })
+
+    def refresh(self) -> List[str]:
+        """
+        Re-read added or modified config files and forget removed ones.
+
+        Returns:
+            List[str]: The paths that changed.
+        """
+        with self._lock:
+            changed: List[str] = []
+            seen: set[str] = set()
+            for path in self.paths():
+                seen.add(path)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                signature: Tuple[int, int] = (stat.st_mtime_ns, stat.st_size)
+                cached = self._files.get(path)
+                if cached is not None and cached[0] == signature:
+                    continue
+                self._files[path] = (signature, self._load(path))
+                changed.append(path)
+            for path in set(self._files) - seen:
+                del self._files[path]
+                self.errors.pop(path, None)
+                changed.append(path)
+            if changed:
+                self._configs = None
+            return sorted(changed)
+
+    def configs(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            if self._configs is None:
+                if not self._files:
+                    self.refresh()
+                self._configs = [config for path in sorted(self._files) for config in self._files[path][1]]
+            return list(self._configs)
+
+    def configs_in(self, path: str) -> List[Dict[str, Any]]:
+        with self._lock:
+            cached = self._files.get(path)
+            return list(cached[1]) if cached else []
+
+    def watch(self, interval: float = 1.0,
+              callback: Optional[Callable[[List[str]], None]] = None) -> threading.Thread:
+        """
+        Poll the folders every `interval` seconds on a daemon thread and call
+        `callback` with the changed paths. Stop it with `stop()`.
+        """
+        self._stop.clear()
+
+        def poll() -> None:
+            while not self._stop.wait(interval):
+                changed: List[str] = self.refresh()
+                if changed and callback is not None:
+                    callback(changed)
+
+        watcher: threading.Thread = threading.Thread(target=poll, daemon=True)
+        watcher.start()
+        return watcher
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _load(self, path: str) -> List[Dict[str, Any]]:
+        self.errors.pop(path, None)
+        try:
+            with open(path, "r", encoding="utf8") as stream:
+                config_json: Any = json.load(stream)
+        except (OSError, ValueError) as e:
+            self.errors[path] = [str(e)]
+            return []
+
+        candidates: List[Any] = config_json if isinstance(config_json, list) else [config_json]
+        configs: List[Dict[str, Any]] = []
+        for index, candidate in enumerate(candidates):
+            if not looks_like_config(candidate):
+                continue
+            errors: List[str] = self.validator(candidate, "")
+            if errors:
+                self.errors.setdefault(path, []).extend(
+                    f"[{index}] {error}" if isinstance(config_json, list) else error for error in errors)
+                continue
+            configs.append(candidate)
+        for error in self.errors.get(path, []):
+            print(f"\033[33mSkipping invalid config in {path}: {error}\033[0m")
+        return configs
@@ -0,0 +1,525 @@
+import bisect
+import copy
+import itertools
+import multiprocessing
+import os
+import queue
+import sys
+import threading
+import time
+from collections import deque
+from multiprocessing.connection import Connection
+from typing import Any, Callable, Deque, Dict, Generator, Iterable, Iterator, List, Optional, Set, Tuple
+
+from openergo import routing, wire
+from openergo.bash_operation import build_executor, runnable
+from openergo.config_store import ConfigStore
+from openergo.durable import DurableQueue
+from openergo.executor import ENCRYPTIONKEY, Executor
+from openergo.reload import HotReloader
+from openergo.retry import RetryScheduler
+from openergo.utility import Utility
+
+
+class HashRing:
+    """
+    Consistent hashing of routing keys onto workers. Every worker owns
+    `replicas` points on the ring, so adding or removing one only moves the
+    keys of its neighbours.
+    """
+
+    def __init__(self, nodes: List[int], replicas: int = 64) -> None:
+        self._ring: List[Tuple[int, int]] = sorted(
+            (self._hash(f"{node}:{replica}"), node) for node in nodes for replica in range(replicas))
+        self._points: List[int] = [point for point, _ in self._ring]
+
+    @staticmethod
+    def _hash(key: str) -> int:
+        return int(Utility.fast_hash(key)[:16], 16)
+
+    def node(self, key: str) -> int:
+        position: int = bisect.bisect(self._points, self._hash(key)) % len(self._ring)
+        return self._ring[position][1]
+
+
+class Router:
+    """
+    Which components consume a routing key, by the deploy configs' input keys.
+    Lookups are cached per normalized routing key.
+    """
+
+    def __init__(self, configs: List[Dict[str, Any]]) -> None:
+        self.configs: List[Dict[str, Any]] = [config for config in configs if runnable(config)]
+        self._consumers: Dict[str, List[str]] = {}
+
+    def consumers(self, routingkey: str) -> List[str]:
+        key: str = routing.normalize(routingkey)
+        if key not in self._consumers:
+            self._consumers[key] = [
+                config["name"] for config in self.configs
+                if routing.match(Utility.deep_get(config, "input.keys", None) or [], key) is not None]
+        return self._consumers[key]
+
+    @staticmethod
+    def seal(result: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Turn an output envelope into the next hop's input message. Payloads
+        that are not objects are carried as `{"value": ...}`, and the
+        `encrypted` section is (re-)encrypted, as every executor expects.
+        """
+        payload: Any = result.get("payload")
+        payload = dict(payload) if isinstance(payload, dict) else {"value": payload}
+        message: Dict[str, Any] = {"routingkey": result["routingkey"], "payload": payload}
+        if not isinstance(payload.setdefault("encrypted", {}), str):
+            message = Utility.encrypt(message, "payload.encrypted", ENCRYPTIONKEY)
+        return message
+
+
+def _run(name: str, executor: Executor, reply: Dict[str, Any], *args: Any) -> bool:
+    """
+    Execute one message, or a retry of it, for `reply`: results and errors
+    (including a dead letter) are added to it.
+
+    Returns:
+        bool: Whether the message failed and waits for another attempt.
+    """
+    scheduler: Optional[RetryScheduler] = executor.retry
+    pending, dead = (scheduler.pending(), scheduler.deadlettered) if scheduler is not None else (0, 0)
+    try:
+        reply["results"].extend(executor.execute(*args))
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        reply["errors"].append(f"{name}: {e}")
+    if scheduler is None:
+        return False
+    if scheduler.deadlettered > dead:
+        reply["errors"].append(f"{name}: dead-lettered after {scheduler.policy.attempts} attempts")
+    return scheduler.pending() > pending
+
+
+def _serve(configs: List[Dict[str, Any]], connection: Connection, quiet: bool, max_hops: int,
+           reload_folders: Optional[List[str]] = None, reload_interval: float = 1.0) -> None:
+    """
+    Worker process: build a warm executor per component once, then run every
+    message it is sent through the components consuming its routing key and
+    reply with one frame holding all their results. Results that another
+    component consumes (within `max_hops`) are sealed here, as `forward`,
+    so the dispatching process does not spend its time encrypting them.
+
+    A message that failed under a `retry` policy holds its reply back until
+    every attempt is done, so its journal offset is not acknowledged while a
+    retry is pending. Due retries run between messages; when the worker is
+    stopped, it waits for the remaining ones before exiting.
+
+    Likewise, the offset of a message left in an open window is only
+    acknowledged, in the `acks` of a later reply, once a window including it
+    has been emitted. A `flush` frame hands every open window to its
+    procedure and replies with their results as they are.
+
+    With `reload_folders`, the components come from a `HotReloader` on those
+    deploy folders, checked before a message at most every `reload_interval`
+    seconds while no retry is pending. Windows of the replaced components are
+    handed on with that message's reply, and new build errors reported in it.
+    """
+    if quiet:
+        sys.stdout = open(os.devnull, "w", encoding="utf-8")  # pylint: disable=consider-using-with
+    reloader: Optional[HotReloader] = HotReloader(reload_folders) if reload_folders else None
+    executors: Dict[str, Executor] = {}
+    failures: Dict[str, str] = {}
+    if reloader is not None:
+        executors = {name: reloader.executor(name) for name in reloader.names()}
+        failures = {name: f"{name}: {e}" for name, e in reloader.errors.items()}
+        router: Router = Router([reloader.config(name) for name in reloader.names()])
+    else:
+        for config in Router(configs).configs:
+            try:
+                executors[config["name"]] = build_executor(config)
+            except (ImportError, AttributeError, ValueError, OSError) as e:
+                failures[config["name"]] = f"{config['name']}: {e}"
+        router = Router([config for config in configs if config["name"] in executors])
+    connection.send_bytes(wire.pack({"failures": failures}))
+    reported: Dict[str, Exception] = dict(reloader.errors) if reloader is not None else {}
+    next_check: float = time.monotonic() + reload_interval
+
+    def retry_tick() -> float:
+        return min((executor.retry.wheel.tick for executor in executors.values() if executor.retry is not None),
+                   default=0.01)
+
+    tick: float = retry_tick()
+    # Replies waiting for retries, by component and message digest, and how many retries each still waits for.
+    held: Dict[Tuple[str, str], Deque[Dict[str, Any]]] = {}
+    waiting: Dict[int, int] = {}
+    # Journal offsets of messages waiting in open windows, per component with their window item,
+    # and how many components still hold each offset back.
+    buffered: Dict[str, List[Tuple[int, int]]] = {}
+    holders: Dict[int, int] = {}
+
+    def release(name: str, reply: Dict[str, Any], waiting_items: Set[int]) -> None:
+        kept: List[Tuple[int, int]] = []
+        for sequence, offset in buffered.get(name, []):
+            if sequence in waiting_items:
+                kept.append((sequence, offset))
+                continue
+            holders[offset] -= 1
+            if not holders[offset]:
+                del holders[offset]
+                reply["acks"].append(offset)
+        buffered[name] = kept
+
+    def run(name: str, reply: Dict[str, Any], *args: Any) -> bool:
+        executor: Executor = executors[name]
+        if executor.aggregator is None:
+            return _run(name, executor, reply, *args)
+        sequence: int = executor.aggregator.added
+        retrying: bool = _run(name, executor, reply, *args)
+        waiting_items: Set[int] = executor.aggregator.held()
+        release(name, reply, waiting_items)
+        if reply["offset"] is not None and sequence in waiting_items:
+            buffered[name].append((sequence, reply["offset"]))
+            holders[reply["offset"]] = holders.get(reply["offset"], 0) + 1
+        return retrying
+
+    def flush(reply: Dict[str, Any], flushed: Dict[str, Executor]) -> None:
+        for name, executor in flushed.items():
+            try:
+                reply["results"].extend(executor.flush_windows())
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                reply["errors"].append(f"{name}: {e}")
+            release(name, reply, set())
+
+    def reload(reply: Dict[str, Any]) -> None:
+        nonlocal router, tick
+        assert reloader is not None
+        changed: List[str] = reloader.check()
+        reply["errors"].extend(
+            f"{name}: {e}" for name, e in reloader.errors.items() if reported.get(name) is not e)
+        reported.clear()
+        reported.update(reloader.errors)
+        if not changed:
+            return
+        # The replaced executors' windows are handed on before they are closed.
+        flush(reply, {name: executors[name] for name in changed if name in executors})
+        reloader.drain(timeout=0)
+        executors.clear()
+        executors.update({name: reloader.executor(name) for name in reloader.names()})
+        router = Router([reloader.config(name) for name in reloader.names()])
+        tick = retry_tick()
+
+    def send(reply: Dict[str, Any]) -> None:
+        leaving: List[Any] = []
+        forward: List[Dict[str, Any]] = []
+        for result in reply["results"]:
+            if isinstance(result, dict) and "routingkey" in result \
+                    and router.consumers(result["routingkey"]) and reply["hops"] < max_hops:
+                forward.append(Router.seal(result))
+            else:
+                leaving.append(result)
+        connection.send_bytes(wire.pack({**reply, "results": leaving, "forward": forward}))
+
+    def retry_due() -> None:
+        for name, executor in executors.items():
+            for envelope, attempt in executor.retry.due() if executor.retry is not None else []:
+                key: Tuple[str, str] = (name, Utility.fast_hash(wire.pack(envelope)))
+                reply: Dict[str, Any] = held[key].popleft()
+                if run(name, reply, envelope, attempt):
+                    held[key].append(reply)
+                    continue
+                if not held[key]:
+                    del held[key]
+                waiting[id(reply)] -= 1
+                if not waiting[id(reply)]:
+                    del waiting[id(reply)]
+                    send(reply)
+
+    try:
+        while True:
+            if held and not connection.poll(tick):
+                retry_due()
+                continue
+            data: bytes = connection.recv_bytes()
+            if not data:
+                break
+            frame: Dict[str, Any] = wire.unpack(data)
+            if frame.get("flush"):
+                flushing: Dict[str, Any] = {
+                    "routingkey": None, "results": [], "errors": [], "hops": 0, "offset": None, "trace": None,
+                    "acks": [], "flush": True}
+                flush(flushing, executors)
+                send(flushing)
+                continue
+            reply: Dict[str, Any] = {
+                "routingkey": frame["routingkey"], "results": [], "errors": [],
+                "hops": frame["hops"], "offset": frame["offset"], "trace": frame.get("trace"), "acks": []}
+            if reloader is not None and not held and time.monotonic() >= next_check:
+                next_check = time.monotonic() + reload_interval
+                reload(reply)
+            for name in router.consumers(frame["routingkey"]):
+                if run(name, reply, copy.deepcopy(frame["message"])):
+                    held.setdefault((name, Utility.fast_hash(wire.pack(frame["message"]))), deque()).append(reply)
+                    waiting[id(reply)] = waiting.get(id(reply), 0) + 1
+            if reply["offset"] in holders:
+                reply["offset"] = None
+            if id(reply) not in waiting:
+                send(reply)
+            retry_due()
+        while held:
+            time.sleep(tick)
+            retry_due()
+    finally:
+        if reloader is not None:
+            reloader.stop()
+        else:
+            for executor in executors.values():
+                executor.close()
+
+
+class Dispatcher:
+    """
+    Runs a whole deployment on `workers` processes. Messages are assigned to
+    a worker by consistent hashing of their routing key, so every key is
+    always handled by the same warm executors. Results that carry a routing
+    key someone consumes are dispatched again (up to `max_hops` times); all
+    other results are yielded by `dispatch`.
+
+    Every worker has up to `window` messages in flight; messages for a busy
+    worker wait in its own backlog, so they never hold up the others.
+    Messages travel over pipes as wire envelopes; a reader thread per worker
+    drains replies, so a full pipe never blocks the other direction, and a
+    feeder thread reads the input, so a slow source never holds up replies.
+
+    With a `journal`, every routed message is appended to it (and synced, in
+    groups) before it is sent to a worker, and acknowledged once the worker
+    has finished it and its follow-up messages are durable; a message left in
+    an open window, once that window has been emitted. `dispatch` first
+    redelivers whatever a previous run left unacknowledged.
+
+    When the input ends, `dispatch` has every worker hand its open windows to
+    their procedures and yields their results as they are.
+
+    With `reload_folders` (the deploy folders `configs` came from), changed
+    configs and procedure modules are picked up while running: every
+    `reload_interval` seconds the dispatcher re-reads the configs it routes
+    by, and the workers hot-reload the components they run.
+    """
+
+    def __init__(self, configs: List[Dict[str, Any]], workers: Optional[int] = None,
+                 context: Any = None, quiet: bool = True, window: int = 64, max_hops: int = 32,
+                 journal: Optional[DurableQueue] = None, consumer: str = "dispatcher",
+                 reload_folders: Optional[List[str]] = None, reload_interval: float = 1.0) -> None:
+        self.journal: Optional[DurableQueue] = journal
+        self.consumer: str = consumer
+        self.router: Router = Router(configs)
+        self.workers: int = workers or os.cpu_count() or 1
+        self.context: Any = context or multiprocessing.get_context()
+        self.quiet: bool = quiet
+        self.window: int = window
+        self.max_hops: int = max_hops
+        self.ring: HashRing = HashRing(list(range(self.workers)))
+        self.errors: List[str] = []
+        self.reload_folders: Optional[List[str]] = reload_folders
+        self.reload_interval: float = reload_interval
+        self._store: Optional[ConfigStore] = ConfigStore(reload_folders) if reload_folders else None
+        if self._store is not None:
+            self._store.refresh()
+        self._next_check: float = time.monotonic() + reload_interval
+        self._connections: List[Connection] = []
+        self._processes: List[Any] = []
+        # Worker replies arrive as (worker, frame); the messages to dispatch
+        # as (-generation, message) from the feeder thread of that dispatch call.
+        self._replies: "queue.Queue[Tuple[int, Any]]" = queue.Queue()
+        self._generation: int = 0
+
+    def __enter__(self) -> "Dispatcher":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+    def start(self) -> None:
+        self._replies = queue.Queue()
+        for _ in range(self.workers):
+            parent, child = self.context.Pipe()
+            process = self.context.Process(
+                target=_serve, daemon=True, args=(
+                    self.router.configs, child, self.quiet, self.max_hops, self.reload_folders, self.reload_interval))
+            process.start()
+            child.close()
+            self._connections.append(parent)
+            self._processes.append(process)
+        failures: Dict[str, str] = {}
+        for number, connection in enumerate(self._connections):
+            # The worker's executors are warm; components that failed to build are not routed to.
+            failures.update(wire.unpack(connection.recv_bytes())["failures"])
+            threading.Thread(target=self._drain, args=(number, connection), daemon=True).start()
+        self.errors.extend(failures.values())
+        self.router = Router([config for config in self.router.configs if config["name"] not in failures])
+
+    def stop(self) -> None:
+        for connection in self._connections:
+            try:
+                connection.send_bytes(b"")
+            except OSError:
+                pass
+        for process in self._processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        for connection in self._connections:
+            connection.close()
+        self._connections, self._processes = [], []
+
+    def _drain(self, number: int, connection: Connection) -> None:
+        try:
+            while True:
+                self._replies.put((number, connection.recv_bytes()))
+        except (EOFError, OSError):
+            self._replies.put((number, None))
+
+    def _feed(self, messages: Iterable[Dict[str, Any]], generation: int,
+              wanted: threading.Semaphore, stopped: threading.Event) -> None:
+        """
+        Read one message from `messages` each time `wanted` is released and
+        hand it to `dispatch`, so waiting for input never holds up replies.
+        """
+        source = iter(messages)
+        while True:
+            wanted.acquire()
+            if stopped.is_set():
+                return
+            try:
+                message: Any = next(source)
+            except StopIteration:
+                message = None
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                message = e
+            self._replies.put((-generation, message))
+            if message is None or isinstance(message, Exception):
+                return
+
+    def dispatch(self, messages: Iterable[Dict[str, Any]],
+                 on_complete: Optional[Callable[[int], None]] = None) -> Generator[Any, None, None]:
+        """
+        Push messages through the deployment and yield the results that leave
+        it. Results of one message keep their order; messages are not ordered
+        relative to each other.
+
+        `on_complete(n)` is called once the n-th message of `messages` (counting
+        from 0) and every follow-up message it caused have been handled.
+        """
+        inflight: List[int] = [0] * self.workers
+        # Messages waiting for window space, per worker, so a busy worker never holds up the others.
+        backlogs: List[Deque[Tuple[Dict[str, Any], int, Optional[int], Optional[int]]]] = [
+            deque() for _ in range(self.workers)]
+        queued: int = 0
+        # Messages (and their follow-ups) of every input message still being handled.
+        outstanding: Dict[int, int] = {}
+        traces: Iterator[int] = itertools.count()
+        self._generation += 1
+        generation: int = self._generation
+        wanted: threading.Semaphore = threading.Semaphore(0)
+        stopped: threading.Event = threading.Event()
+        threading.Thread(target=self._feed, args=(messages, generation, wanted, stopped), daemon=True).start()
+        reading: bool = False
+        exhausted: bool = False
+        flushed: bool = False
+
+        def enqueue(message: Dict[str, Any], hops: int, offset: Optional[int], trace: Optional[int]) -> None:
+            nonlocal queued
+            backlogs[self.ring.node(routing.normalize(message["routingkey"]))].append((message, hops, offset, trace))
+            queued += 1
+
+        def settle(trace: Optional[int], change: int) -> None:
+            if trace is None:
+                return
+            outstanding[trace] = outstanding.get(trace, 0) + change
+            if not outstanding[trace]:
+                del outstanding[trace]
+                if on_complete is not None:
+                    on_complete(trace)
+
+        if self.journal is not None:
+            for journaled, redelivered in self.journal.consume(self.consumer):
+                enqueue(redelivered, 0, journaled, None)
+
+        try:
+            while True:
+                self._reload()
+                if self.journal is not None and queued:
+                    self.journal.sync()
+                for worker, backlog in enumerate(backlogs):
+                    while backlog and inflight[worker] < self.window:
+                        message, hops, offset, trace = backlog.popleft()
+                        self._connections[worker].send_bytes(wire.pack({
+                            "routingkey": message["routingkey"], "message": message, "hops": hops,
+                            "offset": offset, "trace": trace}))
+                        inflight[worker] += 1
+                        queued -= 1
+                if queued < self.window and not reading and not exhausted:
+                    # Read on while little is waiting for busy workers; messages
+                    # for idle ones are sent at once.
+                    reading = True
+                    wanted.release()
+                if exhausted and not queued and not any(inflight):
+                    if flushed:
+                        return
+                    # Windows still open when the input ends are handed on as they are.
+                    for worker, connection in enumerate(self._connections):
+                        connection.send_bytes(wire.pack({"flush": True}))
+                        inflight[worker] += 1
+                    flushed = True
+                    continue
+
+                number, data = self._replies.get()
+                if number < 0:
+                    if number != -generation:
+                        continue  # left over from an earlier, abandoned dispatch
+                    reading = False
+                    if isinstance(data, Exception):
+                        raise data
+                    if data is None:
+                        exhausted = True
+                        continue
+                    trace = next(traces)
+                    if self.router.consumers(data["routingkey"]):
+                        settle(trace, 1)
+                        enqueue(data, 0, self._journal(data), trace)
+                    else:
+                        yield data
+                        settle(trace, 0)
+                    continue
+                if data is None:
+                    raise RuntimeError(f"Dispatcher worker {number} exited")
+                inflight[number] -= 1
+                reply: Dict[str, Any] = wire.unpack(data)
+                self.errors.extend(reply["errors"])
+                leaving: List[Any] = reply["results"]
+                # The worker sealed the results it found consumers for; one whose
+                # consumer failed to build on some worker is not routed.
+                for sealed in reply["forward"]:
+                    if self.router.consumers(sealed["routingkey"]):
+                        # What the flushed windows started may open windows again.
+                        flushed = flushed and not reply.get("flush")
+                        settle(reply["trace"], 1)
+                        enqueue(sealed, reply["hops"] + 1, self._journal(sealed), reply["trace"])
+                    else:
+                        leaving.append(sealed)
+                yield from leaving
+                if self.journal is not None:
+                    # Follow-up messages were put first, so they commit no later than the acks.
+                    for acknowledged in [reply["offset"], *reply["acks"]]:
+                        if acknowledged is not None:
+                            self.journal.ack(self.consumer, acknowledged)
+                settle(reply["trace"], -1)
+        finally:
+            stopped.set()
+            wanted.release()
+
+    def _reload(self) -> None:
+        if self._store is None or time.monotonic() < self._next_check:
+            return
+        self._next_check = time.monotonic() + self.reload_interval
+        if self._store.refresh():
+            self.router = Router(self._store.configs())
+
+    def _journal(self, message: Dict[str, Any]) -> Optional[int]:
+        return None if self.journal is None else self.journal.put(message)
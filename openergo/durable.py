@@ -0,0 +1,187 @@
+import sqlite3
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Dict, Generator, List, Optional, Set, Tuple
+
+from openergo import wire
+
+if TYPE_CHECKING:
+    from openergo.executor import Executor
+
+
+class DurableQueue:
+    """
+    An append-only message log in SQLite (WAL mode) with per-consumer
+    offsets, for at-least-once delivery between components.
+
+    `put` assigns an offset and returns at once; a writer thread commits
+    everything put (and acknowledged) since its last commit in one
+    transaction, so many messages share one fsync. `sync` waits until what
+    was put so far is durable. Consumers `ack` offsets once the message has
+    been handled; after a crash, `consume` redelivers every message past the
+    highest offset up to which all messages were acknowledged.
+    """
+
+    def __init__(self, path: str, batch_size: int = 512, linger: float = 0.005) -> None:
+        self.path: str = path
+        self.batch_size: int = batch_size
+        self.linger: float = linger
+        self.commits: int = 0
+        self._connection: sqlite3.Connection = self._connect()
+        self._connection.executescript("""
+            CREATE TABLE IF NOT EXISTS messages (offset INTEGER PRIMARY KEY, routingkey TEXT, body BLOB);
+            CREATE TABLE IF NOT EXISTS offsets (consumer TEXT PRIMARY KEY, offset INTEGER);
+        """)
+        self._condition: threading.Condition = threading.Condition()
+        self._io: threading.Lock = threading.Lock()
+        self._pending: List[Tuple[int, str, bytes]] = []
+        self._acked: Dict[str, Set[int]] = {}
+        self._committed: Dict[str, int] = dict(self._connection.execute("SELECT consumer, offset FROM offsets"))
+        self._dirty: Set[str] = set()
+        # Offsets keep growing even when compaction emptied the log.
+        self._next: int = max([self._connection.execute("SELECT MAX(offset) FROM messages").fetchone()[0] or 0,
+                               *self._committed.values()]) + 1
+        self._durable: int = self._next - 1
+        self._closed: bool = False
+        self._writer: threading.Thread = threading.Thread(target=self._write, daemon=True)
+        self._writer.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        connection: sqlite3.Connection = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=FULL")
+        return connection
+
+    def __enter__(self) -> "DurableQueue":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def put(self, message: Dict[str, Any]) -> int:
+        """
+        Append a message; it is durable once `sync` returns.
+
+        Returns:
+            int: The message's offset.
+        """
+        body: bytes = wire.pack(message)
+        with self._condition:
+            if self._closed:
+                raise ValueError("DurableQueue is closed")
+            offset: int = self._next
+            self._next += 1
+            self._pending.append((offset, str(message.get("routingkey", "")), body))
+            self._condition.notify_all()
+        return offset
+
+    def sync(self, offset: Optional[int] = None) -> None:
+        """
+        Block until every message up to `offset` (default: all put so far) is
+        committed to disk.
+        """
+        with self._condition:
+            target: int = self._next - 1 if offset is None else offset
+            self._condition.notify_all()
+            self._condition.wait_for(lambda: self._durable >= target or self._closed)
+
+    def ack(self, consumer: str, offset: int) -> None:
+        """
+        Mark one message as handled by `consumer`. The consumer's committed
+        offset advances over every contiguous acknowledged offset and is
+        persisted with the next group commit.
+        """
+        with self._condition:
+            acked: Set[int] = self._acked.setdefault(consumer, set())
+            acked.add(offset)
+            committed: int = self._committed.get(consumer, 0)
+            while committed + 1 in acked:
+                committed += 1
+                acked.discard(committed)
+            if committed != self._committed.get(consumer, 0):
+                self._committed[consumer] = committed
+                self._dirty.add(consumer)
+                self._condition.notify_all()
+
+    def committed(self, consumer: str) -> int:
+        with self._condition:
+            return self._committed.get(consumer, 0)
+
+    def consume(self, consumer: str, limit: Optional[int] = None) -> Generator[Tuple[int, Dict[str, Any]], None, None]:
+        """
+        Durable messages past the consumer's committed offset, oldest first.
+        """
+        self.sync()
+        with self._io:
+            oldest: Optional[int] = self._connection.execute("SELECT MIN(offset) FROM messages").fetchone()[0]
+        with self._condition:
+            # A new consumer starts at the oldest message still in the log.
+            committed: int = self._committed.setdefault(consumer, (oldest or self._next) - 1)
+        with self._io:
+            rows: List[Tuple[int, bytes]] = self._connection.execute(
+                "SELECT offset, body FROM messages WHERE offset > ? ORDER BY offset LIMIT ?",
+                (committed, -1 if limit is None else limit)).fetchall()
+        for offset, body in rows:
+            yield offset, wire.unpack(body)
+
+    def process(self, consumer: str, executor: "Executor", limit: Optional[int] = None) -> List[Any]:
+        """
+        Run pending messages through `executor`, acknowledging each one only
+        after its execution has finished.
+        """
+        results: List[Any] = []
+        for offset, message in self.consume(consumer, limit):
+            results.extend(executor.execute(message))
+            self.ack(consumer, offset)
+        return results
+
+    def compact(self) -> int:
+        """
+        Delete messages every known consumer has committed.
+
+        Returns:
+            int: The number of messages deleted.
+        """
+        self.sync()
+        with self._condition:
+            if not self._committed:
+                return 0
+            floor: int = min(self._committed.values())
+        with self._io:
+            return self._connection.execute("DELETE FROM messages WHERE offset <= ?", (floor,)).rowcount
+
+    def close(self) -> None:
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify_all()
+        self._writer.join()
+        self._connection.close()
+
+    def _write(self) -> None:
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._pending or self._dirty or self._closed)
+                if not (self._pending or self._dirty):
+                    return
+            # Linger briefly so that concurrent producers share the commit.
+            deadline: float = time.monotonic() + self.linger
+            with self._condition:
+                while len(self._pending) < self.batch_size and not self._closed:
+                    remaining: float = deadline - time.monotonic()
+                    if remaining <= 0 or not self._condition.wait(remaining):
+                        break
+                batch, self._pending = self._pending, []
+                offsets: List[Tuple[str, int]] = [(consumer, self._committed[consumer]) for consumer in self._dirty]
+                self._dirty = set()
+            with self._io:
+                self._connection.execute("BEGIN")
+                self._connection.executemany("INSERT INTO messages VALUES (?, ?, ?)", batch)
+                self._connection.executemany("INSERT OR REPLACE INTO offsets VALUES (?, ?)", offsets)
+                self._connection.execute("COMMIT")
+            with self._condition:
+                self.commits += 1
+                if batch:
+                    self._durable = batch[-1][0]
+                self._condition.notify_all()
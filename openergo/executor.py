@@ -1,12 +1,27 @@
+import contextlib
+import copy
 import re
+import threading
+import time
 from abc import ABC
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from functools import wraps
-from typing import Any, Generator, Union, Callable, Dict, List, Optional, Tuple, TypeVar, cast
+from typing import Any, Deque, Generator, Iterable, Union, Callable, Dict, List, Mapping, Optional, Tuple, TypeVar, cast
 import json
+from openergo import routing, wire
+from openergo.aggregate import Aggregator
+from openergo.cache import ResultCache
+from openergo.capture import Recorder
+from openergo.idempotency import IdempotencyStore
+from openergo.retry import RetryScheduler
 from openergo.utility import Utility, traverse_datastructures
+from openergo.vectorize import Collator
 F = TypeVar("F", bound=Callable[..., Any])
 from openergo.colors import *
 
+ENCRYPTIONKEY = 'AgUpjQf8Pbe609pLrGnem6PEoawnt3wu1dWzbvgZfPo='
+
 
 
 # def traverse_datastructures(
@@ -155,7 +170,7 @@ from openergo.colors import *
 
 
 def is_complete_substitution(value: str) -> bool:
-    print(f"\nChecking if value is a complete substitution (type: {type(value).__name__}):\n{JSON}{json.dumps(value, indent=3)}{RESET}")
+    print(f"\nChecking if value is a complete substitution (type: {type(value).__name__}):\n{JSON}{json.dumps(value, indent=3, default=repr)}{RESET}")
 
     if not value.startswith("{") or not value.endswith("}"):
         print(f"Value does not start and end with braces: {value}")
@@ -189,169 +204,373 @@ def is_complete_substitution(value: str) -> bool:
 @traverse_datastructures
 def substitute(value: Any, data: Union[str, int, float, bool, list, dict, tuple]) -> Any:
     def resolve(value: str, depth: int = 0) -> Any:
-        print(f"\nResolving value (depth={depth}, type: {type(value).__name__}):\n{JSON}{json.dumps(value, indent=3)}{RESET}")
+        print(f"\nResolving value (depth={depth}, type: {type(value).__name__}):\n{JSON}{json.dumps(value, indent=3, default=repr)}{RESET}")
         pattern = re.compile(r"\{([^{}]*)\}")
         previous = None
 
         while value != previous:  # Keep resolving until no changes
             previous = value
-            print(f"Previous value at depth {depth}:\n{JSON}{json.dumps(previous, indent=3)}{RESET}")
+            print(f"Previous value at depth {depth}:\n{JSON}{json.dumps(previous, indent=3, default=repr)}{RESET}")
 
             def substitution(match):
                 match_group = match.group(1)
-                print(f"Matched group (type: {type(match_group).__name__}):\n{JSON}{json.dumps(match_group, indent=3)}{RESET}")
+                print(f"Matched group (type: {type(match_group).__name__}):\n{JSON}{json.dumps(match_group, indent=3, default=repr)}{RESET}")
 
                 resolved_key = resolve(match_group, depth + 1)
-                print(f"Resolved key for {match_group} (depth={depth+1}):\n{JSON}{json.dumps(resolved_key, indent=3)}{RESET}")
+                print(f"Resolved key for {match_group} (depth={depth+1}):\n{JSON}{json.dumps(resolved_key, indent=3, default=repr)}{RESET}")
 
                 resolved_value = Utility.deep_get(data, resolved_key, match.group(0))
-                print(f"Resolved value for key {resolved_key} (depth={depth+1}):\n{JSON}{json.dumps(resolved_value, indent=3)}{RESET}")
+                print(f"Resolved value for key {resolved_key} (depth={depth+1}):\n{JSON}{json.dumps(resolved_value, indent=3, default=repr)}{RESET}")
 
                 # Determine whether to cast to string
                 if depth > 0 or value != match.group(0):
                     result = str(resolved_value)
-                    print(f"Returning string-cast resolved value (depth={depth}):\n{JSON}{json.dumps(result, indent=3)}{RESET}")
+                    print(f"Returning string-cast resolved value (depth={depth}):\n{JSON}{json.dumps(result, indent=3, default=repr)}{RESET}")
                     return result
 
-                print(f"Returning original resolved value (depth={depth}):\n{JSON}{json.dumps(resolved_value, indent=3)}{RESET}")
+                print(f"Returning original resolved value (depth={depth}):\n{JSON}{json.dumps(resolved_value, indent=3, default=repr)}{RESET}")
                 return resolved_value
 
             # Attempt substitution and handle non-string results
             try:
                 new_value = pattern.sub(substitution, value)
-                print(f"Updated value after substitution (depth={depth}, type: {type(new_value).__name__}):\n{JSON}{json.dumps(new_value, indent=3)}{RESET}")
+                print(f"Updated value after substitution (depth={depth}, type: {type(new_value).__name__}):\n{JSON}{json.dumps(new_value, indent=3, default=repr)}{RESET}")
                 value = new_value
             except TypeError as e:
-                print(f"Non-string substitution result detected (type: {type(value).__name__}):\n{JSON}{json.dumps(value, indent=3)}{RESET}")
+                print(f"Non-string substitution result detected (type: {type(value).__name__}):\n{JSON}{json.dumps(value, indent=3, default=repr)}{RESET}")
                 break  # Non-string values terminate the substitution process
 
         # At the root level, decide type based on whether it's a complete substitution
         if depth == 0 and is_complete_substitution(value):
             resolved_key = resolve(value[1:-1], depth + 1)  # Remove outer braces
-            print(f"Root level complete substitution for {value}:\n{JSON}{json.dumps(resolved_key, indent=3)}{RESET}")
+            print(f"Root level complete substitution for {value}:\n{JSON}{json.dumps(resolved_key, indent=3, default=repr)}{RESET}")
             result = Utility.deep_get(data, resolved_key, value)
-            print(f"Final resolved value at root (depth={depth}):\n{JSON}{json.dumps(result, indent=3)}{RESET}")
+            print(f"Final resolved value at root (depth={depth}):\n{JSON}{json.dumps(result, indent=3, default=repr)}{RESET}")
             return result
 
-        print(f"Final resolved value at depth {depth}:\n{JSON}{json.dumps(value, indent=3)}{RESET}")
+        print(f"Final resolved value at depth {depth}:\n{JSON}{json.dumps(value, indent=3, default=repr)}{RESET}")
         return value
 
     if isinstance(value, str):
-        print(f"\nStarting substitution for value (type: {type(value).__name__}):\n{JSON}{json.dumps(value, indent=3)}{RESET}")
+        print(f"\nStarting substitution for value (type: {type(value).__name__}):\n{JSON}{json.dumps(value, indent=3, default=repr)}{RESET}")
         result = resolve(value)
-        print(f"\nFinal substituted value (type: {type(result).__name__}):\n{JSON}{json.dumps(result, indent=3)}{RESET}")
+        print(f"\nFinal substituted value (type: {type(result).__name__}):\n{JSON}{json.dumps(result, indent=3, default=repr)}{RESET}")
         return result
 
-    print(f"\nNon-string value passed, returning as is (type: {type(value).__name__}):\n{JSON}{json.dumps(value, indent=3)}{RESET}")
+    print(f"\nNon-string value passed, returning as is (type: {type(value).__name__}):\n{JSON}{json.dumps(value, indent=3, default=repr)}{RESET}")
     return value
 
 
 
 
+def per_message(data: Any) -> Any:
+    """
+    The part of a context that varies per message, i.e. everything except the
+    static config, which is never traversed, copied or traced per message.
+    """
+    if isinstance(data, dict) and "config" in data:
+        return {key: value for key, value in data.items() if key != "config"}
+    return data
+
+
+def streaming(method: F) -> F:
+    @wraps(method)
+    def wrapper(self: "Executor", data: Any) -> Any:
+        if self.prefetch <= 0:
+            yield from method(self, data)
+            return
+        print(f"Prefetching up to {self.prefetch} results ahead of the consumer")
+        yield from Utility.prefetch(method(self, data), self.prefetch)
+
+    return wrapper  # type: ignore
+
+
+def transport(method: F) -> F:
+    @wraps(method)
+    def wrapper(self: "Executor", data: Any) -> Any:
+        if self.wire_format != "binary":
+            yield from method(self, data)
+            return
+
+        message = wire.unpack(data, ENCRYPTIONKEY) if wire.is_envelope(data) else data
+        print(f"Unpacked binary envelope for routing key {message.get('routingkey')!r}")
+
+        def finish(result: Any) -> Any:
+            envelope = result if isinstance(result, dict) else {"payload": result}
+            packed = wire.pack(envelope, compress=self.wire_compression,
+                               encryptkey=ENCRYPTIONKEY if self.wire_encryption else None)
+            print(f"Packed binary envelope of {len(packed)} bytes")
+            yield packed
+
+        yield from Utility.relay(method(self, message), finish)
+
+    return wrapper  # type: ignore
+
+
 def contextualize(method: F) -> F:
     @wraps(method)
-    def wrapper(self: "Executor", data) -> Any:
-        print(f"Entering contextualize with input:\n{JSON}{json.dumps(data, indent=3)}{RESET}")
+    def wrapper(self: "Executor", data: Any) -> Any:
+        print(f"Entering contextualize with input:\n{JSON}{json.dumps(data, indent=3, default=repr)}{RESET}")
         
         context = {"config": self.config, "input": data}
-        print(f"Created context:\n{JSON}{json.dumps(context, indent=3)}{RESET}")
-        
-        for result in method(self, context):
-            print(f"Yielding from contextualize:\n{JSON}{json.dumps(result['output'], indent=3)}{RESET}")
+        print(f"Created context:\n{JSON}{json.dumps(per_message(context), indent=3, default=repr)}{RESET}")
+
+        def finish(result: Any) -> Any:
+            print(f"Yielding from contextualize:\n{JSON}{json.dumps(result['output'], indent=3, default=repr)}{RESET}")
             yield result["output"]
+
+        yield from Utility.relay(method(self, context), finish)
         
     return wrapper  # type: ignore
 
 
 def substitutions(method: F) -> F:
     @wraps(method)
-    def wrapper(self: "Executor", data) -> Any:
-        print(f"Entering substitutions with input:\n{JSON}{json.dumps(data, indent=3)}{RESET}")
+    def wrapper(self: "Executor", data: Any) -> Any:
+        print(f"Entering substitutions with input:\n{JSON}{json.dumps(per_message(data), indent=3, default=repr)}{RESET}")
 
-        context = substitute(data, data)
-        print(f"Initial substitution context:\n{JSON}{json.dumps(context, indent=3)}{RESET}")
+        context = {**data, "input": substitute(data["input"], data)}
+        print(f"Initial substitution context:\n{JSON}{json.dumps(per_message(context), indent=3, default=repr)}{RESET}")
 
-        for result in method(self, context):
-            print(f"Method result before substitution:\n{JSON}{json.dumps(result, indent=3)}{RESET}")
-            context = substitute(result, result)
-            print(f"Updated substitution context:\n{JSON}{json.dumps(context, indent=3)}{RESET}")
+        def finish(result: Any) -> Any:
+            print(f"Method result before substitution:\n{JSON}{json.dumps(per_message(result), indent=3, default=repr)}{RESET}")
+            context = {**result, "output": substitute(result["output"], result)}
+            print(f"Updated substitution context:\n{JSON}{json.dumps(per_message(context), indent=3, default=repr)}{RESET}")
             print("Yielding from substitutions")
             yield context
+
+        yield from Utility.relay(method(self, context), finish)
         
     return wrapper  # type: ignore
 
 
 def bindings(method: F) -> F:
     @wraps(method)
-    def wrapper(self: "Executor", data, *args: Any, **kwargs: Any) -> Any:
-        print(f"Entering bindings with input:\n{JSON}{json.dumps(data, indent=3)}{RESET}")
+    def wrapper(self: "Executor", data: Any, *args: Any, **kwargs: Any) -> Any:
+        print(f"Entering bindings with input:\n{JSON}{json.dumps(per_message(data), indent=3, default=repr)}{RESET}")
 
-        config_bindings: Dict[str, Any] = data.get(
-            "config", {}).get("input", {}).get("bindings", {})
+        if not isinstance(self.input_bindings, dict):
+            raise ValueError("config['input']['bindings'] must be a dictionary.")
 
-        print(f"Extracted config bindings:\n{JSON}{json.dumps(config_bindings, indent=3)}{RESET}")
+        config_bindings: Dict[str, Any] = substitute(self.input_bindings, data)
+        # With windows, the message's window key and context go first; `aggregation`
+        # takes them off and hands back each closed window's result with its context.
+        window: Tuple[Any, ...] = () if self.aggregator is None else (str(substitute(self.aggregate_key, data)), data)
 
-        if not isinstance(config_bindings, dict):
-            raise ValueError("config['input']['bindings'] must be a dictionary.")
+        print(f"Extracted config bindings:\n{JSON}{json.dumps(config_bindings, indent=3, default=repr)}{RESET}")
 
-        for result in method(self, **config_bindings):
-            print(f"Method result:\n{JSON}{json.dumps(result, indent=3)}{RESET}")
-            data["output"] = result
-            print(f"Updated data:\n{JSON}{json.dumps(data, indent=3)}{RESET}")
+        def finish(result: Any) -> Any:
+            context = data
+            if self.aggregator is not None:
+                context, result = result
+            print(f"Method result:\n{JSON}{json.dumps(result, indent=3, default=repr)}{RESET}")
+            context["output"] = result
+            print(f"Updated data:\n{JSON}{json.dumps(per_message(context), indent=3, default=repr)}{RESET}")
             print("Yielding from bindings")
-            yield data
+            yield context
+
+        yield from Utility.relay(method(self, *window, **config_bindings), finish)
         
     return wrapper  # type: ignore
 
 
+def aggregation(method: F) -> F:
+    @wraps(method)
+    def wrapper(self: "Executor", *args: Any, **kwargs: Any) -> Any:
+        if self.aggregator is None:
+            yield from method(self, *args, **kwargs)
+            return
+
+        key, context, *rest = args
+        for arguments, closing in self.aggregator.add(key, kwargs, context=context):
+            print(f"Window closed:\n{JSON}{json.dumps(arguments, indent=3, default=repr)}{RESET}")
+            for result in method(self, *rest, **arguments):
+                yield closing, result
+
+    return wrapper  # type: ignore
+
+
+def memoization(method: F) -> F:
+    @wraps(method)
+    def wrapper(self: "Executor", *args: Any, **kwargs: Any) -> Any:
+        if self.cache is None:
+            yield from method(self, *args, **kwargs)
+            return
+
+        key: str = ResultCache.key(*args, **kwargs)
+        hit, cached = self.cache.get(key)
+        if hit:
+            print(f"Cache hit for {key}:\n{JSON}{json.dumps(self.cache.metrics(), indent=3, default=repr)}{RESET}")
+            yield from cached
+            return
+
+        results: List[Any] = []
+
+        def record(result: Any) -> Any:
+            results.append(result)
+            yield result
+
+        yield from Utility.relay(method(self, *args, **kwargs), record)
+        # Only complete result streams are cached; closed or failed ones are not.
+        self.cache.put(key, results)
+
+    return wrapper  # type: ignore
+
+
+def outputs(method: F) -> F:
+    @wraps(method)
+    def wrapper(self: "Executor", data: Any) -> Any:
+        print(f"Entering outputs with input:\n{JSON}{json.dumps(per_message(data), indent=3, default=repr)}{RESET}")
+
+        if not self.output_templates and self.output_bindings is None:
+            yield from method(self, data)
+            return
+
+        def finish(result: Any) -> Any:
+            # Usually `data` itself; a window closed by this message comes with its own newest message.
+            message = result.get("input")
+            routingkey: str = message.get("routingkey", "") if isinstance(message, dict) else ""
+            input_key: str = routing.match(self.input_keys, routingkey) or ""
+            print(f"Routing key {routingkey!r} matched input key {input_key!r}")
+            payload = result["output"] if self.output_bindings is None else substitute(self.output_bindings, result)
+            print(f"Projected output payload:\n{JSON}{json.dumps(payload, indent=3, default=repr)}{RESET}")
+
+            templates: List[Optional[routing.RoutingKeyTemplate]] = [*self.output_templates] or [None]
+            for template in templates:
+                envelope: Dict[str, Any] = {"payload": payload}
+                if template is not None:
+                    envelope = {"routingkey": template.derive(input_key, routingkey), "payload": payload}
+                print(f"Yielding from outputs:\n{JSON}{json.dumps(envelope, indent=3, default=repr)}{RESET}")
+                yield {**result, "output": envelope}
+
+        yield from Utility.relay(method(self, data), finish)
+
+    return wrapper  # type: ignore
+
+
+def transactions(method: F) -> F:
+    @wraps(method)
+    def wrapper(self: "Executor", data: Any) -> Any:
+        if self.transactions is None:
+            yield from method(self, data)
+            return
+
+        if self.transaction_key is None:
+            key: str = ResultCache.key(data["input"])
+        else:
+            key = Utility.fast_hash(Utility.stringify(substitute(self.transaction_key, data)))
+        hit, outputs = self.transactions.get(key)
+        if hit:
+            print(f"Replaying {len(outputs)} stored result(s) for idempotency key {key}")
+            for output in outputs:
+                yield {**data, "output": output}
+            return
+
+        recorded: List[Any] = []
+
+        def record(result: Any) -> Any:
+            recorded.append(result["output"])
+            yield result
+
+        yield from Utility.relay(method(self, data), record)
+        # Only complete result streams are recorded; a failed message is run again.
+        self.transactions.put(key, recorded)
+
+    return wrapper  # type: ignore
+
+
 def serialization(method: F) -> F:
     @wraps(method)
-    def wrapper(self: "Executor", data) -> Any:
-        print(f"Entering serialization with input:\n{JSON}{json.dumps(data, indent=3)}{RESET}")
-        
-        deserialized = Utility.deserialize(data)
-        print(f"Deserialized data:\n{JSON}{json.dumps(deserialized, indent=3)}{RESET}")
+    def wrapper(self: "Executor", data: Any) -> Any:
+        print(f"Entering serialization with input:\n{JSON}{json.dumps(per_message(data), indent=3, default=repr)}{RESET}")
+
+        if self.wire_format == "binary":
+            # Binary envelopes carry objects natively; no dill/base64 round trip.
+            yield from method(self, data)
+            return
         
-        for result in method(self, deserialized):
-            print(f"Method result before serialization:\n{JSON}{json.dumps(result, indent=3)}{RESET}")
-            serialized = Utility.serialize(result)
-            print(f"Serialized result:\n{JSON}{json.dumps(serialized, indent=3)}{RESET}")
+        deserialized = {**data, "input": Utility.deserialize(data["input"])}
+        print(f"Deserialized data:\n{JSON}{json.dumps(per_message(deserialized), indent=3, default=repr)}{RESET}")
+
+        def finish(result: Any) -> Any:
+            print(f"Method result before serialization:\n{JSON}{json.dumps(per_message(result), indent=3, default=repr)}{RESET}")
+            serialized = {**result, "output": Utility.serialize(result["output"])}
+            print(f"Serialized result:\n{JSON}{json.dumps(per_message(serialized), indent=3, default=repr)}{RESET}")
             print("Yielding from serialization")
             yield serialized
+
+        yield from Utility.relay(method(self, deserialized), finish)
         
     return wrapper  # Explicit typing enforced
 
 
 def encryption(method: F) -> F:
     @wraps(method)
-    def wrapper(self: "Executor", data) -> Any:
-        print(f"Entering encryption with input:\n{JSON}{json.dumps(data, indent=3)}{RESET}")
+    def wrapper(self: "Executor", data: Any) -> Any:
+        print(f"Entering encryption with input:\n{JSON}{json.dumps(per_message(data), indent=3, default=repr)}{RESET}")
 
-        ENCRYPTIONKEY = 'AgUpjQf8Pbe609pLrGnem6PEoawnt3wu1dWzbvgZfPo='
         decrypted = Utility.decrypt(data, "input.payload.encrypted", ENCRYPTIONKEY)
-        print(f"Decrypted data:\n{JSON}{json.dumps(decrypted, indent=3)}{RESET}")
+        print(f"Decrypted data:\n{JSON}{json.dumps(per_message(decrypted), indent=3, default=repr)}{RESET}")
 
-        for result in method(self, decrypted):
-            print(f"Method result:\n{JSON}{json.dumps(result, indent=3)}{RESET}")
+        def finish(result: Any) -> Any:
+            print(f"Method result:\n{JSON}{json.dumps(per_message(result), indent=3, default=repr)}{RESET}")
             print("Yielding from encryption")
             yield result
             # Uncomment to enable re-encryption:
             # encrypted = Utility.encrypt(result, "output", ENCRYPTIONKEY)
             # print(f"Re-encrypted result:\n{JSON}{json.dumps(encrypted, indent=3)}{RESET}")
+
+        yield from Utility.relay(method(self, decrypted), finish)
         
     return wrapper  # Explicit typing enforced
 
 
-def exceptions(func: Callable[..., Generator[Any, None, None]]) -> Callable[..., Generator[Any, None, None]]:
-    @wraps(func)
-    def wrapper(*args, **kwargs) -> Generator[Any, None, None]:
-        print(f"Entering exceptions with args:\n{JSON}{json.dumps(args, indent=3)}{RESET}, kwargs:\n{JSON}{json.dumps(kwargs, indent=3)}{RESET}")
+def capture(method: F) -> F:
+    @wraps(method)
+    def wrapper(self: "Executor", data: Any, *args: Any) -> Any:
+        # Retries are not new traffic; only first attempts are recorded.
+        if self.recorder is not None and not args:
+            self.recorder.record(data)
+        yield from method(self, data, *args)
+
+    return wrapper  # type: ignore
+
+
+def retries(method: F) -> F:
+    @wraps(method)
+    def wrapper(self: "Executor", data: Any, attempt: int = 1) -> Any:
+        if self.retry is None:
+            yield from method(self, data)
+            return
+
+        # Later stages decrypt in place; keep the envelope as it arrived.
+        envelope = copy.deepcopy(data)
+        generator = method(self, data)
+        sent = None
+        thrown = None
         try:
-            yield from func(*args, **kwargs)
-        except Exception as exc:  # pylint: disable=broad-except
-            print(f"Exception caught:\n{JSON}{json.dumps({'error': str(exc)}, indent=3)}{RESET}")
-        print("Exiting exceptions")
-    return wrapper
+            while True:
+                try:
+                    item = generator.throw(thrown) if thrown is not None else generator.send(sent)
+                except StopIteration:
+                    return
+                except Exception as exc:  # pylint: disable=broad-except
+                    if exc is thrown:
+                        raise
+                    self.retry.fail(envelope, attempt, exc)
+                    return
+                thrown = None
+                try:
+                    sent = yield item
+                except GeneratorExit:
+                    raise
+                except BaseException as exc:  # pylint: disable=broad-except
+                    thrown = exc
+        finally:
+            generator.close()
+
+    return wrapper  # type: ignore
+
 
 class Executor(ABC):
 
@@ -359,7 +578,74 @@ class Executor(ABC):
                  config: Optional[Dict[str, Any]] = None) -> None:
         self.function: Callable[..., Any] = function
         # self.generator = Utility.generatorize(function)
-        self.config: Dict[str, Any] = config or {}
+        # Config-side templates are resolved once here; per-message stages only
+        # ever look the (frozen) config up, they never traverse or copy it.
+        resolved: Dict[str, Any] = substitute(config or {}, {"config": config or {}})
+        self.config: Mapping[str, Any] = Utility.freeze(resolved)
+        self.input_keys: List[str] = Utility.deep_get(resolved, "input.keys", None) or []
+        self.input_bindings: Any = Utility.deep_get(resolved, "input.bindings", None) or {}
+        self.output_templates: List[routing.RoutingKeyTemplate] = [
+            routing.RoutingKeyTemplate(key) for key in Utility.deep_get(resolved, "output.keys", None) or []]
+        self.output_bindings: Any = Utility.deep_get(resolved, "output.bindings", None)
+        self.prefetch: int = Utility.deep_get(resolved, "execution.prefetch", None) or 0
+        vectorized: Any = Utility.deep_get(resolved, "execution.vectorized", None)
+        self.collator: Optional[Collator] = None
+        if vectorized:
+            self.collator = Collator.from_config(function, vectorized if isinstance(vectorized, dict) else {})
+            self.function = self.collator
+        aggregate: Any = Utility.deep_get(resolved, "aggregate", None)
+        self.aggregator: Optional[Aggregator] = Aggregator.from_config(aggregate) if aggregate is not None else None
+        self.aggregate_key: str = (aggregate or {}).get("key", "")
+        # A vectorized procedure needs a batch's worth of messages in flight at
+        # once; windows are filled in message order by a single worker.
+        self.pipeline_workers: int = (Utility.deep_get(resolved, "execution.pipeline.workers", None)
+                                      or (self.collator.size if self.collator else 1 if self.aggregator else 4))
+        self.pipeline_queue: int = Utility.deep_get(resolved, "execution.pipeline.queue", None) or 2 * self.pipeline_workers
+        self.wire_format: str = Utility.deep_get(resolved, "wire.format", None) or "json"
+        self.wire_compression: bool = bool(Utility.deep_get(resolved, "wire.compression", None))
+        self.wire_encryption: bool = bool(Utility.deep_get(resolved, "wire.encryption", None))
+        cache: Any = Utility.deep_get(resolved, "cache", None)
+        # Cached results are scoped to this procedure and component version so
+        # that components sharing a cache directory never see each other's.
+        namespace: str = ":".join([
+            f"{getattr(function, '__module__', '')}.{getattr(function, '__qualname__', repr(function))}",
+            str(resolved.get("name", "")), str(resolved.get("version", ""))])
+        self.cache: Optional[ResultCache] = (
+            ResultCache.from_config(cache, namespace) if cache is not None else None)
+        transaction: Any = Utility.deep_get(resolved, "transactions", None)
+        self.transactions: Optional[IdempotencyStore] = (
+            IdempotencyStore.from_config(transaction) if transaction is not None else None)
+        self.transaction_key: Optional[str] = (transaction or {}).get("key")
+        retry: Any = Utility.deep_get(resolved, "retry", None)
+        self.retry: Optional[RetryScheduler] = RetryScheduler.from_config(retry) if retry is not None else None
+        recording: Any = Utility.deep_get(resolved, "capture", None)
+        self.recorder: Optional[Recorder] = Recorder.from_config(recording) if recording is not None else None
+        # Calls into the procedure never overlap, even when stage work does.
+        self.procedure_lock: threading.RLock = threading.RLock()
+        if self.collator is not None:
+            # Messages wait inside the collator for their batch to fill; the
+            # collator itself keeps batches from overlapping.
+            self.procedure_lock = contextlib.nullcontext()  # type: ignore[assignment]
+
+    def __enter__(self) -> "Executor":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Release what the executor keeps open: windows still open are handed
+        to the procedure (callers that want their results call `flush_windows`
+        first), the idempotency store commits its last batch, and the capture
+        file is closed.
+        """
+        for _ in self.flush_windows():
+            pass
+        if self.transactions is not None:
+            self.transactions.close()
+        if self.recorder is not None:
+            self.recorder.close()
 
     #@exceptions
     # @unbatching
@@ -378,15 +664,89 @@ class Executor(ABC):
     # @mapping
     #@bindings
 
-    # @exceptions
+    @capture
+    @retries
+    @streaming
+    @transport
     @contextualize
     @encryption
+    @transactions
     @serialization
     @substitutions
+    @outputs
     @bindings
+    @aggregation
+    @memoization
     def execute(self, *args: Any, **kwargs: Any) -> Any:
         """
         Execute the executor. Substitutions and bindings are applied before execution.
         """
-        for result in Utility.generatorize(self.function)(*args, **kwargs):
-            yield result
+        with self.procedure_lock:
+            results = Utility.generatorize(self.function)(*args, **kwargs)
+        yield from Utility.relay(results, lock=self.procedure_lock)
+
+    def pipeline(self, messages: Iterable[Any]) -> Generator[Any, None, None]:
+        """
+        Execute many messages, overlapping the stage work (decryption,
+        deserialization, substitution, serialization) of upcoming messages with
+        the procedure handling the current one. At most `execution.pipeline.queue`
+        messages are in flight on `execution.pipeline.workers` threads; results
+        are yielded in message order.
+        """
+        pool: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=self.pipeline_workers)
+        pending: Deque[Future[List[Any]]] = deque()
+
+        def submit(*args: Any) -> None:
+            pending.append(pool.submit(lambda: list(self.execute(*args))))
+
+        try:
+            for message in messages:
+                submit(message)
+                # Failed messages rejoin the stream when their retry is due.
+                for envelope, attempt in self.retry.due() if self.retry else []:
+                    submit(envelope, attempt)
+                while len(pending) >= self.pipeline_queue:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+            yield from self.drain_retries(wait=True)
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    def execute_batch(self, messages: List[Any]) -> List[List[Any]]:
+        """
+        Execute `messages` together and return the results of each, in order.
+        With `execution.vectorized`, every message runs through the stages on
+        its own thread so that their bound arguments are collated into as few
+        procedure calls as possible; otherwise they run one after another.
+        """
+        if self.collator is None or len(messages) < 2:
+            return [list(self.execute(message)) for message in messages]
+        with ThreadPoolExecutor(max_workers=min(len(messages), self.collator.size)) as pool:
+            futures: List[Future[List[Any]]] = [
+                pool.submit(lambda message: list(self.execute(message)), message) for message in messages]
+            return [future.result() for future in futures]
+
+    def flush_windows(self) -> Generator[Any, None, None]:
+        """
+        Hand every window still open (e.g. at the end of a stream) to the
+        procedure and yield its results as they are: no message closed these
+        windows, so there is no input to route or substitute them by.
+        """
+        for arguments, _ in self.aggregator.flush() if self.aggregator is not None else []:
+            with self.procedure_lock:
+                results = Utility.generatorize(self.function)(**arguments)
+            yield from Utility.relay(results, lock=self.procedure_lock)
+
+    def drain_retries(self, wait: bool = False) -> Generator[Any, None, None]:
+        """
+        Execute the failed messages whose retry is due. With `wait`, keep going
+        until no retry is pending, i.e. every message succeeded or was
+        dead-lettered.
+        """
+        while self.retry is not None:
+            for envelope, attempt in self.retry.due():
+                yield from self.execute(envelope, attempt)
+            if not wait or not self.retry.pending():
+                return
+            time.sleep(self.retry.wheel.tick)
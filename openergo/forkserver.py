@@ -0,0 +1,50 @@
+import multiprocessing
+from multiprocessing import forkserver
+from multiprocessing.context import BaseContext
+from typing import List, Optional
+
+from openergo.graph import load_configs
+from openergo.utility import Utility
+
+# Imported by the template process of every fork server; procedure modules
+# of the deploy folders are added to these.
+BASE_MODULES: List[str] = [
+    "dill",
+    "pydash",
+    "cryptography.fernet",
+    "openergo.executor",
+    "openergo.python_executor",
+    "openergo.dispatcher",
+    "openergo.bulk",
+]
+
+
+def procedure_modules(folders: List[str]) -> List[str]:
+    """
+    The modules holding the procedures of every Python config in `folders`.
+    """
+    return sorted({
+        str(Utility.deep_get(config, "shell.procedure")).rsplit(".", 1)[0]
+        for config in load_configs(folders)
+        if Utility.deep_get(config, "shell.procedure", None)
+        and Utility.deep_get(config, "shell.language", "python") == "python"
+    })
+
+
+def prewarmed_context(folders: Optional[List[str]] = None,
+                      modules: Optional[List[str]] = None) -> BaseContext:
+    """
+    A "forkserver" multiprocessing context whose template process has
+    imported openergo, its dependencies and the procedures of `folders` (plus
+    any extra `modules`) once. Workers started from it are forked from that
+    template: they start in milliseconds and share the imported modules
+    copy-on-write. The template is started right away rather than on first use.
+
+    The fork server is process-wide, so the preload list only takes effect if
+    no fork server is running yet.
+    """
+    context: BaseContext = multiprocessing.get_context("forkserver")
+    preload: List[str] = BASE_MODULES + procedure_modules(folders or []) + list(modules or [])
+    context.set_forkserver_preload(list(dict.fromkeys(preload)))
+    forkserver.ensure_running()
+    return context
@@ -1,20 +1,23 @@
-import glob
 import json
 import os
-import re
 from abc import ABC, abstractmethod
-from typing import Any, Callable, Dict, List
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
+from xml.etree import ElementTree
 
 import graphviz
 
+from openergo import routing
+from openergo.config_store import ConfigStore
 from openergo.utility import Utility
 
 
 class Node(ABC):
+    kind: str = "node"
+
     def __init__(self, name: str) -> None:
         self._name: str = ".".join(sorted(set(name.split("."))))
         self._nodes: List[Node] = []
-        nodes.append(self)
 
     def add_node(self, node: "Node") -> None:
         self._nodes.append(node)
@@ -22,6 +25,10 @@ class Node(ABC):
     def __str__(self) -> str:
         return self._name
 
+    @property
+    def id(self) -> str:
+        return f"{self.kind}/{self._name}"
+
     @abstractmethod
     def attr(self) -> Dict[str, Any]:
         pass
@@ -31,10 +38,9 @@ class Node(ABC):
         return self._nodes
 
 
-nodes: List[Node] = []
-
-
 class Component(Node):
+    kind: str = "component"
+
     def __init__(self, config: Dict[str, Any]) -> None:
         super().__init__(Utility.deep_get(config, "name"))
         self._config: Dict[str, Any] = config
@@ -58,6 +64,8 @@ class Component(Node):
 
 
 class Edge(Node):
+    kind: str = "key"
+
     def attr(self) -> Dict[str, Any]:
         return {
             "fontcolor": "#222222",
@@ -68,104 +76,168 @@ class Edge(Node):
 
 
 def add_configs(configs: List[Dict[str, Any]], folder: str) -> None:
-    config_files: List[str] = glob.glob(
-        os.path.join(folder, "**/*.json"), recursive=True)
+    configs.extend(config_store([folder]).configs())
+
 
-    for config_file in config_files:
-        with open(config_file, "r", encoding="utf8") as stream:
-            config_json: Any = json.load(stream)
-            if isinstance(config_json, list):
-                configs.extend(config_json)
-            elif isinstance(config_json, dict) and "name" in config_json:
-                configs.append(config_json)
+# One store per set of folders, so repeated loads only re-read changed files.
+_stores: Dict[Tuple[str, ...], ConfigStore] = {}
+
+
+def config_store(folders: List[str]) -> ConfigStore:
+    key: Tuple[str, ...] = tuple(os.path.abspath(folder) for folder in folders)
+    store: Optional[ConfigStore] = _stores.get(key)
+    if store is None:
+        store = _stores[key] = ConfigStore(list(key))
+    store.refresh()
+    return store
 
 
 def load_configs(folders: List[str]) -> List[Dict[str, Any]]:
-    configs: List[Dict[str, Any]] = []
-
-    for folder in folders:
-        add_configs(configs, folder)
-    return configs
-
-
-def do_graph(keys: List[str], folders: List[str]) -> None:
-    cfgs: List[Dict[str, Any]] = load_configs(folders)
-    for config in cfgs:
-        for key in keys:
-            build_graph(Edge(key), config, cfgs)
-
-
-def build_graph(
-        out_edge: Edge, cfg: Dict[str, Any], cfgs: List[Dict[str, Any]]) -> None:
-    out_key: str = str(out_edge)
-    get_key: Callable[[str], Any] = lambda key: Utility.deep_get(cfg, key)
-
-    for input_keys in get_key("input.keys"):
-        input_keys_parts: List[str] = [
-            part for part in input_keys.split(".") if part]
-        negated_keys: set[str] = {part[1:]
-                                  for part in input_keys_parts if part.startswith("~")}
-        required_keys: set[str] = {
-            part for part in input_keys_parts if not part.startswith("~")}
-        out_key_parts: set[str] = set(out_key.split("."))
-
-        if required_keys <= out_key_parts and not negated_keys & out_key_parts:
-            in_edge: Edge = Edge(input_keys)
-            out_edge.add_node(in_edge)
-
-            component: Component = Component(cfg)
-            in_edge.add_node(component)
-
-            for output_key in get_key("output.keys"):
-                do_substitution(
-                    input_keys,
-                    output_key,
-                    out_key,
-                    cfgs,
-                    component)
-
-
-def do_substitution(
-    input_key: str,
-    output_key: str,
-    routingkey: str,
-    cfgs: List[Dict[str, Any]],
-    component: Component,
-) -> None:
-    derived_key: str = re.sub(
-        r"\?",
-        ".".join(set(routingkey.split(".")) - set(input_key.split("."))),
-        output_key,
-    )
-    outbound: Edge = Edge(derived_key)
-
-    for config in cfgs:
-        build_graph(outbound, config, cfgs)
-
-    if derived_key != output_key:
-        interim: Edge = Edge(output_key)
-        interim.add_node(outbound)
-        outbound = interim
-
-    component.add_node(outbound)
-
-
-def graph(folders: List[str], rks: List[str]) -> None:
-    do_graph(rks, folders)
-
-    dot: graphviz.Digraph = graphviz.Digraph(comment="Component Diagram")
-    dot.attr("graph", bgcolor="#EEEEEE", nodesep="5", pad="1", rankdir="TB")
-    dot.attr("edge", color="#888888")
-    dot.attr("node", fontcolor="#222222", fontname="courier", fontsize="30")
-
-    edges: set[tuple[str, str]] = set()
-    for node in nodes:
-        dot.node(str(node), **node.attr())
-        for child in node.nodes:
-            if str(node) == str(child):
+    return config_store(folders).configs()
+
+
+class Topology:
+    """
+    The deduplicated graph of routing keys and components reachable from a
+    set of seed routing keys. Each node is stored once, keyed by its id
+    (`key/<routingkey>` or `component/<name>`), and each routing key is
+    expanded once, so cycles and shared keys cost nothing extra.
+    """
+
+    def __init__(self) -> None:
+        self.nodes: Dict[str, Node] = {}
+        self.adjacency: Dict[str, Set[str]] = {}
+
+    def add(self, node: Node) -> str:
+        if node.id not in self.nodes:
+            self.nodes[node.id] = node
+            self.adjacency[node.id] = set()
+        return node.id
+
+    def link(self, parent: str, child: str) -> None:
+        if parent != child:
+            self.adjacency[parent].add(child)
+
+    @classmethod
+    def build(cls, configs: List[Dict[str, Any]], seeds: List[str]) -> "Topology":
+        """
+        Breadth-first expansion of `seeds`: every component whose input keys
+        match a routing key is linked to it through the matching input key,
+        and every routing key it derives is expanded in turn.
+        """
+        topology: Topology = cls()
+        queue: Deque[str] = deque(seeds)
+        seen: Set[str] = set()
+        while queue:
+            routingkey: str = queue.popleft()
+            key_id: str = topology.add(Edge(routingkey))
+            if key_id in seen:
                 continue
-            edges.add((str(node), str(child)))
-    for edge in edges:
-        dot.edge(*edge, color="#888888", arrowsize="1.0", minlen="3")
+            seen.add(key_id)
+            for config in configs:
+                for input_key in Utility.deep_get(config, "input.keys", None) or []:
+                    if not routing.matches(input_key, routingkey):
+                        continue
+                    input_id: str = topology.add(Edge(input_key))
+                    topology.link(key_id, input_id)
+                    component_id: str = topology.add(Component(config))
+                    topology.link(input_id, component_id)
+                    for output_key in Utility.deep_get(config, "output.keys", None) or []:
+                        derived_key: str = routing.derive(input_key, output_key, routingkey)
+                        outbound_id: str = topology.add(Edge(derived_key))
+                        if derived_key != output_key:
+                            template_id: str = topology.add(Edge(output_key))
+                            topology.link(component_id, template_id)
+                            topology.link(template_id, outbound_id)
+                        else:
+                            topology.link(component_id, outbound_id)
+                        queue.append(derived_key)
+        return topology
+
+    def parents(self) -> Dict[str, Set[str]]:
+        result: Dict[str, Set[str]] = {node_id: set() for node_id in self.nodes}
+        for parent, children in self.adjacency.items():
+            for child in children:
+                result[child].add(parent)
+        return result
+
+    def subgraph(self, roots: List[str], depth: Optional[int] = None) -> "Topology":
+        """
+        The part of the topology within `depth` hops downstream of the routing
+        keys `roots` (all of it if `depth` is None).
+        """
+        result: Topology = Topology()
+        frontier: List[str] = [Edge(root).id for root in roots if Edge(root).id in self.nodes]
+        for node_id in frontier:
+            result.add(self.nodes[node_id])
+        hops: int = 0
+        while frontier and (depth is None or hops < depth):
+            hops += 1
+            following: List[str] = []
+            for node_id in frontier:
+                for child in sorted(self.adjacency[node_id]):
+                    if child not in result.nodes:
+                        result.add(self.nodes[child])
+                        following.append(child)
+                    result.link(node_id, child)
+            frontier = following
+        return result
+
+    def to_json(self) -> Dict[str, Any]:
+        return {
+            "nodes": {node_id: {"kind": node.kind, "name": str(node)} for node_id, node in self.nodes.items()},
+            "adjacency": {node_id: sorted(children) for node_id, children in self.adjacency.items()},
+        }
 
-    dot.render(".graph.gv", view=True)
+    def to_graphml(self) -> str:
+        root: ElementTree.Element = ElementTree.Element("graphml", xmlns="http://graphml.graphdrawing.org/xmlns")
+        for key in ("kind", "name"):
+            ElementTree.SubElement(root, "key", {"id": key, "for": "node", "attr.name": key, "attr.type": "string"})
+        graph_element: ElementTree.Element = ElementTree.SubElement(root, "graph", id="G", edgedefault="directed")
+        for node_id, node in self.nodes.items():
+            node_element: ElementTree.Element = ElementTree.SubElement(graph_element, "node", id=node_id)
+            ElementTree.SubElement(node_element, "data", key="kind").text = node.kind
+            ElementTree.SubElement(node_element, "data", key="name").text = str(node)
+        for parent, children in self.adjacency.items():
+            for child in sorted(children):
+                ElementTree.SubElement(graph_element, "edge", source=parent, target=child)
+        return ElementTree.tostring(root, encoding="unicode", xml_declaration=True)
+
+    def to_dot(self) -> graphviz.Digraph:
+        dot: graphviz.Digraph = graphviz.Digraph(comment="Component Diagram")
+        dot.attr("graph", bgcolor="#EEEEEE", nodesep="5", pad="1", rankdir="TB")
+        dot.attr("edge", color="#888888")
+        dot.attr("node", fontcolor="#222222", fontname="courier", fontsize="30")
+        for node_id, node in self.nodes.items():
+            dot.node(node_id, **node.attr())
+        for parent, children in self.adjacency.items():
+            for child in sorted(children):
+                dot.edge(parent, child, color="#888888", arrowsize="1.0", minlen="3")
+        return dot
+
+    def write(self, path: str, fmt: str) -> None:
+        """
+        Write the topology as `json` (adjacency), `graphml` or `dot` source.
+        """
+        with open(path, "w", encoding="utf-8") as stream:
+            if fmt == "json":
+                json.dump(self.to_json(), stream, indent=2)
+            elif fmt == "graphml":
+                stream.write(self.to_graphml())
+            elif fmt == "dot":
+                stream.write(self.to_dot().source)
+            else:
+                raise ValueError(f"Unsupported graph format: {fmt}")
+
+
+def graph(folders: List[str], rks: List[str], fmt: str = "render", output: Optional[str] = None,
+          roots: Optional[List[str]] = None, depth: Optional[int] = None) -> Topology:
+    topology: Topology = Topology.build(load_configs(folders), list(rks))
+    if roots or depth is not None:
+        topology = topology.subgraph(list(roots or rks), depth)
+
+    if fmt == "render":
+        topology.to_dot().render(output or ".graph.gv", view=True)
+    else:
+        topology.write(output or f".graph.{fmt}", fmt)
+    return topology
@@ -0,0 +1,117 @@
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import dill
+
+from openergo.cache import ResultCache
+
+
+class IdempotencyStore:
+    """
+    Remembers the results of messages by idempotency key so that redelivered
+    duplicates can be answered without running the procedure again.
+
+    Lookups go to an in-memory LRU first and to SQLite (WAL) after that.
+    Writes are buffered and committed `batch_size` at a time, or once
+    `linger` seconds have passed since the last commit, by `put` or by a
+    background flusher if no more writes come; `flush` forces it and `close`
+    commits the last batch. Without a `path`, only the LRU is used.
+    """
+
+    def __init__(self, path: Optional[str] = None, size: int = 4096,
+                 batch_size: int = 64, linger: float = 0.05) -> None:
+        self.path: Optional[str] = path
+        self.batch_size: int = batch_size
+        self.linger: float = linger
+        self.memory: ResultCache = ResultCache(size=size)
+        self.commits: int = 0
+        self._pending: Dict[str, bytes] = {}
+        self._flushed: float = time.monotonic()
+        self._lock: threading.Lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+        self._closed: threading.Event = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+        if path:
+            self._connection = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, value BLOB)")
+            self._flusher = threading.Thread(target=self._linger, daemon=True)
+            self._flusher.start()
+
+    @classmethod
+    def from_config(cls, section: Dict[str, Any]) -> "IdempotencyStore":
+        """
+        Build a store from a config's `transactions` section, e.g.
+        `{"key": "{input.payload.id}", "path": "transactions.db", "size": 4096, "batch": 64}`.
+        """
+        return cls(
+            path=section.get("path"),
+            size=section.get("size", 4096),
+            batch_size=section.get("batch", 64),
+            linger=section.get("linger", 0.05),
+        )
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """
+        Returns `(True, value)` for a known key and `(False, None)` otherwise.
+        """
+        hit, value = self.memory.get(key)
+        if hit:
+            return True, value
+        with self._lock:
+            pickled: Optional[bytes] = self._pending.get(key)
+            if pickled is None and self._connection is not None:
+                row: Optional[Tuple[bytes]] = self._connection.execute(
+                    "SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+                pickled = row[0] if row else None
+        if pickled is None:
+            return False, None
+        value = dill.loads(pickled)
+        self.memory.put(key, value)
+        return True, value
+
+    def put(self, key: str, value: Any) -> None:
+        self.memory.put(key, value)
+        if self._connection is None:
+            return
+        with self._lock:
+            self._pending[key] = dill.dumps(value)
+            if len(self._pending) >= self.batch_size or time.monotonic() - self._flushed >= self.linger:
+                self._commit()
+
+    def flush(self) -> None:
+        with self._lock:
+            self._commit()
+
+    def close(self) -> None:
+        self._closed.set()
+        if self._flusher is not None:
+            self._flusher.join()
+            self._flusher = None
+        with self._lock:
+            if self._connection is not None:
+                self._commit()
+                self._connection.close()
+                self._connection = None
+
+    def _linger(self) -> None:
+        """
+        Commit a batch that stopped filling up once it has lingered long enough.
+        """
+        while not self._closed.wait(self.linger):
+            with self._lock:
+                if self._pending and time.monotonic() - self._flushed >= self.linger:
+                    self._commit()
+
+    def _commit(self) -> None:
+        self._flushed = time.monotonic()
+        if not self._pending or self._connection is None:
+            return
+        rows: List[Tuple[str, bytes]] = list(self._pending.items())
+        self._connection.execute("BEGIN")
+        self._connection.executemany("INSERT OR REPLACE INTO results VALUES (?, ?)", rows)
+        self._connection.execute("COMMIT")
+        self._pending.clear()
+        self.commits += 1
@@ -0,0 +1,134 @@
+import json
+import random
+import re
+import string
+from typing import Any, Dict, Generator, List, Optional, Tuple
+
+from openergo import routing
+from openergo.executor import ENCRYPTIONKEY
+from openergo.utility import Utility
+
+# `{input.some.path}` references in a config's bindings.
+REFERENCE: re.Pattern[str] = re.compile(r"\{input\.([\w.]+)\}")
+
+
+class Distribution:
+    """
+    A distribution of non-negative integer sizes, written as "fixed:N",
+    "uniform:LOW:HIGH", "exponential:MEAN" or "lognormal:MEDIAN:SIGMA".
+    """
+
+    ARITY: Dict[str, int] = {"fixed": 1, "uniform": 2, "exponential": 1, "lognormal": 2}
+
+    def __init__(self, kind: str, *parameters: float) -> None:
+        if self.ARITY.get(kind) != len(parameters):
+            raise ValueError(f"Unknown distribution {kind!r} with {len(parameters)} parameter(s)")
+        self.kind: str = kind
+        self.parameters: Tuple[float, ...] = parameters
+
+    @classmethod
+    def parse(cls, spec: str) -> "Distribution":
+        kind, *parameters = spec.split(":")
+        try:
+            return cls(kind, *map(float, parameters))
+        except ValueError as e:
+            raise ValueError(f"Invalid distribution {spec!r}: {e}") from e
+
+    def sample(self, rng: random.Random) -> int:
+        if self.kind == "fixed":
+            value: float = self.parameters[0]
+        elif self.kind == "uniform":
+            value = rng.uniform(*self.parameters)
+        elif self.kind == "exponential":
+            value = rng.expovariate(1 / self.parameters[0]) if self.parameters[0] > 0 else 0
+        else:
+            median, sigma = self.parameters
+            value = median * rng.lognormvariate(0, sigma)
+        return max(0, round(value))
+
+    def __repr__(self) -> str:
+        return f"Distribution({':'.join([self.kind, *(f'{p:g}' for p in self.parameters)])})"
+
+
+class MessageGenerator:
+    """
+    Synthetic input messages for a component: routing keys accepted by its
+    `input.keys` (plus one of `spread` extra parts, so keys vary), and a
+    generated value at every `input.*` path its `input.bindings` reference.
+
+    A value is a string whose length follows `strings`, nested `depth` levels
+    deep in lists or objects whose sizes follow `lists`. Values under
+    `payload.encrypted` are encrypted, as every executor expects.
+    """
+
+    def __init__(self, config: Dict[str, Any], strings: Optional[Distribution] = None,
+                 depth: Optional[Distribution] = None, lists: Optional[Distribution] = None,
+                 spread: int = 16, seed: Optional[int] = None) -> None:
+        self.input_keys: List[str] = [
+            key for key in Utility.deep_get(config, "input.keys", None) or [] if routing.parse(key)[0]]
+        if not self.input_keys:
+            raise ValueError(f"{config.get('name', 'config')} has no input keys to generate messages for")
+        self.strings: Distribution = strings or Distribution("uniform", 8, 32)
+        self.depth: Distribution = depth or Distribution("fixed", 0)
+        self.lists: Distribution = lists or Distribution("uniform", 1, 4)
+        self.spread: int = spread
+        self.rng: random.Random = random.Random(seed)
+        referenced: List[str] = REFERENCE.findall(json.dumps(Utility.deep_get(config, "input.bindings", None) or {}))
+        # A referenced path that another one extends is generated as its parent.
+        self.paths: List[str] = sorted(
+            path for path in set(referenced)
+            if path != "routingkey" and not any(other.startswith(f"{path}.") for other in referenced))
+
+    def routingkey(self) -> str:
+        required, negated = routing.parse(self.rng.choice(self.input_keys))
+        parts: List[str] = sorted(required)
+        extra: str = f"k{self.rng.randrange(self.spread)}" if self.spread else ""
+        if extra and extra not in negated:
+            parts.append(extra)
+        return ".".join(parts)
+
+    def value(self, depth: int) -> Any:
+        if depth <= 0:
+            return "".join(self.rng.choices(string.ascii_letters + string.digits, k=self.strings.sample(self.rng)))
+        size: int = self.lists.sample(self.rng)
+        if self.rng.random() < 0.5:
+            return [self.value(depth - 1) for _ in range(size)]
+        return {f"f{index}": self.value(depth - 1) for index in range(size)}
+
+    def message(self) -> Dict[str, Any]:
+        message: Dict[str, Any] = {"routingkey": self.routingkey(), "payload": {"encrypted": {}}}
+        for path in self.paths:
+            Utility.deep_set(message, path, self.value(self.depth.sample(self.rng)))
+        if isinstance(Utility.deep_get(message, "payload.encrypted", None), dict):
+            Utility.encrypt(message, "payload.encrypted", ENCRYPTIONKEY)
+        return message
+
+
+def arrivals(rate: float, poisson: bool = False,
+             rng: Optional[random.Random] = None) -> Generator[float, None, None]:
+    """
+    Send times (seconds from the start) of an open-loop schedule at `rate`
+    messages per second: evenly spaced, or with exponential gaps (a Poisson
+    process) when `poisson` is set. The times never depend on how fast
+    earlier messages were handled.
+    """
+    rng = rng or random.Random()
+    now: float = 0.0
+    while True:
+        yield now
+        now += rng.expovariate(rate) if poisson else 1 / rate
+
+
+def generate(generator: MessageGenerator, rate: float, count: Optional[int] = None,
+             duration: Optional[float] = None, poisson: bool = False) -> Generator[Tuple[float, Any], None, None]:
+    """
+    `(time, message)` records, as `capture.read_capture` yields them, of
+    `count` messages or of `duration` seconds at `rate` messages per second.
+    Feed them to `capture.replay` or `capture.replay_deployment` at speed 1.
+    """
+    if count is None and duration is None:
+        raise ValueError("Give a count or a duration")
+    for number, offset in enumerate(arrivals(rate, poisson, generator.rng)):
+        if (count is not None and number >= count) or (duration is not None and offset >= duration):
+            return
+        yield offset, generator.message()
@@ -0,0 +1,163 @@
+import math
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+
+class Histogram:
+    """
+    An HDR-style histogram of latencies: values (in seconds) are counted in
+    log-linear buckets of `unit` seconds, so every recorded value up to
+    `highest` is kept to `digits` significant decimal digits in constant
+    memory, however many are recorded. Larger values are clamped to `highest`.
+    """
+
+    def __init__(self, unit: float = 1e-6, highest: float = 3600.0, digits: int = 3) -> None:
+        self.unit: float = unit
+        self.highest: int = max(2, int(highest / unit))
+        self.digits: int = digits
+        # Every bucket halves the resolution; a bucket holds `half` sub-buckets
+        # (the first one `2 * half`), enough for `digits` exact digits.
+        self.sub_bits: int = math.ceil(math.log2(2 * 10 ** digits))
+        self.half: int = 1 << (self.sub_bits - 1)
+        self.counts: List[int] = [0] * self.index(self.highest) + [0]
+        self.total: int = 0
+        self.sum: float = 0.0
+        self.minimum: int = 0
+        self.maximum: int = 0
+
+    def index(self, value: int) -> int:
+        bucket: int = max(0, value.bit_length() - self.sub_bits)
+        return bucket * self.half + (value >> bucket)
+
+    def lowest(self, index: int) -> int:
+        """
+        The smallest value (in units) counted at `index`.
+        """
+        bucket: int = max(0, index // self.half - 1)
+        return (index - bucket * self.half) << bucket
+
+    def highest_equivalent(self, index: int) -> int:
+        return self.lowest(index + 1) - 1
+
+    def record(self, seconds: float, count: int = 1) -> None:
+        value: int = min(self.highest, max(0, round(seconds / self.unit)))
+        self.counts[self.index(value)] += count
+        self.minimum = value if not self.total else min(self.minimum, value)
+        self.maximum = max(self.maximum, value)
+        self.total += count
+        self.sum += value * count
+
+    def merge(self, other: "Histogram") -> None:
+        """
+        Add the counts of a histogram with the same unit, range and digits.
+        """
+        if (other.unit, other.highest, other.digits) != (self.unit, self.highest, self.digits):
+            raise ValueError("Histograms of different layouts cannot be merged")
+        if other.total:
+            self.minimum = other.minimum if not self.total else min(self.minimum, other.minimum)
+        for index, count in enumerate(other.counts):
+            self.counts[index] += count
+        self.maximum = max(self.maximum, other.maximum)
+        self.total += other.total
+        self.sum += other.sum
+
+    def value_at(self, p: float) -> float:
+        """
+        The `p`-th percentile (0-100) in seconds: the highest value equivalent
+        to the one at that rank, but never above the largest value recorded.
+        """
+        if not self.total:
+            return 0.0
+        rank: int = max(1, math.ceil(p / 100 * self.total))
+        seen: int = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return min(self.highest_equivalent(index), self.maximum) * self.unit
+        return self.maximum * self.unit
+
+    def mean(self) -> float:
+        return self.sum / self.total * self.unit if self.total else 0.0
+
+    def distribution(self, ticks: int = 5) -> List[Tuple[float, float, int]]:
+        """
+        `(value, percentile, count at or below)` rows with `ticks` rows per
+        halving of the remaining tail, as HdrHistogram prints them.
+        """
+        rows: List[Tuple[float, float, int]] = []
+        filled: List[Tuple[int, int]] = [(index, count) for index, count in enumerate(self.counts) if count]
+        p: float = 0.0
+        seen: int = 0
+        position: int = 0
+        index: int = 0
+        while self.total:
+            rank: int = max(1, math.ceil(p / 100 * self.total))
+            while seen < rank:
+                index, count = filled[position]
+                seen += count
+                position += 1
+            rows.append((min(self.highest_equivalent(index), self.maximum) * self.unit, p, seen))
+            if seen >= self.total:
+                break
+            # Every halving of the remaining tail gets `ticks` rows: 0, 10, ..., 50, 55, ..., 75, 77.5, ...
+            p = min(100.0, p + 50 / 2 ** math.floor(math.log2(100 / (100 - p))) / ticks)
+        return rows
+
+
+class Metrics:
+    """
+    Latencies and throughput of a load run. `start` and `stop` delimit the
+    run; `record` adds one latency in seconds to the `histogram` and may be
+    called from any thread.
+    """
+
+    PERCENTILES: List[float] = [50, 90, 99, 99.9]
+
+    def __init__(self) -> None:
+        self.histogram: Histogram = Histogram()
+        self.started: Optional[float] = None
+        self.stopped: Optional[float] = None
+        self._lock: threading.Lock = threading.Lock()
+
+    def start(self, now: Optional[float] = None) -> None:
+        self.started = time.monotonic() if now is None else now
+
+    def stop(self, now: Optional[float] = None) -> None:
+        self.stopped = time.monotonic() if now is None else now
+
+    def record(self, latency: float) -> None:
+        with self._lock:
+            self.histogram.record(latency)
+
+    def summary(self) -> Dict[str, float]:
+        """
+        Count, duration, throughput (per second) and latency statistics (seconds).
+        """
+        started: float = self.started if self.started is not None else time.monotonic()
+        seconds: float = (self.stopped if self.stopped is not None else time.monotonic()) - started
+        with self._lock:
+            histogram: Histogram = self.histogram
+            result: Dict[str, float] = {
+                "count": histogram.total,
+                "seconds": seconds,
+                "throughput": histogram.total / seconds if seconds > 0 else 0.0,
+                "mean": histogram.mean(),
+            }
+            for p in self.PERCENTILES:
+                result[f"p{p:g}"] = histogram.value_at(p)
+            result["max"] = histogram.maximum * histogram.unit
+        return result
+
+    @staticmethod
+    def format(summary: Dict[str, float]) -> List[str]:
+        """
+        Human-readable lines for a `summary`, latencies in milliseconds.
+        """
+        lines: List[str] = [
+            f"{int(summary['count'])} messages in {summary['seconds']:.3f}s "
+            f"({summary['throughput']:.1f} msg/s)"]
+        for name, value in summary.items():
+            if name not in ("count", "seconds", "throughput"):
+                lines.append(f"{name:>8}  {value * 1000:10.3f} ms")
+        return lines
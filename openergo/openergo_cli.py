@@ -1,15 +1,30 @@
+import itertools
 import json
 import sys
+from contextlib import ExitStack, redirect_stdout
 from functools import wraps
+from typing import Any, Dict, Optional, Tuple
 
 import click
 import pytest
 
 # Absolute imports instead of relative ones
-from openergo.graph import graph as _graph
-from openergo.python_executor import PythonExecutor
+from openergo.analyzer import analyze as _analyze
+from openergo.bash_operation import build_executor
+from openergo.bulk import run_bulk
+from openergo.capture import read_capture, replay as _replay, replay_deployment
+from openergo.dispatcher import Dispatcher
+from openergo.durable import DurableQueue
+from openergo.forkserver import prewarmed_context
+from openergo.graph import graph as _graph, load_configs
+from openergo.loadgen import Distribution, MessageGenerator, generate
+from openergo.metrics import Metrics
 from openergo.quality import quality_check as _quality
-from openergo.spooler import Spooler
+from openergo.registry import registry as _registry
+from openergo.spooler import Spooler, spool_all as _spool_all
+from openergo.utility import Utility
+from openergo import wire
+from openergo.wire import read_frames, write_frame
 
 
 @click.group()
@@ -40,23 +55,69 @@ def with_quality_check(handler):
 @click.argument("path", nargs=-1)
 @click.option("-r", "--routingkey", multiple=True, required=True,
               help="Collection elements for routingkeys")
+@click.option("-f", "--format", "graph_format", type=click.Choice(["render", "dot", "json", "graphml"]),
+              default="render", show_default=True,
+              help="Render and open the diagram, or write DOT source, JSON adjacency or GraphML")
+@click.option("-o", "--output", type=click.Path(dir_okay=False), help="Output file (default: .graph.FORMAT)")
+@click.option("--root", multiple=True, help="Only keep what is downstream of these routing keys")
+@click.option("--depth", type=int, help="Only keep nodes within this many hops of the roots")
 # Add the '-q' flag
 @click.option("-q", is_flag=True, help="Enable quality check")
 @with_quality_check
-def graph(path, routingkey, q):
+def graph(path, routingkey, graph_format, output, root, depth, q):
     """Handler for the `graph` command."""
-    _graph(path, routingkey)
+    topology = _graph(list(path), list(routingkey), graph_format, output, list(root), depth)
+    click.echo(f"{len(topology.nodes)} nodes, {sum(map(len, topology.adjacency.values()))} edges")
     click.echo(f"Graph called with path={path} and routingkey={routingkey}")
 
 
+@click.command()
+@click.argument("path", nargs=-1, required=True)
+@click.option("-r", "--routingkey", multiple=True, required=True, help="Seed routing keys")
+@click.option("--latency", "latency_file", type=click.Path(exists=True, dir_okay=False),
+              help="JSON object of per-component latencies, to estimate the critical path")
+@click.option("--json", "as_json", is_flag=True, help="Print the report as JSON")
+def analyze(path: Tuple[str, ...], routingkey: Tuple[str, ...], latency_file: Optional[str],
+            as_json: bool) -> None:
+    """Handler for the `analyze` command: fan-out, depth, cycles and critical path of a deployment."""
+    latencies = None
+    if latency_file:
+        with open(latency_file, "r", encoding="utf-8") as stream:
+            latencies = json.load(stream)
+    report = _analyze(load_configs(list(path)), list(routingkey), latencies)
+    if as_json:
+        click.echo(json.dumps(report, indent=2))
+        return
+    click.echo(f"Entry components: {', '.join(report['entries']) or '-'}")
+    for name, fan_out in report["fan_out"].items():
+        click.echo(f"{fan_out:6d}  {name}")
+    click.echo(f"Maximum depth: {report['depth']}")
+    for cycle in report["cycles"]:
+        click.echo(f"Cycle: {' -> '.join(cycle)}")
+    click.echo(f"Unreachable: {', '.join(report['unreachable']) or '-'}")
+    click.echo(f"Dead ends: {', '.join(report['dead_ends']) or '-'}")
+    if latencies is not None:
+        click.echo(f"Estimated latency: {report['latency']:g} via {' -> '.join(report['critical_path'])}")
+
+
 @click.command()
 @click.argument("folder_path", type=click.Path(exists=True,
                 file_okay=False, dir_okay=True))
+@click.option("--all", "spool_everything", is_flag=True,
+              help="Treat FOLDER_PATH as a src tree and spool every component in it")
+@click.option("-w", "--workers", default=4, show_default=True,
+              help="Number of projects spooled (and wheels built) in parallel with --all")
+@click.option("--wheelhouse", type=click.Path(file_okay=False, dir_okay=True),
+              help="With --all, also build every project and requirement as a wheel into this folder")
 # Add the '-q' flag
 @click.option("-q", is_flag=True, help="Enable quality check")
 @with_quality_check
-def spool(folder_path, q):
+def spool(folder_path, spool_everything, workers, wheelhouse, q):
     """Handler for the `spool` command."""
+    if spool_everything:
+        click.echo(f"Spooling all projects in {folder_path}...")
+        _spool_all(folder_path, workers=workers, wheelhouse=wheelhouse)
+        return
     click.echo(f"Spooling project from {folder_path}...")
     spooler = Spooler(folder_path)
     spooler.spool()
@@ -75,20 +136,52 @@ def quality():
                 file_okay=True, dir_okay=False))
 @click.option("-a", "--args", multiple=True,
               help="Arguments to be passed to the executor")
+@click.option("--stream", is_flag=True,
+              help="Read messages from stdin and write results to stdout")
+@click.option("--format", "wire_format", type=click.Choice(["json", "binary"]), default="json",
+              show_default=True, help="Message format in stream mode")
+@click.option("--input", "input_path", type=click.Path(exists=True, dir_okay=False),
+              help="Bulk mode: NDJSON file of messages to process")
+@click.option("--output", "output_path", type=click.Path(dir_okay=False),
+              help="Bulk mode: NDJSON file the results are written to")
+@click.option("-w", "--workers", default=4, show_default=True, help="Bulk mode: worker processes")
+@click.option("--chunk-size", default=4 << 20, show_default=True, help="Bulk mode: bytes per work unit")
+@click.option("--checkpoint", type=click.Path(dir_okay=False),
+              help="Bulk mode: checkpoint file (default: OUTPUT.checkpoint)")
+@click.option("--resume", is_flag=True, help="Bulk mode: continue from the checkpoint")
+@click.option("--forkserver", "use_forkserver", is_flag=True,
+              help="Bulk mode: fork workers from a template process that has imported the procedure once")
 # Add the '-q' flag
 @click.option("-q", is_flag=True, help="Enable quality check")
 @with_quality_check
-def run(config_file, args, q):
+def run(config_file, args, stream, wire_format, input_path, output_path, workers, chunk_size,
+        checkpoint, resume, use_forkserver, q):
     """Handler for the `run` command."""
     try:
         with open(config_file, "r", encoding="utf-8") as file:
             config = json.load(file)
 
-        procedure_path = config["shell"]["procedure"]
-        for result in PythonExecutor(procedure_path, config).execute(
-            *[json.loads(arg) for arg in args]):            
-            click.echo(f"Executing procedure at {procedure_path} with args={args}")
-            click.echo(f"Executor result: {result}")
+        procedure_path = Utility.deep_get(config, "shell.procedure", None)
+        if input_path:
+            if not output_path:
+                raise click.UsageError("--input requires --output")
+            if not procedure_path:
+                raise click.UsageError("Bulk mode runs Python procedures only")
+            processed = run_bulk(procedure_path, config, input_path, output_path, workers=workers,
+                                 chunk_size=chunk_size, checkpoint_path=checkpoint, resume=resume,
+                                 context=prewarmed_context(modules=[procedure_path.rsplit(".", 1)[0]])
+                                 if use_forkserver else None)
+            click.echo(f"Processed {processed} records from {input_path} into {output_path}")
+            return
+        if stream:
+            run_stream(config, wire_format)
+            return
+        with build_executor(config) as executor:
+            # A failure under a retry policy is retried (or dead-lettered) before returning.
+            for result in itertools.chain(executor.execute(*[json.loads(arg) for arg in args]),
+                                          executor.drain_retries(wait=True)):
+                click.echo(f"Executing procedure at {procedure_path or config['shell']['command']} with args={args}")
+                click.echo(f"Executor result: {result}")
 
     except FileNotFoundError as e:
         click.echo(f"File not found: {e}", err=True)
@@ -99,6 +192,164 @@ def run(config_file, args, q):
         click.echo(f"IO Error: {e}", err=True)
 
 
+@click.command()
+@click.argument("path", nargs=-1, required=True)
+@click.option("-w", "--workers", default=8, show_default=True,
+              help="Number of procedures imported in parallel")
+def preload(path: Tuple[str, ...], workers: int) -> None:
+    """Handler for the `preload` command: import every procedure of a deploy folder and report import times."""
+    _registry.preload(list(path), workers=workers)
+    for procedure_path, seconds in _registry.report():
+        click.echo(f"{seconds * 1000:10.1f} ms  {procedure_path}")
+    for procedure_path, error in sorted(_registry.errors.items()):
+        click.echo(f"Failed to import {procedure_path}: {error}", err=True)
+
+
+@click.command()
+@click.argument("path", nargs=-1, required=True)
+@click.option("-w", "--workers", type=int, help="Worker processes (default: one per core)")
+@click.option("--window", default=64, show_default=True, help="Messages in flight per worker")
+@click.option("--journal", "journal_path", type=click.Path(dir_okay=False),
+              help="SQLite file that makes every hop durable; unfinished messages are redelivered on restart")
+@click.option("--forkserver", "use_forkserver", is_flag=True,
+              help="Fork workers from a template process that has imported every procedure once")
+@click.option("--reload", "hot_reload", is_flag=True,
+              help="Pick up changed configs and procedure modules while running")
+@click.option("--reload-interval", default=1.0, show_default=True, help="Seconds between checks for changes")
+def dispatch(path: Tuple[str, ...], workers: Optional[int], window: int, journal_path: Optional[str],
+             use_forkserver: bool, hot_reload: bool, reload_interval: float) -> None:
+    """Handler for the `dispatch` command: run a whole deployment on worker processes, stdin to stdout."""
+    out = sys.stdout
+    with ExitStack() as stack:
+        stack.enter_context(redirect_stdout(sys.stderr))
+        journal = stack.enter_context(DurableQueue(journal_path)) if journal_path else None
+        dispatcher = stack.enter_context(
+            Dispatcher(load_configs(list(path)), workers=workers, window=window, journal=journal,
+                       context=prewarmed_context(list(path)) if use_forkserver else None,
+                       reload_folders=list(path) if hot_reload else None, reload_interval=reload_interval))
+        for result in dispatcher.dispatch(Utility.json_stream_to_object(sys.stdin)):
+            out.write(f"{json.dumps(result, default=repr)}\n")
+        if journal:
+            journal.compact()
+    for error in dispatcher.errors:
+        click.echo(error, err=True)
+    out.flush()
+
+
+@click.command()
+@click.argument("capture_file", type=click.Path(exists=True, dir_okay=False))
+@click.option("-c", "--config", "config_file", type=click.Path(exists=True, dir_okay=False),
+              help="Replay through the component of this config")
+@click.option("-d", "--deploy", "deploy_path", multiple=True, type=click.Path(exists=True),
+              help="Replay through the whole deployment in these folders")
+@click.option("-s", "--speed", default=1.0, show_default=True,
+              help="Multiple of the recorded rate; 0 replays as fast as possible")
+@click.option("-w", "--workers", type=int, help="Deployment replay: worker processes (default: one per core)")
+@click.option("--json", "as_json", is_flag=True, help="Print the report as JSON")
+def replay(capture_file: str, config_file: Optional[str], deploy_path: Tuple[str, ...], speed: float,
+           workers: Optional[int], as_json: bool) -> None:
+    """Handler for the `replay` command: re-inject captured traffic and report throughput and latency."""
+    if bool(config_file) == bool(deploy_path):
+        raise click.UsageError("Give exactly one of --config and --deploy")
+    out = sys.stdout
+    with redirect_stdout(sys.stderr):
+        records = read_capture(capture_file)
+        if config_file:
+            with open(config_file, "r", encoding="utf-8") as file:
+                config = json.load(file)
+            # Replayed traffic must not be captured again.
+            config.pop("capture", None)
+            with build_executor(config) as executor:
+                metrics = _replay(records, executor, speed)
+        else:
+            configs = [{key: value for key, value in config.items() if key != "capture"}
+                       for config in load_configs(list(deploy_path))]
+            with Dispatcher(configs, workers=workers) as dispatcher:
+                metrics = replay_deployment(records, dispatcher, speed)
+    summary = metrics.summary()
+    out.write(f"{json.dumps(summary, indent=2)}\n" if as_json else "".join(f"{line}\n" for line in Metrics.format(summary)))
+    out.flush()
+
+
+@click.command()
+@click.argument("config_file", type=click.Path(exists=True, dir_okay=False))
+@click.option("-r", "--rate", default=100.0, show_default=True, help="Messages per second")
+@click.option("-n", "--count", type=int, help="Number of messages to send")
+@click.option("-t", "--duration", type=float, help="Seconds to send for (default: 10 unless --count is given)")
+@click.option("--poisson", is_flag=True, help="Exponential gaps between messages instead of even spacing")
+@click.option("--strings", default="uniform:8:32", show_default=True, help="Distribution of string lengths")
+@click.option("--depth", default="fixed:0", show_default=True, help="Distribution of value nesting depths")
+@click.option("--lists", default="uniform:1:4", show_default=True, help="Distribution of list and object sizes")
+@click.option("--seed", type=int, help="Random seed, for reproducible messages")
+@click.option("-c", "--concurrency", default=8, show_default=True,
+              help="Threads that execute due messages, so a slow message does not delay the next")
+@click.option("-d", "--deploy", "deploy_path", multiple=True, type=click.Path(exists=True),
+              help="Send into the whole deployment in these folders instead of CONFIG_FILE's component")
+@click.option("-w", "--workers", type=int, help="Deployment load: worker processes (default: one per core)")
+@click.option("--histogram", is_flag=True, help="Also print the latency percentile distribution")
+@click.option("--json", "as_json", is_flag=True, help="Print the report as JSON")
+def load(config_file: str, rate: float, count: Optional[int], duration: Optional[float], poisson: bool,
+         strings: str, depth: str, lists: str, seed: Optional[int], concurrency: int,
+         deploy_path: Tuple[str, ...], workers: Optional[int], histogram: bool, as_json: bool) -> None:
+    """Handler for the `load` command: send synthetic messages for a config at a fixed rate."""
+    with open(config_file, "r", encoding="utf-8") as file:
+        config = json.load(file)
+    config.pop("capture", None)
+    try:
+        generator = MessageGenerator(config, Distribution.parse(strings), Distribution.parse(depth),
+                                     Distribution.parse(lists), seed=seed)
+    except ValueError as e:
+        raise click.UsageError(str(e)) from e
+    records = generate(generator, rate, count, duration if duration or count else 10.0, poisson)
+    out = sys.stdout
+    with redirect_stdout(sys.stderr):
+        if deploy_path:
+            configs = [{key: value for key, value in component.items() if key != "capture"}
+                       for component in load_configs(list(deploy_path))]
+            with Dispatcher(configs, workers=workers) as dispatcher:
+                metrics = replay_deployment(records, dispatcher)
+        else:
+            with build_executor(config) as executor:
+                metrics = _replay(records, executor, concurrency=concurrency)
+    summary = metrics.summary()
+    rows = metrics.histogram.distribution()
+    if as_json:
+        report = {**summary, "distribution": rows} if histogram else summary
+        out.write(f"{json.dumps(report, indent=2)}\n")
+    else:
+        out.write("".join(f"{line}\n" for line in Metrics.format(summary)))
+        if histogram:
+            out.write(f"{'Value (ms)':>12} {'Percentile':>12} {'TotalCount':>10} {'1/(1-Percentile)':>16}\n")
+            for value, percentile, below in rows:
+                inverse = f"{100 / (100 - percentile):16.2f}" if percentile < 100 else f"{'inf':>16}"
+                out.write(f"{value * 1000:12.3f} {percentile / 100:12.6f} {below:10d} {inverse}\n")
+    out.flush()
+
+
+def run_stream(config: Dict[str, Any], wire_format: str) -> None:
+    """
+    Pipe stdin through the executor: concatenated JSON messages in, one JSON
+    result per line out; or, with the binary format, length-prefixed
+    envelopes both ways.
+    """
+    config = {**config, "wire": {**config.get("wire", {}), "format": wire_format}}
+    out = sys.stdout
+    # Results own stdout; the executor's tracing goes to stderr.
+    with redirect_stdout(sys.stderr), build_executor(config) as executor:
+        if wire_format == "binary":
+            for result in executor.pipeline(read_frames(sys.stdin.buffer)):
+                write_frame(out.buffer, result)
+            # Windows still open when the input ends are handed on as they are.
+            for result in executor.flush_windows():
+                write_frame(out.buffer, wire.pack({"payload": result}))
+        else:
+            for result in executor.pipeline(Utility.json_stream_to_object(sys.stdin)):
+                out.write(f"{json.dumps(result)}\n")
+            for result in executor.flush_windows():
+                out.write(f"{json.dumps(result)}\n")
+    out.flush()
+
+
 def run_tests():
     """Run tests with coverage before executing any command."""
     click.echo("Running tests with coverage...")
@@ -120,6 +371,11 @@ main.add_command(graph)
 main.add_command(spool)
 main.add_command(quality)  # No decorator needed for 'quality'
 main.add_command(run)
+main.add_command(preload)
+main.add_command(analyze)
+main.add_command(dispatch)
+main.add_command(replay)
+main.add_command(load)
 
 
 if __name__ == "__main__":
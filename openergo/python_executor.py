@@ -1,23 +1,26 @@
-import importlib
 from types import FunctionType
-from typing import Any, Callable, Dict, Union
+from typing import Any, Callable, Dict, Optional, Union
 
 from openergo.executor import Executor
+from openergo.registry import ProcedureRegistry, registry as default_registry
 
 
 class PythonExecutor(Executor):
     """
     A concrete implementation of `Executor` that supports Python callables
     and fully qualified string paths for functions.
+
+    String paths are resolved through a `ProcedureRegistry` (the process-wide
+    one by default), either immediately or, with `lazy=True`, on first call.
     """
 
     def __init__(
-            self, function: Union[Callable[..., Any], str], config: Dict[str, Any]) -> None:
+            self, function: Union[Callable[..., Any], str], config: Dict[str, Any],
+            registry: Optional[ProcedureRegistry] = None, lazy: bool = False) -> None:
+        registry = registry or default_registry
         # Resolve the function if it's a string, otherwise use it directly
         if isinstance(function, str):
-            module_path, func_name = function.rsplit(".", 1)
-            module = importlib.import_module(module_path)
-            resolved_function: Callable[..., Any] = getattr(module, func_name)
+            resolved_function: Callable[..., Any] = registry.lazy(function) if lazy else registry.resolve(function)
         elif isinstance(function, FunctionType):
             resolved_function = function
         else:
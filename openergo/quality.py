@@ -1,22 +1,33 @@
+import json
+import os
 import subprocess
 import sys
-from typing import List, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
 
+from openergo.utility import Utility
 
-def quality_check(mod: str = "./openergo", fail_fast: bool = True) -> None:
-    """
-    Run code quality checks, linting, and tests on the given module.
+CACHE_FILE: str = ".quality-cache.json"
 
-    Args:
-        mod: Path to the module to check (default: './openergo').
-        fail_fast: If True, stop on the first failure. If False, continue running all checks even if they fail.
+
+def formatters(mod: str) -> List[Tuple[str, str]]:
     """
-    steps: List[Tuple[str, str]] = [
+    Steps that rewrite files; they run one after another, before the analyzers.
+    """
+    return [
         (
             f"autopep8 --in-place --aggressive --recursive {mod}",
             "Formatting code (autopep8)"),
         (f"black -S --line-length 120 {mod}", "Formatting code (black)"),
         (f"isort {mod}", "Sorting imports (isort)"),
+    ]
+
+
+def analyzers(mod: str) -> List[Tuple[str, str]]:
+    """
+    Read-only steps; they run in parallel.
+    """
+    return [
         (
             f"mypy --strict --implicit-reexport --explicit-package-bases --ignore-missing-imports {mod}",
             "Type Checking (mypy)",
@@ -33,13 +44,121 @@ def quality_check(mod: str = "./openergo", fail_fast: bool = True) -> None:
          "Complexity check (radon, enforcing A grade)"),
     ]
 
-    for command, description in steps:
-        run_command(command, description, fail_fast)
 
+def tree_hash(paths: List[str]) -> str:
+    """
+    Content hash of every file below `paths` (caches excluded), including
+    the relative paths, so renames count as changes too.
+    """
+    entries: List[str] = []
+    for root_path in paths:
+        for root, dirs, files in os.walk(root_path):
+            dirs[:] = sorted(d for d in dirs if d != "__pycache__" and not d.startswith("."))
+            for name in sorted(files):
+                if name.endswith(".pyc") or name == CACHE_FILE:
+                    continue
+                path: str = os.path.join(root, name)
+                with open(path, "rb") as stream:
+                    entries.append(f"{path}:{Utility.fast_hash(stream.read())}")
+    return Utility.fast_hash("\n".join(entries))
+
+
+def load_cache(path: str) -> Dict[str, Any]:
+    try:
+        with open(path, "r", encoding="utf-8") as stream:
+            cache: Dict[str, Any] = json.load(stream)
+    except (OSError, ValueError):
+        return {}
+    return cache
+
+
+def save_cache(path: str, cache: Dict[str, Any]) -> None:
+    temporary: str = f"{path}.tmp"
+    with open(temporary, "w", encoding="utf-8") as stream:
+        json.dump(cache, stream, indent=2)
+    os.replace(temporary, path)
+
+
+def quality_check(mod: str = "./openergo", fail_fast: bool = True, workers: int = 4,
+                  cache_path: Optional[str] = CACHE_FILE) -> None:
+    """
+    Run code quality checks, linting, and tests on the given module.
+
+    Formatters run first, one after another; the read-only analyzers then run
+    in parallel. A step's result is cached against a content hash of the
+    checked tree (`mod` and `./tests`), so steps are skipped for code they
+    already checked.
+
+    Args:
+        mod: Path to the module to check (default: './openergo').
+        fail_fast: If True, stop on the first failure. If False, continue running all checks even if they fail.
+        workers: How many analyzers run at once.
+        cache_path: File the results are cached in; None disables the cache.
+    """
+    cache: Dict[str, Any] = load_cache(cache_path) if cache_path else {}
+    paths: List[str] = [path for path in (mod, "./tests") if os.path.isdir(path)]
+    failures: List[int] = []
+
+    def record(command: str, digest: str, returncode: int, output: str) -> None:
+        cache[command] = {"hash": digest, "returncode": returncode, "output": output}
+        if cache_path:
+            save_cache(cache_path, cache)
+
+    for command, description in formatters(mod):
+        digest: str = tree_hash(paths)
+        if cache.get(command, {}).get("hash") == digest:
+            print(f"\033[1m{description}... (unchanged, skipped)\033[0m")
+            continue
+        returncode, output = run_command(command, description, fail_fast)
+        if returncode:
+            failures.append(returncode)
+        # Cache against the tree as the formatter left it.
+        record(command, tree_hash(paths), returncode, output)
+
+    digest = tree_hash(paths)
+    pending: List[Tuple[str, str]] = []
+    for command, description in analyzers(mod):
+        cached: Dict[str, Any] = cache.get(command, {})
+        if cached.get("hash") == digest:
+            print(f"\033[1m{description}... (unchanged, cached)\033[0m")
+            report(description, cached["returncode"], cached["output"], fail_fast)
+            if cached["returncode"]:
+                failures.append(cached["returncode"])
+        else:
+            pending.append((command, description))
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        results = list(pool.map(lambda step: capture(step[0]), pending))
+    for (command, description), (returncode, output) in zip(pending, results):
+        print(f"\033[1m{description}...\033[0m")
+        report(description, returncode, output, fail_fast)
+        if returncode:
+            failures.append(returncode)
+        record(command, digest, returncode, output)
+
+    if failures:
+        if fail_fast:
+            sys.exit(failures[0])
+        return
     print("\033[32mAll checks passed successfully.\033[0m")
 
 
-def run_command(command: str, description: str, fail_fast: bool) -> None:
+def capture(command: str) -> Tuple[int, str]:
+    completed: subprocess.CompletedProcess[str] = subprocess.run(
+        command, shell=True, check=False, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    return completed.returncode, completed.stdout
+
+
+def report(description: str, returncode: int, output: str, fail_fast: bool) -> None:
+    sys.stdout.write(output)
+    if returncode:
+        print(
+            f"\033[31m{description} failed with return code {returncode}. "
+            f"{'Aborting.' if fail_fast else 'Continuing.'}\033[0m"
+        )
+
+
+def run_command(command: str, description: str, fail_fast: bool) -> Tuple[int, str]:
     """
     Run a shell command with a description.
     Exit the script if the command fails (if fail_fast is True).
@@ -48,15 +167,13 @@ def run_command(command: str, description: str, fail_fast: bool) -> None:
         command: Shell command to execute.
         description: Description of the action being performed.
         fail_fast: If True, exit on failure. If False, continue even if the command fails.
+
+    Returns:
+        Tuple[int, str]: The return code and the combined output.
     """
     print(f"\033[1m{description}...\033[0m")
-    try:
-        subprocess.run(command, shell=True, check=True)
-    except subprocess.CalledProcessError as e:
-        print(
-            f"\033[31m{description} failed with return code {
-                e.returncode}. {
-                'Aborting.' if fail_fast else 'Continuing.'}\033[0m"
-        )
-        if fail_fast:
-            sys.exit(e.returncode)
+    returncode, output = capture(command)
+    report(description, returncode, output, fail_fast)
+    if returncode and fail_fast:
+        sys.exit(returncode)
+    return returncode, output
@@ -0,0 +1,103 @@
+import importlib
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import ModuleType
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from openergo.graph import load_configs
+from openergo.utility import Utility
+
+
+class ProcedureRegistry:
+    """
+    Resolves dotted procedure paths (`package.module.function`) once per
+    process and remembers how long each import took.
+
+    A resolved procedure is reused for as long as its module is still the one
+    registered in `sys.modules`, so reloading or replacing a module is picked
+    up on the next lookup.
+    """
+
+    def __init__(self) -> None:
+        self._procedures: Dict[str, Tuple[ModuleType, Callable[..., Any]]] = {}
+        self._lock: threading.Lock = threading.Lock()
+        self.timings: Dict[str, float] = {}
+        self.errors: Dict[str, Exception] = {}
+
+    def resolve(self, path: str) -> Callable[..., Any]:
+        """
+        Returns the callable at `path`, importing its module on first use.
+        """
+        module_path, func_name = path.rsplit(".", 1)
+        cached = self._procedures.get(path)
+        if cached is not None and sys.modules.get(module_path) is cached[0]:
+            return cached[1]
+
+        started: float = time.perf_counter()
+        module: ModuleType = importlib.import_module(module_path)
+        procedure: Callable[..., Any] = getattr(module, func_name)
+        with self._lock:
+            self.timings[path] = time.perf_counter() - started
+            self._procedures[path] = (module, procedure)
+            self.errors.pop(path, None)
+        return procedure
+
+    def lazy(self, path: str) -> Callable[..., Any]:
+        """
+        Returns a stand-in for the callable at `path` that is only imported
+        when it is first called.
+        """
+        def procedure(*args: Any, **kwargs: Any) -> Any:
+            return self.resolve(path)(*args, **kwargs)
+
+        procedure.__name__ = path.rsplit(".", 1)[-1]
+        procedure.__qualname__ = path
+        return procedure
+
+    def invalidate(self, path: Optional[str] = None) -> None:
+        """
+        Forget one resolved procedure, or all of them.
+        """
+        with self._lock:
+            if path is None:
+                self._procedures.clear()
+            else:
+                self._procedures.pop(path, None)
+
+    def preload(self, folders: List[str], workers: int = 8) -> Dict[str, float]:
+        """
+        Import the procedures of every Python config found in `folders`, in
+        parallel. Failures are collected in `errors` rather than raised, so
+        one broken component does not prevent the others from warming up.
+
+        Returns:
+            Dict[str, float]: Import time in seconds per procedure path.
+        """
+        paths: List[str] = sorted({
+            Utility.deep_get(config, "shell.procedure", None)
+            for config in load_configs(folders)
+            if Utility.deep_get(config, "shell.procedure", None)
+            and Utility.deep_get(config, "shell.language", "python") == "python"
+        })
+
+        def attempt(path: str) -> None:
+            try:
+                self.resolve(path)
+            except (ImportError, AttributeError, ValueError) as e:
+                with self._lock:
+                    self.errors[path] = e
+
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            list(pool.map(attempt, paths))
+        return {path: self.timings[path] for path in paths if path in self.timings}
+
+    def report(self) -> List[Tuple[str, float]]:
+        """
+        Import timings, slowest first.
+        """
+        return sorted(self.timings.items(), key=lambda item: item[1], reverse=True)
+
+
+registry: ProcedureRegistry = ProcedureRegistry()
@@ -0,0 +1,191 @@
+import importlib
+import os
+import sys
+import threading
+from types import ModuleType
+from typing import Any, Dict, Generator, List, Optional, Set, Tuple
+
+from openergo.bash_operation import build_executor, runnable
+from openergo.config_store import ConfigStore
+from openergo.executor import Executor
+from openergo.registry import ProcedureRegistry, registry as default_registry
+from openergo.utility import Utility
+
+
+class HotReloader:
+    """
+    Keeps one executor per component of a set of deploy folders and
+    rebuilds only the components whose config file or Python procedure
+    module changed.
+
+    A rebuilt executor is swapped in atomically: messages started before the
+    swap finish on the executor they started on, messages started after it
+    use the new one. Replaced executors are retired and `drain` waits until
+    their in-flight generators have finished, then closes them. `stop`
+    closes every executor.
+    """
+
+    def __init__(self, folders: List[str], registry: Optional[ProcedureRegistry] = None) -> None:
+        self.registry: ProcedureRegistry = registry or default_registry
+        self.store: ConfigStore = ConfigStore(folders)
+        self.errors: Dict[str, Exception] = {}
+        self._executors: Dict[str, Executor] = {}
+        self._configs: Dict[str, Dict[str, Any]] = {}
+        self._sources: Dict[str, str] = {}
+        self._modules: Dict[str, int] = {}
+        self._inflight: Dict[int, int] = {}
+        self._retired: List[Executor] = []
+        self._condition: threading.Condition = threading.Condition()
+        self._stop: threading.Event = threading.Event()
+        self.store.refresh()
+        self._rebuild(set(self.store.paths()))
+
+    def names(self) -> List[str]:
+        with self._condition:
+            return sorted(self._executors)
+
+    def config(self, name: str) -> Dict[str, Any]:
+        with self._condition:
+            return self._configs[name]
+
+    def executor(self, name: str) -> Executor:
+        with self._condition:
+            return self._executors[name]
+
+    def execute(self, name: str, *args: Any, **kwargs: Any) -> Generator[Any, None, None]:
+        """
+        Run one message through the current executor of component `name`.
+        The executor is picked when the generator starts, so a swap never
+        happens in the middle of a message.
+        """
+        with self._condition:
+            executor: Executor = self._executors[name]
+            self._inflight[id(executor)] = self._inflight.get(id(executor), 0) + 1
+        try:
+            yield from executor.execute(*args, **kwargs)
+        finally:
+            with self._condition:
+                self._inflight[id(executor)] -= 1
+                if not self._inflight[id(executor)]:
+                    del self._inflight[id(executor)]
+                self._condition.notify_all()
+
+    def check(self) -> List[str]:
+        """
+        Re-read changed config files, reload changed procedure modules and
+        swap in fresh executors for the affected components.
+
+        Returns:
+            List[str]: The names of the components that were rebuilt or removed.
+        """
+        paths: Set[str] = set(self.store.refresh())
+        modules: Set[str] = set()
+        for module_name in self._changed_modules():
+            self._modules[module_name] = self._mtime(sys.modules[module_name])
+            try:
+                importlib.reload(sys.modules[module_name])
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                self.errors[module_name] = e
+                print(f"\033[33mFailed to reload {module_name}: {e}\033[0m")
+                continue
+            self.errors.pop(module_name, None)
+            modules.add(module_name)
+        with self._condition:
+            paths |= {self._sources[name] for name, config in self._configs.items()
+                      if self._module_of(config) in modules}
+        return self._rebuild(paths)
+
+    def drain(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until no message is running on a retired executor, then close
+        the retired executors and let them go.
+
+        Returns:
+            bool: False if `timeout` expired first.
+        """
+        with self._condition:
+            drained: bool = self._condition.wait_for(
+                lambda: not any(id(executor) in self._inflight for executor in self._retired), timeout)
+            retired: List[Executor] = []
+            if drained:
+                retired, self._retired = self._retired, []
+        for executor in retired:
+            executor.close()
+        return drained
+
+    def watch(self, interval: float = 1.0) -> threading.Thread:
+        """
+        Call `check` every `interval` seconds on a daemon thread until `stop`.
+        """
+        self._stop.clear()
+
+        def poll() -> None:
+            while not self._stop.wait(interval):
+                reloaded: List[str] = self.check()
+                if reloaded:
+                    print(f"Reloaded {', '.join(reloaded)}")
+
+        watcher: threading.Thread = threading.Thread(target=poll, daemon=True)
+        watcher.start()
+        return watcher
+
+    def stop(self) -> None:
+        """
+        Stop the watcher and close every executor, live or retired.
+        """
+        self._stop.set()
+        with self._condition:
+            executors: List[Executor] = [*self._executors.values(), *self._retired]
+            self._executors, self._retired = {}, []
+        for executor in executors:
+            executor.close()
+
+    def _rebuild(self, paths: Set[str]) -> List[str]:
+        built: Dict[str, Tuple[str, Dict[str, Any], Executor]] = {}
+        for path in sorted(paths):
+            for config in self.store.configs_in(path):
+                if not runnable(config):
+                    continue
+                procedure: Optional[str] = Utility.deep_get(config, "shell.procedure", None)
+                if procedure:
+                    self.registry.invalidate(procedure)
+                try:
+                    executor: Executor = build_executor(config, registry=self.registry)
+                except (ImportError, AttributeError, ValueError, OSError) as e:
+                    self.errors[config["name"]] = e
+                    print(f"\033[33mFailed to build {config['name']}: {e}\033[0m")
+                    continue
+                self.errors.pop(config["name"], None)
+                built[config["name"]] = (path, config, executor)
+                module_name: str = self._module_of(config)
+                if module_name in sys.modules and module_name not in self._modules:
+                    self._modules[module_name] = self._mtime(sys.modules[module_name])
+
+        with self._condition:
+            removed: List[str] = [
+                name for name, source in self._sources.items()
+                if source in paths and name not in built and name not in self.errors]
+            for name in removed:
+                self._retired.append(self._executors.pop(name))
+                del self._configs[name], self._sources[name]
+            for name, (path, config, executor) in built.items():
+                if name in self._executors:
+                    self._retired.append(self._executors[name])
+                self._executors[name], self._configs[name], self._sources[name] = executor, config, path
+        return sorted(set(built) | set(removed))
+
+    def _changed_modules(self) -> Set[str]:
+        return {
+            module_name for module_name, mtime in self._modules.items()
+            if module_name in sys.modules and self._mtime(sys.modules[module_name]) != mtime}
+
+    @staticmethod
+    def _module_of(config: Dict[str, Any]) -> str:
+        return str(Utility.deep_get(config, "shell.procedure", "")).rsplit(".", 1)[0]
+
+    @staticmethod
+    def _mtime(module: ModuleType) -> int:
+        try:
+            return os.stat(str(module.__file__)).st_mtime_ns
+        except (OSError, TypeError):
+            return 0
@@ -0,0 +1,153 @@
+import random
+import threading
+import time
+import traceback
+from typing import Any, Dict, List, Optional, Tuple
+
+from openergo.durable import DurableQueue
+
+
+class TimerWheel:
+    """
+    A hashed timing wheel: scheduling and expiring are O(1) per item, with a
+    resolution of `tick` seconds. Items more than one revolution away wait
+    in their slot for the remaining number of rounds.
+    """
+
+    def __init__(self, tick: float = 0.01, slots: int = 512) -> None:
+        self.tick: float = tick
+        self._slots: List[List[Tuple[int, Any]]] = [[] for _ in range(slots)]
+        self._current: int = int(time.monotonic() / tick)
+        self._count: int = 0
+        self._lock: threading.Lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def schedule(self, delay: float, item: Any, now: Optional[float] = None) -> None:
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            target: int = max(int((now + delay) / self.tick), self._current + 1)
+            ticks: int = target - self._current
+            self._slots[target % len(self._slots)].append(((ticks - 1) // len(self._slots), item))
+            self._count += 1
+
+    def expire(self, now: Optional[float] = None) -> List[Any]:
+        """
+        Advance the wheel to `now` and return the items that became due.
+        """
+        target: int = int((time.monotonic() if now is None else now) / self.tick)
+        due: List[Any] = []
+        with self._lock:
+            # After a long pause, the revolutions before the last one only
+            # count down rounds; each slot is then visited once.
+            skipped: int = max(0, target - self._current - len(self._slots))
+            for offset in range(min(skipped, len(self._slots))):
+                visits: int = skipped // len(self._slots) + int(offset < skipped % len(self._slots))
+                index: int = (self._current + 1 + offset) % len(self._slots)
+                self._slots[index] = [(rounds - visits, item) for rounds, item in self._slots[index]]
+            for tick in range(max(self._current, target - len(self._slots)) + 1, target + 1):
+                slot: List[Tuple[int, Any]] = self._slots[tick % len(self._slots)]
+                waiting: List[Tuple[int, Any]] = []
+                for rounds, item in slot:
+                    if rounds <= 0:
+                        due.append(item)
+                    else:
+                        waiting.append((rounds - 1, item))
+                self._slots[tick % len(self._slots)] = waiting
+            self._current = max(self._current, target)
+            self._count -= len(due)
+        return due
+
+
+class RetryPolicy:
+    """
+    How often and how late a failed message is retried: at most `attempts`
+    executions in total, the n-th retry after `backoff * multiplier ** (n - 1)`
+    seconds (capped at `max_backoff`), spread by +/- `jitter` of that delay.
+    """
+
+    def __init__(self, attempts: int = 3, backoff: float = 0.5, multiplier: float = 2.0,
+                 max_backoff: float = 60.0, jitter: float = 0.1) -> None:
+        self.attempts: int = attempts
+        self.backoff: float = backoff
+        self.multiplier: float = multiplier
+        self.max_backoff: float = max_backoff
+        self.jitter: float = jitter
+
+    @classmethod
+    def from_config(cls, section: Dict[str, Any]) -> "RetryPolicy":
+        """
+        Build a policy from a config's `retry` section, e.g.
+        `{"attempts": 5, "backoff": 0.2, "multiplier": 2, "max_backoff": 30, "jitter": 0.1}`.
+        """
+        return cls(
+            attempts=section.get("attempts", 3),
+            backoff=section.get("backoff", 0.5),
+            multiplier=section.get("multiplier", 2.0),
+            max_backoff=section.get("max_backoff", 60.0),
+            jitter=section.get("jitter", 0.1),
+        )
+
+    def delay(self, attempt: int) -> float:
+        """
+        Seconds to wait after the `attempt`-th failed execution.
+        """
+        base: float = min(self.backoff * self.multiplier ** (attempt - 1), self.max_backoff)
+        return max(0.0, base * (1 + random.uniform(-self.jitter, self.jitter)))
+
+
+class RetryScheduler:
+    """
+    Holds failed messages until their retry is due, and dead-letters those
+    that ran out of attempts: into a `DurableQueue` when one is given, into
+    the `dead` list otherwise. A dead letter keeps the original envelope,
+    the error and its traceback.
+    """
+
+    def __init__(self, policy: RetryPolicy, sink: Optional[DurableQueue] = None, tick: float = 0.01) -> None:
+        self.policy: RetryPolicy = policy
+        self.sink: Optional[DurableQueue] = sink
+        self.wheel: TimerWheel = TimerWheel(tick)
+        self.dead: List[Dict[str, Any]] = []
+        self.retried: int = 0
+        self.deadlettered: int = 0
+
+    @classmethod
+    def from_config(cls, section: Dict[str, Any]) -> "RetryScheduler":
+        deadletter: Optional[str] = section.get("deadletter")
+        return cls(RetryPolicy.from_config(section), DurableQueue(deadletter) if deadletter else None)
+
+    def fail(self, envelope: Any, attempt: int, error: BaseException) -> None:
+        """
+        Record that execution number `attempt` of `envelope` raised `error`.
+        """
+        if attempt < self.policy.attempts:
+            delay: float = self.policy.delay(attempt)
+            print(f"Attempt {attempt} failed with {error!r}; retrying in {delay:.3f}s")
+            self.wheel.schedule(delay, (envelope, attempt + 1))
+            return
+        letter: Dict[str, Any] = {
+            "routingkey": "deadletter",
+            "envelope": envelope,
+            "error": repr(error),
+            "traceback": "".join(traceback.format_exception(error)),
+            "attempts": attempt,
+        }
+        print(f"Attempt {attempt} failed with {error!r}; dead-lettering the message")
+        self.deadlettered += 1
+        if self.sink is not None:
+            self.sink.put(letter)
+        else:
+            self.dead.append(letter)
+
+    def due(self) -> List[Tuple[Any, int]]:
+        """
+        The `(envelope, attempt)` pairs whose retry is due now.
+        """
+        items: List[Tuple[Any, int]] = self.wheel.expire()
+        self.retried += len(items)
+        return items
+
+    def pending(self) -> int:
+        return len(self.wheel)
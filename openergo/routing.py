@@ -0,0 +1,89 @@
+import re
+from typing import List, Optional, Set, Tuple
+
+
+def parts(routingkey: str) -> Set[str]:
+    """
+    Split a routing key into its set of (non-empty) parts.
+    """
+    return {part for part in routingkey.split(".") if part}
+
+
+def normalize(routingkey: str) -> str:
+    """
+    Canonical form of a routing key: unique parts, sorted, dot-joined.
+    """
+    return ".".join(sorted(parts(routingkey)))
+
+
+def parse(input_key: str) -> Tuple[Set[str], Set[str]]:
+    """
+    Split an input key into its required and its negated (`~`) parts.
+    """
+    required: Set[str] = set()
+    negated: Set[str] = set()
+    for part in parts(input_key):
+        if part.startswith("~"):
+            negated.add(part[1:])
+        else:
+            required.add(part)
+    return required, negated
+
+
+def matches(input_key: str, routingkey: str) -> bool:
+    """
+    True when every required part of `input_key` is present in `routingkey`
+    and none of its negated parts are.
+    """
+    required, negated = parse(input_key)
+    routing_parts: Set[str] = parts(routingkey)
+    return required <= routing_parts and not negated & routing_parts
+
+
+def match(input_keys: List[str], routingkey: str) -> Optional[str]:
+    """
+    First input key that accepts `routingkey`, or None.
+    """
+    for input_key in input_keys:
+        if matches(input_key, routingkey):
+            return input_key
+    return None
+
+
+def remainder(input_key: str, routingkey: str) -> str:
+    """
+    The parts of `routingkey` not consumed by `input_key`; what `?` expands to.
+    """
+    return ".".join(sorted(parts(routingkey) - parts(input_key)))
+
+
+def derive(input_key: str, output_key: str, routingkey: str) -> str:
+    """
+    Substitute the `?` placeholders of `output_key` with the remainder of
+    `routingkey` after `input_key` has been consumed.
+    """
+    return RoutingKeyTemplate(output_key).derive(input_key, routingkey)
+
+
+class RoutingKeyTemplate:
+    """
+    An output key compiled once, so that deriving the outbound routing key
+    per message is a join rather than a regex substitution.
+    """
+
+    def __init__(self, output_key: str) -> None:
+        self.output_key: str = output_key
+        self._segments: List[str] = re.split(r"\?", output_key)
+
+    @property
+    def is_derived(self) -> bool:
+        return len(self._segments) > 1
+
+    def derive(self, input_key: str, routingkey: str) -> str:
+        if not self.is_derived:
+            return self.output_key
+        derived: str = remainder(input_key, routingkey).join(self._segments)
+        return ".".join(part for part in derived.split(".") if part)
+
+    def __repr__(self) -> str:
+        return f"RoutingKeyTemplate({self.output_key!r})"
@@ -1,10 +1,20 @@
 import argparse
+import fnmatch
+import hashlib
+import json
 import os
+import re
 import shutil
-from typing import List
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
 
 
 class Spooler:
+    IGNORE_PATTERNS = ("*.toml", "*.md", "*.txt", "__pycache__")
+    MANIFEST = ".manifest.json"
+
     folder_path: str
     project_name: str
     spool_dir: str
@@ -24,16 +34,96 @@ class Spooler:
             self.project_spool_path, self.project_name)
         self.requirements_txt = []
 
-    def setup_project_structure(self) -> None:
-        os.makedirs(self.spool_dir, exist_ok=True)
+    @staticmethod
+    def file_hash(path: str) -> str:
+        digest = hashlib.md5()
+        with open(path, "rb") as stream:
+            for block in iter(lambda: stream.read(1 << 20), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def source_files(self, previous: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Content hashes of the files that get spooled, keyed by relative path.
+        Files whose size and mtime match `previous` are not re-read.
+        """
+        previous = previous or {}
+        files: Dict[str, Any] = {}
+        for root, dirs, names in os.walk(self.folder_path):
+            dirs[:] = sorted(d for d in dirs if not self._ignored(d))
+            for name in sorted(names):
+                if self._ignored(name):
+                    continue
+                path: str = os.path.join(root, name)
+                relative: str = os.path.relpath(path, self.folder_path)
+                stat = os.stat(path)
+                known: Optional[Dict[str, Any]] = previous.get(relative)
+                if known and known["size"] == stat.st_size and known["mtime"] == stat.st_mtime_ns:
+                    files[relative] = known
+                else:
+                    files[relative] = {"hash": self.file_hash(path), "size": stat.st_size, "mtime": stat.st_mtime_ns}
+        return files
+
+    def setup_inputs(self) -> str:
+        """
+        Hash of everything setup.py is generated (or copied) from.
+        """
+        digest = hashlib.md5(self.project_name.encode("utf-8"))
+        for name in ("requirements.txt", "setup.py"):
+            path: str = os.path.join(self.folder_path, name)
+            digest.update(f"{name}:{self.file_hash(path) if os.path.exists(path) else ''};".encode("utf-8"))
+        return digest.hexdigest()
+
+    def load_manifest(self) -> Dict[str, Any]:
+        try:
+            with open(os.path.join(self.project_spool_path, self.MANIFEST), "r", encoding="utf-8") as f:
+                return dict(json.load(f))
+        except (OSError, ValueError):
+            return {}
+
+    def save_manifest(self, manifest: Dict[str, Any]) -> None:
         os.makedirs(self.project_spool_path, exist_ok=True)
-        shutil.copytree(
-            self.folder_path,
-            self.package_dir,
-            ignore=shutil.ignore_patterns(
-                "*.toml", "*.md", "*.txt", "__pycache__"),
-            dirs_exist_ok=True,
+        with open(os.path.join(self.project_spool_path, self.MANIFEST), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=1, sort_keys=True)
+
+    def build_manifest(self) -> Dict[str, Any]:
+        return {
+            "files": self.source_files(self.load_manifest().get("files")),
+            "setup": self.setup_inputs(),
+        }
+
+    def is_up_to_date(self, manifest: Dict[str, Any]) -> bool:
+        previous: Dict[str, Any] = self.load_manifest()
+        return (
+            self._hashes(previous.get("files", {})) == self._hashes(manifest["files"])
+            and previous.get("setup") == manifest["setup"]
+            and os.path.isdir(self.package_dir)
+            and os.path.exists(os.path.join(self.project_spool_path, "setup.py"))
         )
+
+    def _ignored(self, name: str) -> bool:
+        return any(fnmatch.fnmatch(name, pattern) for pattern in self.IGNORE_PATTERNS)
+
+    @staticmethod
+    def _hashes(files: Dict[str, Any]) -> Dict[str, str]:
+        return {path: entry["hash"] for path, entry in files.items()}
+
+    def setup_project_structure(self, files: Optional[Dict[str, Any]] = None) -> None:
+        os.makedirs(self.spool_dir, exist_ok=True)
+        os.makedirs(self.project_spool_path, exist_ok=True)
+        previous: Dict[str, str] = self._hashes(self.load_manifest().get("files", {}))
+        current: Dict[str, str] = self._hashes(files if files is not None else self.source_files())
+        # Copy only what changed since the last spool, and drop what was removed
+        for relative, digest in current.items():
+            target: str = os.path.join(self.package_dir, relative)
+            if previous.get(relative) == digest and os.path.exists(target):
+                continue
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            shutil.copy2(os.path.join(self.folder_path, relative), target)
+        for relative in set(previous) - set(current):
+            target = os.path.join(self.package_dir, relative)
+            if os.path.exists(target):
+                os.remove(target)
         # Add this line to ensure the package has an __init__.py
         init_file: str = os.path.join(self.package_dir, "__init__.py")
         if not os.path.exists(init_file):
@@ -56,7 +146,9 @@ class Spooler:
         setup_file_path: str = os.path.join(
             self.project_spool_path, "setup.py")
 
-        if os.path.exists(existing_setup_path):
+        if os.path.exists(setup_file_path) and self.load_manifest().get("setup") == self.setup_inputs():
+            print(f"setup.py for '{self.project_name}' is up to date.")
+        elif os.path.exists(existing_setup_path):
             print(
                 f"Found existing setup.py in {
                     self.folder_path}. Copying it to {
@@ -91,16 +183,21 @@ setup(
                 f.write(setup_content.strip())
 
     def spool(self) -> None:
+        manifest: Dict[str, Any] = self.build_manifest()
+        if self.is_up_to_date(manifest):
+            print(f"Project '{self.project_name}' is up to date at '.spool/{self.project_name}'.")
+            return
         print(
             f"Setting up project structure for '{
                 self.project_name}' in .spool/{
                 self.project_name}"
         )
-        self.setup_project_structure()
+        self.setup_project_structure(manifest["files"])
         print("Loading requirements...")
         self.load_requirements()
         print("Creating setup.py file...")
         self.create_setup_file()
+        self.save_manifest(manifest)
         print(
             f"Project '{
                 self.project_name}' prepared for installation at '.spool/{
@@ -110,6 +207,89 @@ setup(
         print(f"% pip install .spool/{self.project_name}")
 
 
+def discover(src_dir: str) -> List[str]:
+    """
+    Component folders directly below `src_dir`: every non-hidden directory
+    that contains at least one Python file.
+    """
+    src_dir = os.path.abspath(src_dir)
+    return [
+        os.path.join(src_dir, name)
+        for name in sorted(os.listdir(src_dir))
+        if not name.startswith((".", "__"))
+        and os.path.isdir(os.path.join(src_dir, name))
+        and any(entry.endswith(".py") for entry in os.listdir(os.path.join(src_dir, name)))
+    ]
+
+
+def requirement_name(requirement: str) -> str:
+    return re.split(r"[<>=!~;\[\s@]", requirement, maxsplit=1)[0].lower().replace("_", "-")
+
+
+def dedupe_requirements(spoolers: List[Spooler]) -> List[str]:
+    """
+    The union of the projects' requirements, one line per distinct
+    specification. Different specifications of the same package are kept
+    (pip will report the conflict) but flagged here first.
+    """
+    requirements: Dict[str, str] = {}
+    for spooler in spoolers:
+        for requirement in spooler.requirements_txt:
+            if requirement.startswith("#"):
+                continue
+            name: str = requirement_name(requirement)
+            specification: str = "".join(requirement.split())[len(name):]
+            requirements.setdefault(f"{name}{specification}", requirement)
+    names: Dict[str, List[str]] = {}
+    for requirement in requirements:
+        names.setdefault(requirement_name(requirement), []).append(requirement)
+    for name, specifications in names.items():
+        if len(specifications) > 1:
+            print(f"\033[33mConflicting requirements for '{name}': {', '.join(specifications)}\033[0m")
+    return sorted(requirements)
+
+
+def build_wheels(spoolers: List[Spooler], requirements_path: str, wheelhouse: str, workers: int) -> None:
+    """
+    Build the shared requirements once and every spooled project in
+    parallel into `wheelhouse`, so the whole tree installs offline.
+    """
+    os.makedirs(wheelhouse, exist_ok=True)
+    pip: List[str] = [sys.executable, "-m", "pip", "wheel", "--wheel-dir", wheelhouse]
+    commands: List[List[str]] = [[*pip, "--no-deps", spooler.project_spool_path] for spooler in spoolers]
+    if os.path.getsize(requirements_path):
+        commands.insert(0, [*pip, "--requirement", requirements_path])
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        list(pool.map(lambda command: subprocess.run(command, check=True), commands))
+
+
+def spool_all(src_dir: str, workers: int = 4, wheelhouse: Optional[str] = None) -> List[Spooler]:
+    """
+    Spool every component folder of `src_dir` concurrently, write the
+    deduplicated requirements to `.spool/requirements.txt` and optionally
+    build all wheels into `wheelhouse`.
+    """
+    spoolers: List[Spooler] = [Spooler(folder) for folder in discover(src_dir)]
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        list(pool.map(lambda spooler: spooler.spool(), spoolers))
+    for spooler in spoolers:
+        spooler.load_requirements()
+
+    spool_dir: str = os.path.join(os.path.abspath(src_dir), ".spool")
+    os.makedirs(spool_dir, exist_ok=True)
+    requirements_path: str = os.path.join(spool_dir, "requirements.txt")
+    with open(requirements_path, "w", encoding="utf-8") as f:
+        f.writelines(f"{requirement}\n" for requirement in dedupe_requirements(spoolers))
+
+    print(f"Spooled {len(spoolers)} projects into '{spool_dir}'.")
+    if wheelhouse:
+        build_wheels(spoolers, requirements_path, wheelhouse, workers)
+        print("To install offline, use:")
+        print(f"% pip install --no-index --find-links {wheelhouse} "
+              f"{' '.join(spooler.project_name for spooler in spoolers)}")
+    return spoolers
+
+
 def main() -> None:
     parser: argparse.ArgumentParser = argparse.ArgumentParser(
         description="Spool: Make a Python project installable.")
@@ -2,17 +2,25 @@ import base64
 import hashlib
 import json
 import lzma
+import queue
+import threading
 import types
 import uuid as uuid_lib
 from datetime import datetime, timezone
 from functools import wraps
 from io import StringIO
-from typing import (Any, Generator, Callable, Dict, Generator, Iterator, List, Optional,
+from typing import (IO, Any, ContextManager, Generator, Callable, Dict, Generator, Iterator, List, Optional,
                     Tuple, Type, Union, cast, get_origin, TypeVar)
 import dill
 import pydash
 from cryptography.fernet import Fernet
+
+try:
+    import xxhash
+except ImportError:  # pragma: no cover - optional speedup
+    xxhash = None
 import binascii
+import contextlib
 import copy
 import inspect
 
@@ -57,6 +65,97 @@ class Utility:
             return result if inspect.isgenerator(result) else (elem for elem in [result])
         return generator_function
 
+    @staticmethod
+    def relay(generator: Generator[Any, Any, Any],
+              transform: Callable[[Any], Iterator[Any]] = lambda item: iter([item]),
+              lock: ContextManager[Any] = contextlib.nullcontext()) -> Generator[Any, Any, Any]:
+        """
+        Lazily flat-maps `transform` over `generator`: an item is only pulled and
+        transformed when the consumer asks for the next result. `send()`,
+        `throw()` and `close()` on the relay are forwarded into `generator`.
+
+        Args:
+            generator: The wrapped generator.
+            transform: Called per item; yields zero or more results for it.
+            lock: Held while `generator` runs, but not while results are consumed.
+
+        Returns:
+            Generator[Any, Any, Any]: The transformed results.
+        """
+        try:
+            with lock:
+                item: Any = next(generator)
+            while True:
+                sent: Any = None
+                thrown: Optional[BaseException] = None
+                for result in transform(item):
+                    try:
+                        sent = yield result
+                    except GeneratorExit:
+                        raise
+                    except BaseException as exc:  # pylint: disable=broad-except
+                        thrown = exc
+                        break
+                with lock:
+                    item = generator.throw(thrown) if thrown is not None else generator.send(sent)
+        except StopIteration as stop:
+            return stop.value
+        finally:
+            generator.close()
+
+    @staticmethod
+    def prefetch(generator: Generator[T, Any, Any], depth: int) -> Generator[T, None, None]:
+        """
+        Runs `generator` on a background thread, at most `depth` items ahead of
+        the consumer. Closing or throwing into the prefetcher stops the thread
+        and closes `generator` (on its own thread); a thrown exception is then
+        re-raised to the consumer.
+
+        Args:
+            generator: The generator to run ahead.
+            depth: Maximum number of buffered items.
+
+        Returns:
+            Generator[T, None, None]: The items of `generator`, in order.
+        """
+        buffer: "queue.Queue[Tuple[bool, Any]]" = queue.Queue(maxsize=max(1, depth))
+        stop: threading.Event = threading.Event()
+
+        def offer(done: bool, value: Any) -> None:
+            while not stop.is_set():
+                try:
+                    buffer.put((done, value), timeout=0.05)
+                    return
+                except queue.Full:
+                    continue
+
+        def produce() -> None:
+            try:
+                for item in generator:
+                    offer(False, item)
+                    if stop.is_set():
+                        break
+                else:
+                    offer(True, None)
+            except BaseException as exc:  # pylint: disable=broad-except
+                offer(True, exc)
+            finally:
+                generator.close()
+
+        producer: threading.Thread = threading.Thread(target=produce, daemon=True)
+        producer.start()
+        try:
+            while True:
+                done, value = buffer.get()
+                if done:
+                    if value is not None:
+                        raise value
+                    return
+                yield value
+        finally:
+            stop.set()
+            producer.join()
+
     @staticmethod
     def deep_copy(obj: Any) -> Any:
         """
@@ -70,6 +169,18 @@ class Utility:
         """
         return copy.deepcopy(obj)
 
+    @staticmethod
+    def freeze(obj: Any) -> Any:
+        """
+        Returns a read-only view of a (nested) data structure: dictionaries
+        become mapping proxies and lists become tuples.
+        """
+        if isinstance(obj, (dict, types.MappingProxyType)):
+            return types.MappingProxyType({key: Utility.freeze(value) for key, value in obj.items()})
+        if isinstance(obj, (list, tuple)):
+            return tuple(Utility.freeze(item) for item in obj)
+        return obj
+
     @staticmethod
     def deep_get(data: Any, key: str, default_sentinel: Any = _NO_VALUE) -> Any:
         if not key:
@@ -114,6 +225,16 @@ class Utility:
     def hash(string: str, prefix: str = "") -> str:
         return f"{prefix}{['', '_'][bool(prefix)]}{hashlib.md5(string.encode('utf-8')).hexdigest()}"
 
+    @staticmethod
+    def fast_hash(data: Union[str, bytes], prefix: str = "") -> str:
+        """
+        Non-cryptographic counterpart of `hash` for cache keys: xxh3-128 when
+        `xxhash` is installed, 128-bit blake2b otherwise. Stable across processes.
+        """
+        raw: bytes = data.encode("utf-8") if isinstance(data, str) else data
+        digest: str = xxhash.xxh3_128_hexdigest(raw) if xxhash else hashlib.blake2b(raw, digest_size=16).hexdigest()
+        return f"{prefix}{['', '_'][bool(prefix)]}{digest}"
+
     @staticmethod
     def stringify(obj: Any) -> str:
         return (
@@ -153,6 +274,10 @@ class Utility:
             return deserialized
         except (binascii.Error, dill.UnpicklingError, AttributeError, MemoryError):
             return serialized
+        except Exception:  # pylint: disable=broad-exception-caught
+            # Plain text that happens to be valid base64 unpickles into garbage
+            # and can fail in any way; it is not serialized data.
+            return serialized
 
     @staticmethod
     def compress(data: Any) -> str:
@@ -280,7 +405,7 @@ class Utility:
 
     @staticmethod
     def json_stream_to_object(
-            input_stream: StringIO) -> Generator[Any, None, None]:
+            input_stream: IO[str]) -> Generator[Any, None, None]:
         buffer: str = ""
         depth: int = 0
         in_string: bool = False
@@ -0,0 +1,127 @@
+import inspect
+import threading
+import time
+from types import ModuleType
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+numpy: Optional[ModuleType]
+try:
+    import numpy
+except ImportError:  # pragma: no cover - optional speedup
+    numpy = None
+
+
+def column(values: List[Any], arrays: bool = True) -> Any:
+    """
+    One bound argument of every message in a batch: a NumPy array when all
+    values are numbers (and NumPy is installed), a list otherwise.
+    """
+    numeric: bool = all(isinstance(value, (int, float)) and not isinstance(value, bool) for value in values)
+    if arrays and numpy is not None and values and numeric:
+        return numpy.asarray(values)
+    return values
+
+
+def collate(calls: List[Dict[str, Any]], arrays: bool = True) -> Dict[str, Any]:
+    """
+    Turn the keyword arguments of a batch of calls into one column per argument.
+    """
+    return {name: column([call[name] for call in calls], arrays) for name in calls[0]}
+
+
+def scatter(result: Any, count: int) -> List[Any]:
+    """
+    Split the column a vectorized procedure returned into one result per
+    message. An object of columns becomes one object per message.
+
+    Raises:
+        ValueError: If the result is not a column of `count` values.
+    """
+    if isinstance(result, dict):
+        columns: Dict[str, List[Any]] = {name: scatter(values, count) for name, values in result.items()}
+        return [{name: values[index] for name, values in columns.items()} for index in range(count)]
+    if numpy is not None and isinstance(result, numpy.ndarray):
+        result = result.tolist()
+    elif inspect.isgenerator(result):
+        result = list(result)
+    if not isinstance(result, (list, tuple)) or len(result) != count:
+        size: str = str(len(result)) if isinstance(result, (list, tuple)) else type(result).__name__
+        raise ValueError(f"Vectorized procedure returned {size} instead of a column of {count} values")
+    return list(result)
+
+
+class _Batch:
+    def __init__(self, deadline: float) -> None:
+        self.deadline: float = deadline
+        self.calls: List[Dict[str, Any]] = []
+        self.results: List[Any] = []
+        self.error: Optional[BaseException] = None
+        self.done: threading.Event = threading.Event()
+
+
+class Collator:
+    """
+    Calls a vectorized procedure once per batch of messages. Threads calling
+    the collator with one message's keyword arguments each are gathered into
+    a batch; it runs when `size` calls have joined or `linger` seconds after
+    the first one did. The procedure gets one column per argument (see
+    `collate`) and returns one column of results, of which every caller
+    gets its own element. Calls with different argument names are batched
+    separately, and batches never run concurrently.
+    """
+
+    def __init__(self, function: Callable[..., Any], size: int = 64, linger: float = 0.005,
+                 arrays: bool = True) -> None:
+        self.function: Callable[..., Any] = function
+        self.size: int = size
+        self.linger: float = linger
+        self.arrays: bool = arrays
+        self.batches: int = 0
+        self.calls: int = 0
+        self._open: Dict[Tuple[str, ...], _Batch] = {}
+        self._lock: threading.Lock = threading.Lock()
+        self._procedure_lock: threading.Lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, function: Callable[..., Any], section: Dict[str, Any]) -> "Collator":
+        """
+        Build a collator from a config's `execution.vectorized` section, e.g.
+        `{"size": 64, "linger": 0.005, "arrays": true}`.
+        """
+        return cls(function, section.get("size", 64), section.get("linger", 0.005), section.get("arrays", True))
+
+    def __call__(self, **kwargs: Any) -> Any:
+        names: Tuple[str, ...] = tuple(sorted(kwargs))
+        with self._lock:
+            batch: Optional[_Batch] = self._open.get(names)
+            if batch is None:
+                batch = self._open[names] = _Batch(time.monotonic() + self.linger)
+            index: int = len(batch.calls)
+            batch.calls.append(kwargs)
+            leader: bool = len(batch.calls) >= self.size
+            if leader:
+                del self._open[names]
+        if not leader and not batch.done.wait(max(0.0, batch.deadline - time.monotonic())):
+            # Lingered long enough: whoever gets here first runs the partial batch.
+            with self._lock:
+                leader = self._open.get(names) is batch
+                if leader:
+                    del self._open[names]
+        if leader:
+            self._run(batch)
+        batch.done.wait()
+        if batch.error is not None:
+            raise batch.error
+        return batch.results[index]
+
+    def _run(self, batch: _Batch) -> None:
+        try:
+            columns: Dict[str, Any] = collate(batch.calls, self.arrays)
+            with self._procedure_lock:
+                batch.results = scatter(self.function(**columns), len(batch.calls))
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            batch.error = e
+        finally:
+            self.batches += 1
+            self.calls += len(batch.calls)
+            batch.done.set()
@@ -0,0 +1,158 @@
+import json
+import lzma
+import struct
+from typing import IO, Any, Dict, Generator, List, Optional
+
+import dill
+from cryptography.fernet import Fernet
+
+# Binary envelope layout (all integers big-endian):
+#
+#   header    magic "OEW" | version u8 | flags u8 | routing key length u16 |
+#             schema length u16 | segment count u32 | body length u32
+#   strings   routing key (utf-8) | schema (utf-8)
+#   lengths   one u32 per segment (plain, i.e. before compression/encryption)
+#   body      the concatenated segments, lzma-compressed and/or Fernet-encrypted
+#             as a whole when the corresponding flag is set
+#
+# Segment 0 holds the message (minus routing key and schema) as JSON. Binary
+# leaves are moved into their own raw segments and referenced as
+# {"$bytes": n}; leaves JSON cannot represent are dill-pickled into a segment
+# and referenced as {"$dill": n}. Nothing is base64-encoded.
+
+MAGIC: bytes = b"OEW"
+VERSION: int = 1
+COMPRESSED: int = 0x01
+ENCRYPTED: int = 0x02
+
+HEADER: struct.Struct = struct.Struct(">3sBBHHII")
+LENGTH: struct.Struct = struct.Struct(">I")
+
+
+def is_envelope(data: Any) -> bool:
+    return isinstance(data, (bytes, bytearray, memoryview)) and bytes(data[:3]) == MAGIC
+
+
+def _encode(value: Any, segments: List[bytes]) -> Any:
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        segments.append(bytes(value))
+        return {"$bytes": len(segments) - 1}
+    if isinstance(value, (list, tuple)):
+        return [_encode(item, segments) for item in value]
+    if isinstance(value, dict) and all(isinstance(key, str) and not key.startswith("$") for key in value):
+        return {key: _encode(item, segments) for key, item in value.items()}
+    segments.append(dill.dumps(value))
+    return {"$dill": len(segments) - 1}
+
+
+def _decode(value: Any, segments: List[bytes]) -> Any:
+    if isinstance(value, list):
+        return [_decode(item, segments) for item in value]
+    if isinstance(value, dict):
+        if len(value) == 1 and "$bytes" in value:
+            return segments[value["$bytes"]]
+        if len(value) == 1 and "$dill" in value:
+            return dill.loads(segments[value["$dill"]])
+        return {key: _decode(item, segments) for key, item in value.items()}
+    return value
+
+
+def pack(message: Dict[str, Any], compress: bool = False, encryptkey: Optional[str] = None) -> bytes:
+    """
+    Encode a message (`{"routingkey": ..., "schema": ..., "payload": ...}`)
+    as a binary envelope.
+
+    Args:
+        message: The message; every key but routing key and schema is carried in the body.
+        compress: lzma-compress the body.
+        encryptkey: Fernet key to encrypt the body with, if any.
+
+    Returns:
+        bytes: The envelope.
+    """
+    routingkey: bytes = str(message.get("routingkey", "")).encode("utf-8")
+    schema: bytes = str(message.get("schema", "")).encode("utf-8")
+    segments: List[bytes] = [b""]
+    body: Any = _encode({key: value for key, value in message.items() if key not in ("routingkey", "schema")}, segments)
+    segments[0] = json.dumps(body, separators=(",", ":")).encode("utf-8")
+
+    flags: int = 0
+    payload: bytes = b"".join(segments)
+    if compress:
+        payload = lzma.compress(payload)
+        flags |= COMPRESSED
+    if encryptkey:
+        payload = Fernet(encryptkey.encode("utf-8")).encrypt(payload)
+        flags |= ENCRYPTED
+
+    header: bytes = HEADER.pack(MAGIC, VERSION, flags, len(routingkey), len(schema), len(segments), len(payload))
+    lengths: bytes = b"".join(LENGTH.pack(len(segment)) for segment in segments)
+    return b"".join([header, routingkey, schema, lengths, payload])
+
+
+def unpack(data: bytes, encryptkey: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Decode a binary envelope back into a message.
+
+    Raises:
+        ValueError: If `data` is not an envelope of a supported version, or is
+            encrypted and no `encryptkey` was given.
+    """
+    view: memoryview = memoryview(data)
+    if len(view) < HEADER.size:
+        raise ValueError("Truncated envelope header")
+    magic, version, flags, rk_length, schema_length, count, body_length = HEADER.unpack_from(view)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"Unsupported envelope (magic {magic!r}, version {version})")
+
+    offset: int = HEADER.size
+    routingkey: str = bytes(view[offset:offset + rk_length]).decode("utf-8")
+    offset += rk_length
+    schema: str = bytes(view[offset:offset + schema_length]).decode("utf-8")
+    offset += schema_length
+    lengths: List[int] = [LENGTH.unpack_from(view, offset + 4 * index)[0] for index in range(count)]
+    offset += 4 * count
+    payload: bytes = bytes(view[offset:offset + body_length])
+
+    if flags & ENCRYPTED:
+        if not encryptkey:
+            raise ValueError("Envelope is encrypted but no key was given")
+        payload = Fernet(encryptkey.encode("utf-8")).decrypt(payload)
+    if flags & COMPRESSED:
+        payload = lzma.decompress(payload)
+
+    segments: List[bytes] = []
+    position: int = 0
+    for length in lengths:
+        segments.append(payload[position:position + length])
+        position += length
+
+    message: Dict[str, Any] = {"routingkey": routingkey}
+    if schema:
+        message["schema"] = schema
+    message.update(_decode(json.loads(segments[0]), segments))
+    return message
+
+
+def write_frame(stream: IO[bytes], data: bytes) -> None:
+    """
+    Write one length-prefixed frame, e.g. an envelope, to a binary stream.
+    """
+    stream.write(LENGTH.pack(len(data)))
+    stream.write(data)
+
+
+def read_frames(stream: IO[bytes]) -> Generator[bytes, None, None]:
+    """
+    Read length-prefixed frames from a binary stream until it is exhausted.
+    """
+    while prefix := stream.read(LENGTH.size):
+        if len(prefix) < LENGTH.size:
+            raise ValueError("Truncated frame length")
+        (length,) = LENGTH.unpack(prefix)
+        frame: bytes = stream.read(length)
+        if len(frame) < length:
+            raise ValueError("Truncated frame")
+        yield frame
@@ -0,0 +1,33 @@
+from openergo.executor import ENCRYPTIONKEY
+from openergo.utility import Utility
+
+
+def reverse(string):
+    return string[::-1]
+
+
+def upper(string):
+    return string.upper()
+
+
+def join(string):
+    """Joins an aggregated window's strings."""
+    return ",".join(string)
+
+
+def message(text, routingkey="text"):
+    """Build an input message carrying `text` and an (empty) encrypted section."""
+    data = {"routingkey": routingkey, "payload": {"encrypted": {}, "text": text}}
+    return Utility.encrypt(data, "payload.encrypted", ENCRYPTIONKEY)
+
+
+def component(name, procedure, input_key="text", output=None):
+    """A Python component config binding the message text to `string`."""
+    config = {
+        "name": name,
+        "shell": {"language": "python", "procedure": procedure},
+        "input": {"keys": [input_key], "bindings": {"string": "{input.payload.text}"}},
+    }
+    if output:
+        config["output"] = {"keys": [output], "bindings": {"text": "{output}"}}
+    return config
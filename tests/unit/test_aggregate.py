@@ -0,0 +1,115 @@
+import pytest
+
+from openergo.aggregate import Aggregator, WindowBuffer
+
+
+def arguments(closed):
+    return [window for window, _ in closed]
+
+
+class TestWindowBuffer:
+    def test_spilled_items_come_back_in_order(self, tmp_path):
+        """Test that items moved to disk are read back oldest first and evicted from the front."""
+        buffer = WindowBuffer(str(tmp_path))
+        for number in range(3):
+            buffer.append(float(number), 10, {"n": number})
+        assert buffer.spill() == 30
+        buffer.append(3.0, 10, {"n": 3})
+        assert buffer.memory_bytes == 10
+        assert [item["n"] for item in buffer.items()] == [0, 1, 2, 3]
+        buffer.evict()
+        assert [item["n"] for item in buffer.items()] == [1, 2, 3]
+        assert buffer.oldest() == (1.0, 10)
+        assert (buffer.count, buffer.bytes) == (3, 30)
+        buffer.close()
+
+
+class TestTumbling:
+    def test_count_windows(self):
+        """Test that a window closes every `count` messages, per key."""
+        aggregator = Aggregator(count=3)
+        closed = []
+        for number in range(7):
+            closed += arguments(aggregator.add(f"k{number % 2}", {"string": str(number)}))
+        assert closed == [{"string": ["0", "2", "4"]}, {"string": ["1", "3", "5"]}]
+        assert arguments(aggregator.flush()) == [{"string": ["6"]}]
+
+    def test_byte_windows(self):
+        """Test that a window closes once it holds `size` bytes."""
+        aggregator = Aggregator(size=200)
+        closed = []
+        for number in range(10):
+            closed += arguments(aggregator.add("", {"string": "x" * 40}))
+        assert closed
+        assert all(1 < len(window["string"]) < 10 for window in closed)
+
+    def test_time_windows_close_on_arrival(self):
+        """Test that expired windows of every key are handed on by the next message, with their own context."""
+        aggregator = Aggregator(seconds=5)
+        assert aggregator.add("a", {"string": "1"}, now=0, context="a1") == []
+        assert aggregator.add("b", {"string": "2"}, now=1, context="b2") == []
+        assert aggregator.add("a", {"string": "3"}, now=5.5, context="a3") == [({"string": ["1"]}, "a1")]
+        assert aggregator.add("c", {"string": "4"}, now=7, context="c4") == [({"string": ["2"]}, "b2")]
+
+    def test_columns_and_constants(self):
+        """Test that only the listed arguments become columns."""
+        aggregator = Aggregator(count=2, columns=["string_list"])
+        aggregator.add("", {"string_list": "a", "delimiter": ","})
+        assert arguments(aggregator.add("", {"string_list": "b", "delimiter": ","})) == [
+            {"string_list": ["a", "b"], "delimiter": ","}]
+
+    def test_held_items_until_their_window_is_emitted(self):
+        """Test that items count as held until a window including them closes."""
+        aggregator = Aggregator(count=2)
+        aggregator.add("a", {"n": 0})
+        aggregator.add("b", {"n": 1})
+        assert (aggregator.added, aggregator.held()) == (2, {0, 1})
+        aggregator.add("a", {"n": 2})
+        assert aggregator.held() == {1}
+        aggregator.flush()
+        assert aggregator.held() == set()
+
+    def test_memory_is_bounded_by_spilling(self, tmp_path):
+        """Test that windows beyond the memory limit spill to disk and still emit everything."""
+        aggregator = Aggregator(count=100, memory=1000, spill=str(tmp_path))
+        closed = []
+        for number in range(100):
+            closed += arguments(aggregator.add(f"k{number % 2}", {"string": f"{number:040d}"}))
+            assert aggregator._memory_bytes <= 1000
+        assert aggregator.spilled > 0
+        [first, second] = arguments(aggregator.flush())
+        assert len(first["string"]) == len(second["string"]) == 50
+        assert first["string"][:2] == [f"{0:040d}", f"{2:040d}"]
+
+
+class TestSliding:
+    def test_sliding_count_window(self):
+        """Test that a sliding window emits the latest messages every `slide` arrivals."""
+        aggregator = Aggregator(count=3, mode="sliding", slide=2)
+        closed = []
+        for number in range(6):
+            closed += arguments(aggregator.add("", {"n": number}))
+        assert closed == [{"n": [0, 1]}, {"n": [1, 2, 3]}, {"n": [3, 4, 5]}]
+
+    def test_sliding_items_are_released_when_emitted_or_dropped(self):
+        """Test that a sliding item is no longer held once emitted or slid out unemitted."""
+        aggregator = Aggregator(count=1, mode="sliding", slide=3)
+        aggregator.add("", {"n": 0})
+        aggregator.add("", {"n": 1})
+        assert aggregator.held() == {1}
+        aggregator.add("", {"n": 2})
+        assert aggregator.held() == set()
+
+    def test_sliding_time_window(self):
+        """Test that messages older than `seconds` drop out of a sliding window."""
+        aggregator = Aggregator(seconds=2, mode="sliding")
+        aggregator.add("", {"n": 0}, now=0)
+        aggregator.add("", {"n": 1}, now=1)
+        assert aggregator.add("", {"n": 2}, now=2.5, context="n2") == [({"n": [1, 2]}, "n2")]
+
+    def test_invalid_configuration(self):
+        """Test that windows without limits or with unknown modes are rejected."""
+        with pytest.raises(ValueError):
+            Aggregator()
+        with pytest.raises(ValueError):
+            Aggregator(count=1, mode="hopping")
@@ -0,0 +1,61 @@
+from openergo.analyzer import analyze, component_graph, strongly_connected
+
+
+def component(name, input_keys, output_keys=()):
+    return {"name": name, "input": {"keys": list(input_keys)}, "output": {"keys": list(output_keys)}}
+
+
+CONFIGS = [
+    component("splitter", ["text"], ["left.?", "right.?"]),
+    component("left", ["left"], ["joined"]),
+    component("right", ["right.~skip"], ["joined"]),
+    component("joiner", ["joined"]),
+    component("orphan", ["nothing"], ["text"]),
+]
+
+
+class TestComponentGraph:
+    def test_follows_derived_keys(self):
+        """Test that components are linked through the keys they derive."""
+        downstream, entries = component_graph(CONFIGS, ["text.en"])
+        assert entries == {"splitter"}
+        assert downstream == {
+            "splitter": {"left", "right"}, "left": {"joiner"}, "right": {"joiner"}, "joiner": set()}
+
+    def test_negated_parts_stop_routing(self):
+        """Test that `~` parts exclude keys carrying them."""
+        downstream, _ = component_graph(CONFIGS, ["text.skip"])
+        assert downstream["splitter"] == {"left"}
+
+
+class TestStronglyConnected:
+    def test_reverse_topological_order(self):
+        """Test that cycles are grouped and sinks come first."""
+        graph = {"a": {"b"}, "b": {"c"}, "c": {"b", "d"}, "d": set()}
+        assert strongly_connected(graph) == [["d"], ["b", "c"], ["a"]]
+
+
+class TestAnalyze:
+    def test_report(self):
+        """Test fan-out, depth, unreachable and dead-end components."""
+        report = analyze(CONFIGS, ["text.en"])
+        assert report["fan_out"] == {"joiner": 0, "left": 1, "right": 1, "splitter": 2}
+        assert report["depth"] == 3
+        assert report["cycles"] == []
+        assert report["unreachable"] == ["orphan"]
+        assert report["dead_ends"] == ["joiner"]
+        assert "latency" not in report
+
+    def test_critical_path(self):
+        """Test that the slowest chain determines the latency estimate."""
+        report = analyze(CONFIGS, ["text"], {"splitter": 5, "left": 1, "right": 7, "joiner": 2})
+        assert report["latency"] == 14
+        assert report["critical_path"] == ["splitter", "right", "joiner"]
+
+    def test_cycles(self):
+        """Test that a loop back to the seed is reported and counted once."""
+        configs = CONFIGS[:3] + [component("joiner", ["joined"], ["text"])]
+        report = analyze(configs, ["text"], {"splitter": 1, "left": 1, "right": 1, "joiner": 1})
+        assert report["cycles"] == [["joiner", "left", "right", "splitter"]]
+        assert report["depth"] == 4
+        assert report["dead_ends"] == []
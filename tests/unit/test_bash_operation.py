@@ -0,0 +1,145 @@
+import sys
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+from openergo.bash_operation import BashExecutor, Coprocess, CoprocessPool, build_executor
+from openergo.python_executor import PythonExecutor
+from tests.unit.helpers import message
+
+# Reverses `string`, sleeps `sleep` seconds, exits on "crash"; one JSON line per line.
+RESIDENT = """
+import json, os, sys, time
+for line in sys.stdin:
+    request = json.loads(line)
+    if request.get("string") == "crash":
+        sys.exit(3)
+    time.sleep(request.get("sleep", 0))
+    print(json.dumps({"text": request["string"][::-1], "pid": os.getpid()}), flush=True)
+"""
+
+
+@pytest.fixture
+def script(tmp_path):
+    path = tmp_path / "reverse.py"
+    path.write_text(RESIDENT)
+    return [sys.executable, str(path)]
+
+
+def config(command, **shell):
+    return {
+        "name": "reverser",
+        "shell": {"language": "bash", "command": command, **shell},
+        "input": {"keys": ["text"], "bindings": {"string": "{input.payload.text}"}},
+    }
+
+
+class TestCoprocessPool:
+    def test_children_are_reused(self, script):
+        """Test that consecutive calls are answered by the same resident child."""
+        pool = CoprocessPool(script)
+        try:
+            first, second = pool.call({"string": "abc"}), pool.call({"string": "xyz"})
+        finally:
+            pool.close()
+        assert (first["text"], second["text"]) == ("cba", "zyx")
+        assert first["pid"] == second["pid"]
+
+    def test_crashed_child_is_replaced(self, script):
+        """Test that a crash raises and the next call gets a fresh child."""
+        pool = CoprocessPool(script)
+        try:
+            pid = pool.call({"string": "abc"})["pid"]
+            with pytest.raises(RuntimeError):
+                pool.call({"string": "crash"})
+            assert pool.call({"string": "abc"})["pid"] != pid
+            assert pool.restarts == 1
+        finally:
+            pool.close()
+
+    def test_timeout_kills_the_child(self, script):
+        """Test that a call exceeding its timeout fails and the child is replaced."""
+        pool = CoprocessPool(script, timeout=0.2)
+        try:
+            with pytest.raises(TimeoutError):
+                pool.call({"string": "abc", "sleep": 5})
+            assert pool.call({"string": "abc"})["text"] == "cba"
+        finally:
+            pool.close()
+
+    def test_unexpected_errors_replace_the_child(self, script):
+        """Test that a call failing with any other error does not leak its child."""
+        pool = CoprocessPool(script)
+        try:
+            pid = pool.call({"string": "abc"})["pid"]
+            with patch.object(Coprocess, "request", side_effect=KeyboardInterrupt):
+                with pytest.raises(KeyboardInterrupt):
+                    pool.call({"string": "abc"})
+            assert pool.restarts == 1
+            assert pool.call({"string": "abc"})["pid"] != pid
+        finally:
+            pool.close()
+
+    def test_calls_run_concurrently(self, script):
+        """Test that a pool of two serves two slow calls at once."""
+        pool = CoprocessPool(script, size=2)
+        try:
+            started = time.monotonic()
+            threads = [threading.Thread(target=pool.call, args=({"string": "a", "sleep": 0.3},)) for _ in range(2)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            assert time.monotonic() - started < 0.55
+        finally:
+            pool.close()
+
+    def test_closed_pool_refuses_calls(self, script):
+        """Test that a call after close raises instead of spawning a new child."""
+        pool = CoprocessPool(script)
+        pool.close()
+        with pytest.raises(RuntimeError, match="closed"):
+            pool.call({"string": "abc"})
+        assert pool._children == []
+
+
+class TestBashExecutor:
+    def test_resident_mode(self, script):
+        """Test that messages are executed by the coprocess."""
+        executor = BashExecutor(config(script))
+        try:
+            [result] = executor.execute(message("abc"))
+        finally:
+            executor.close()
+        assert result["text"] == "cba"
+
+    def test_oneshot_mode(self):
+        """Test that oneshot commands get the request on stdin and may answer in plain text."""
+        executor = BashExecutor(config(["bash", "-c", "read -r line; echo \"got $line\""], mode="oneshot"))
+        assert list(executor.execute(message("abc"))) == ['got {"string": "abc"}']
+
+    def test_missing_command(self):
+        """Test that a config without a command is rejected with a clear error."""
+        with pytest.raises(ValueError, match="reverser has no shell.command"):
+            BashExecutor(config(None))
+
+    def test_unknown_mode(self, script):
+        """Test that an unknown mode is rejected."""
+        with pytest.raises(ValueError):
+            BashExecutor(config(script, mode="daemon"))
+
+
+class TestBuildExecutor:
+    def test_picks_the_executor_from_the_shell_section(self, script):
+        """Test that Python procedures and shell commands get their own executors."""
+        python = {"name": "reverser", "shell": {"language": "python", "procedure": "tests.unit.helpers.reverse"}}
+        assert isinstance(build_executor(python), PythonExecutor)
+        with build_executor(config(script)) as executor:
+            assert isinstance(executor, BashExecutor)
+
+    def test_nothing_to_run(self):
+        """Test that a config naming neither a procedure nor a command is rejected."""
+        with pytest.raises(ValueError, match="neither"):
+            build_executor({"name": "empty", "shell": {"language": "bash"}})
@@ -0,0 +1,117 @@
+import json
+
+from openergo.bulk import load_checkpoint, ranges, run_bulk
+from tests.unit.helpers import message
+
+PROCEDURE = "tests.unit.helpers.reverse"
+
+CONFIG = {
+    "name": "reverser",
+    "input": {"keys": ["text"], "bindings": {"string": "{input.payload.text}"}},
+    "output": {"keys": ["reversed"], "bindings": "{output}"},
+}
+
+
+# Strings seen by `flaky` in this worker process.
+SEEN = set()
+
+
+def flaky(string):
+    if string not in SEEN:
+        SEEN.add(string)
+        raise RuntimeError(f"first attempt at {string}")
+    return string[::-1]
+
+
+def write_records(path, count):
+    with open(path, "w", encoding="utf-8") as stream:
+        for i in range(count):
+            stream.write(json.dumps(message(f"record{i:04d}")) + "\n")
+
+
+class TestBulk:
+    def test_ranges_align_on_records(self, tmp_path):
+        """Test that ranges cover the file and end on newlines."""
+        path = tmp_path / "in.ndjson"
+        path.write_bytes(b"aaaa\nbb\ncccccc\nd\n")
+        result = ranges(str(path), 3)
+        assert result[0][0] == 0 and result[-1][1] == path.stat().st_size
+        data = path.read_bytes()
+        assert all(data[end - 1:end] == b"\n" for _, end in result)
+        assert all(a[1] == b[0] for a, b in zip(result, result[1:]))
+
+    def test_run_bulk_keeps_order(self, tmp_path):
+        """Test that all records are processed in order across workers."""
+        source, target = tmp_path / "in.ndjson", tmp_path / "out.ndjson"
+        write_records(source, 40)
+        processed = run_bulk(PROCEDURE, CONFIG, str(source), str(target),
+                             workers=2, chunk_size=512)
+        assert processed == 40
+        lines = [json.loads(line) for line in target.read_text().splitlines()]
+        assert [line["payload"] for line in lines] == [f"record{i:04d}"[::-1] for i in range(40)]
+
+    def test_failed_records_are_retried_within_their_range(self, tmp_path):
+        """Test that records failing under a retry policy are retried before the range is written."""
+        source, target = tmp_path / "in.ndjson", tmp_path / "out.ndjson"
+        write_records(source, 10)
+        config = {**CONFIG, "retry": {"attempts": 2, "backoff": 0, "jitter": 0}}
+        processed = run_bulk("tests.unit.test_bulk.flaky", config, str(source), str(target),
+                             workers=2, chunk_size=256)
+        assert processed == 10
+        lines = [json.loads(line) for line in target.read_text().splitlines()]
+        assert sorted(line["payload"] for line in lines) == sorted(f"record{i:04d}"[::-1] for i in range(10))
+
+    def test_open_windows_are_written_at_the_end_of_their_range(self, tmp_path):
+        """Test that records waiting in a window when their range ends are still processed."""
+        source, target = tmp_path / "in.ndjson", tmp_path / "out.ndjson"
+        write_records(source, 3)
+        config = {**CONFIG, "aggregate": {"count": 2}}
+        assert run_bulk("tests.unit.helpers.join", config, str(source), str(target), workers=1) == 3
+        lines = [json.loads(line) for line in target.read_text().splitlines()]
+        assert lines == [{"routingkey": "reversed", "payload": "record0000,record0001"}, "record0002"]
+
+    def test_resume_from_checkpoint(self, tmp_path):
+        """Test that a resumed run truncates partial output and continues from the offset."""
+        source, target = tmp_path / "in.ndjson", tmp_path / "out.ndjson"
+        write_records(source, 10)
+        run_bulk(PROCEDURE, CONFIG, str(source), str(target), workers=1, chunk_size=1)
+        checkpoint = tmp_path / "out.ndjson.checkpoint"
+        first_range_end = ranges(str(source), 1)[2][1]
+        complete = target.read_text().splitlines()
+        output_size = len("".join(line + "\n" for line in complete[:3]).encode("utf-8"))
+        checkpoint.write_text(json.dumps({"offset": first_range_end, "output": output_size}))
+        with open(target, "a", encoding="utf-8") as stream:
+            stream.write("partial garbage\n")
+
+        processed = run_bulk(PROCEDURE, CONFIG, str(source), str(target),
+                             workers=1, chunk_size=1, resume=True)
+        assert processed == 7
+        assert target.read_text().splitlines() == complete
+        assert load_checkpoint(str(checkpoint))["offset"] == source.stat().st_size
+
+    def test_incomplete_checkpoint_is_ignored(self, tmp_path):
+        """Test that a checkpoint missing a field or of the wrong shape counts as none."""
+        checkpoint = tmp_path / "out.ndjson.checkpoint"
+        for content in ({"offset": 12}, {"output": 3}, [1, 2], {"offset": "x", "output": 0}):
+            checkpoint.write_text(json.dumps(content))
+            assert load_checkpoint(str(checkpoint)) == {"offset": 0, "output": 0}
+        source, target = tmp_path / "in.ndjson", tmp_path / "out.ndjson"
+        write_records(source, 3)
+        checkpoint.write_text(json.dumps({"offset": 12}))
+        assert run_bulk(PROCEDURE, CONFIG, str(source), str(target), workers=1, resume=True) == 3
+
+    def test_checkpoint_without_its_output_starts_over(self, tmp_path):
+        """Test that a checkpoint is discarded when the output it refers to is missing or short."""
+        source, target = tmp_path / "in.ndjson", tmp_path / "out.ndjson"
+        write_records(source, 10)
+        run_bulk(PROCEDURE, CONFIG, str(source), str(target), workers=1, chunk_size=1)
+        complete = target.read_bytes()
+        checkpoint = tmp_path / "out.ndjson.checkpoint"
+        checkpoint.write_text(json.dumps({"offset": ranges(str(source), 1)[2][1], "output": len(complete)}))
+        target.write_bytes(complete[:10])
+        assert run_bulk(PROCEDURE, CONFIG, str(source), str(target), workers=1, chunk_size=1, resume=True) == 10
+        assert target.read_bytes() == complete
+        target.unlink()
+        checkpoint.write_text(json.dumps({"offset": ranges(str(source), 1)[2][1], "output": 10}))
+        assert run_bulk(PROCEDURE, CONFIG, str(source), str(target), workers=1, chunk_size=1, resume=True) == 10
+        assert target.read_bytes() == complete
@@ -0,0 +1,59 @@
+from unittest.mock import patch
+
+from openergo.cache import ResultCache
+
+
+class TestResultCache:
+    def test_key_is_stable_and_order_independent(self):
+        """Test that equal arguments hash equally regardless of kwarg order."""
+        assert ResultCache.key(1, a=1, b=2) == ResultCache.key(1, b=2, a=1)
+        assert ResultCache.key(1) != ResultCache.key(2)
+
+    def test_key_falls_back_for_non_json_arguments(self):
+        """Test that arguments JSON cannot represent still produce a key."""
+        assert ResultCache.key({1, 2}) == ResultCache.key({1, 2})
+
+    def test_hit_and_miss_metrics(self):
+        """Test that lookups are counted as hits and misses."""
+        cache = ResultCache()
+        assert cache.get("k") == (False, None)
+        cache.put("k", ["value"])
+        assert cache.get("k") == (True, ["value"])
+        metrics = cache.metrics()
+        assert (metrics["hits"], metrics["misses"], metrics["hit_ratio"]) == (1, 1, 0.5)
+
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted first."""
+        cache = ResultCache(size=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+        assert cache.get("b") == (False, None)
+        assert cache.get("a") == (True, 1)
+        assert cache.metrics()["evictions"] == 1
+
+    def test_byte_limit(self):
+        """Test that entries are evicted to honour the byte limit."""
+        cache = ResultCache(max_bytes=200)
+        cache.put("a", "x" * 100)
+        cache.put("b", "y" * 100)
+        assert cache.metrics()["bytes"] <= 200
+        assert cache.get("a") == (False, None)
+
+    def test_ttl_expiry(self):
+        """Test that entries expire after the time to live."""
+        cache = ResultCache(ttl=10)
+        with patch("openergo.cache.time.monotonic", return_value=100.0):
+            cache.put("a", 1)
+        with patch("openergo.cache.time.monotonic", return_value=105.0):
+            assert cache.get("a") == (True, 1)
+        with patch("openergo.cache.time.monotonic", return_value=111.0):
+            assert cache.get("a") == (False, None)
+
+    def test_disk_tier(self, tmp_path):
+        """Test that a fresh cache is served from the on-disk tier."""
+        ResultCache(directory=str(tmp_path)).put("a", [1, 2])
+        cache = ResultCache(directory=str(tmp_path))
+        assert cache.get("a") == (True, [1, 2])
+        assert cache.metrics()["disk_hits"] == 1
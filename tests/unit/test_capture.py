@@ -0,0 +1,67 @@
+import time
+
+import pytest
+
+from openergo.capture import Recorder, read_capture, replay, replay_deployment, schedule
+from openergo.dispatcher import Dispatcher
+from openergo.python_executor import PythonExecutor
+from tests.unit.helpers import message, reverse
+from tests.unit.test_dispatcher import CONFIGS
+
+CONFIG = {"name": "reverser", "input": {"keys": ["text"], "bindings": {"string": "{input.payload.text}"}}}
+
+
+class TestRecorder:
+    def test_round_trip(self, tmp_path):
+        """Test that records come back in order with their times."""
+        path = str(tmp_path / "traffic.capture")
+        recorder = Recorder(path)
+        recorder.record({"routingkey": "a", "payload": {"blob": b"\x00\x01"}}, now=1.0)
+        recorder.record("raw", now=2.5)
+        recorder.close()
+        assert list(read_capture(path)) == [
+            (1.0, {"routingkey": "a", "payload": {"blob": b"\x00\x01"}}), (2.5, "raw")]
+
+    def test_sampling(self, tmp_path):
+        """Test that roughly the sampled fraction is recorded."""
+        recorder = Recorder(str(tmp_path / "traffic.capture"), sample=0.25)
+        for number in range(2000):
+            recorder.record({"routingkey": "a", "n": number})
+        assert 350 < recorder.recorded < 650
+
+
+class TestSchedule:
+    def test_speed_scales_gaps(self):
+        """Test that recorded gaps are divided by the speed."""
+        start = time.monotonic()
+        dues = [due for due, _ in schedule([(100.0, "a"), (100.2, "b"), (100.4, "c")], speed=2, start=start)]
+        assert dues == pytest.approx([start, start + 0.1, start + 0.2])
+        assert time.monotonic() - start >= 0.19
+
+    def test_zero_speed_does_not_wait(self):
+        """Test that speed 0 replays as fast as possible."""
+        start = time.monotonic()
+        assert [message for _, message in schedule([(0.0, "a"), (60.0, "b")], speed=0)] == ["a", "b"]
+        assert time.monotonic() - start < 1
+
+
+class TestReplay:
+    def test_replay_through_executor(self, tmp_path):
+        """Test that captured traffic is replayed and measured."""
+        path = str(tmp_path / "traffic.capture")
+        executor = PythonExecutor(reverse, {**CONFIG, "capture": {"path": path}})
+        for number in range(5):
+            list(executor.execute(message("text", f"abc{number}")))
+        executor.recorder.close()
+        metrics = replay(read_capture(path), PythonExecutor(reverse, CONFIG), speed=0)
+        summary = metrics.summary()
+        assert summary["count"] == 5
+        assert summary["throughput"] > 0
+
+    @pytest.mark.filterwarnings("ignore::DeprecationWarning")
+    def test_replay_through_deployment(self):
+        """Test that every replayed message is measured across all hops."""
+        records = [(float(number), message(f"text.k{number}", "abc")) for number in range(6)]
+        with Dispatcher(CONFIGS, workers=2) as dispatcher:
+            metrics = replay_deployment(records, dispatcher, speed=100)
+        assert metrics.summary()["count"] == 6
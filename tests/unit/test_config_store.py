@@ -0,0 +1,105 @@
+import json
+import os
+import threading
+from unittest.mock import patch
+
+from openergo.config_store import ConfigStore, compile_schema, validate_config
+
+
+def write(path, content):
+    path.write_text(json.dumps(content))
+
+
+class TestSchema:
+    def test_valid_config(self):
+        """Test that a complete config has no errors."""
+        config = {"name": "reverser", "shell": {"procedure": "a.b"},
+                  "input": {"keys": ["text"], "bindings": ["{message.text}"]}}
+        assert validate_config(config, "") == []
+
+    def test_shell_command_sections(self):
+        """Test that the shell executor's settings are part of the schema."""
+        config = {"name": "echoer", "shell": {"language": "bash", "command": ["cat"], "mode": "resident",
+                                              "pool": 2, "timeout": 0.5}}
+        assert validate_config(config, "") == []
+        assert validate_config({"name": "echoer", "shell": {"command": 1, "pool": "2"}}, "") == [
+            "shell.command: expected str or list, got int", "shell.pool: expected int, got str"]
+
+    def test_reports_paths_of_errors(self):
+        """Test that errors name the offending field."""
+        errors = validate_config({"input": {"keys": ["text", 3]}}, "")
+        assert errors == ["name: is required", "input.keys.1: expected str, got int"]
+
+    def test_compile_custom_schema(self):
+        """Test that arbitrary schemas compile into validators."""
+        validate = compile_schema({"type": dict, "required": ["id"], "properties": {"id": {"type": int}}})
+        assert validate({"id": 1}, "") == []
+        assert validate({"id": "1"}, "") == ["id: expected int, got str"]
+
+
+class TestConfigStore:
+    def test_loads_single_and_list_configs(self, tmp_path):
+        """Test that files holding one config or a list of configs are loaded."""
+        write(tmp_path / "a.json", {"name": "a"})
+        os.makedirs(tmp_path / "nested")
+        write(tmp_path / "nested" / "b.json", [{"name": "b"}, {"name": "c"}])
+        assert [c["name"] for c in ConfigStore([str(tmp_path)]).configs()] == ["a", "b", "c"]
+
+    def test_invalid_configs_are_skipped(self, tmp_path):
+        """Test that invalid configs are reported and left out."""
+        write(tmp_path / "a.json", {"name": "a", "input": {"keys": "text"}})
+        (tmp_path / "b.json").write_text("{not json")
+        store = ConfigStore([str(tmp_path)])
+        assert store.configs() == []
+        assert set(store.errors) == {str(tmp_path / "a.json"), str(tmp_path / "b.json")}
+
+    def test_other_json_files_are_skipped_silently(self, tmp_path, capsys):
+        """Test that JSON files which are not configs are neither loaded nor reported."""
+        write(tmp_path / "a.json", {"name": "a"})
+        write(tmp_path / "fixture.json", {"text": "abc"})
+        write(tmp_path / "values.json", [1, 2, {"other": True}])
+        store = ConfigStore([str(tmp_path)])
+        assert [c["name"] for c in store.configs()] == ["a"]
+        assert store.errors == {}
+        assert capsys.readouterr().out == ""
+
+    def test_refresh_rereads_only_changed_files(self, tmp_path):
+        """Test that unchanged files are not parsed again."""
+        write(tmp_path / "a.json", {"name": "a"})
+        write(tmp_path / "b.json", {"name": "b"})
+        store = ConfigStore([str(tmp_path)])
+        store.refresh()
+        write(tmp_path / "b.json", {"name": "b", "version": "0.0.2"})
+        os.utime(tmp_path / "b.json", ns=(1, 1))
+        with patch("json.load", wraps=json.load) as mock_load:
+            assert store.refresh() == [str(tmp_path / "b.json")]
+            assert mock_load.call_count == 1
+        assert store.configs()[1]["version"] == "0.0.2"
+
+    def test_refresh_forgets_removed_files(self, tmp_path):
+        """Test that removed files drop their configs."""
+        write(tmp_path / "a.json", {"name": "a"})
+        store = ConfigStore([str(tmp_path)])
+        store.refresh()
+        os.remove(tmp_path / "a.json")
+        assert store.refresh() == [str(tmp_path / "a.json")]
+        assert store.configs() == []
+
+    def test_watch_reports_changes(self, tmp_path):
+        """Test that the watcher calls back with changed paths."""
+        write(tmp_path / "a.json", {"name": "a"})
+        store = ConfigStore([str(tmp_path)])
+        store.refresh()
+        changes = []
+        done = threading.Event()
+
+        def callback(changed):
+            changes.append(changed)
+            done.set()
+
+        watcher = store.watch(0.01, callback)
+        write(tmp_path / "b.json", {"name": "b"})
+        assert done.wait(5)
+        store.stop()
+        watcher.join(5)
+        assert changes[0] == [str(tmp_path / "b.json")]
@@ -0,0 +1,215 @@
+import time
+from collections import Counter
+
+import pytest
+
+from openergo import routing
+from openergo.dispatcher import Dispatcher, HashRing, Router
+from openergo.durable import DurableQueue
+from openergo.executor import ENCRYPTIONKEY
+from openergo.utility import Utility
+from tests.unit.helpers import component, message
+
+HERE = "tests.unit.test_dispatcher"
+
+
+def slow(string):
+    time.sleep(0.3)
+    return string
+
+
+def fail(string):
+    raise ValueError(f"cannot handle {string}")
+
+
+# Strings seen by `flaky` in this worker process.
+SEEN = set()
+
+
+def flaky(string):
+    if string not in SEEN:
+        SEEN.add(string)
+        raise RuntimeError(f"first attempt at {string}")
+    return string[::-1]
+
+
+CONFIGS = [
+    component("reverser", "tests.unit.helpers.reverse", "text", "reversed.?"),
+    component("uppercaser", "tests.unit.helpers.upper", "reversed"),
+]
+
+
+class TestHashRing:
+    def test_stable_and_balanced(self):
+        """Test that keys always map to the same node and spread over all nodes."""
+        ring = HashRing([0, 1, 2, 3])
+        keys = [f"key.{number}" for number in range(2000)]
+        assert [ring.node(key) for key in keys] == [ring.node(key) for key in keys]
+        counts = Counter(ring.node(key) for key in keys)
+        assert set(counts) == {0, 1, 2, 3}
+        assert min(counts.values()) > 250
+
+    def test_adding_a_node_moves_few_keys(self):
+        """Test that growing the ring only reassigns keys to the new node."""
+        before, after = HashRing([0, 1, 2]), HashRing([0, 1, 2, 3])
+        moved = [key for key in map(str, range(2000)) if before.node(key) != after.node(key)]
+        assert all(after.node(key) == 3 for key in moved)
+        assert len(moved) < 1000
+
+
+class TestRouter:
+    def test_consumers(self):
+        """Test that routing keys resolve to the components consuming them."""
+        router = Router(CONFIGS)
+        assert router.consumers("text.en") == ["reverser"]
+        assert router.consumers("en.reversed") == ["uppercaser"]
+        assert router.consumers("other") == []
+
+    def test_shell_commands_are_consumers(self):
+        """Test that components running a shell command are routed like Python ones."""
+        shell = {"name": "echoer", "shell": {"language": "bash", "command": "cat"}, "input": {"keys": ["text"]}}
+        router = Router([*CONFIGS, shell, {**shell, "name": "idle", "shell": {"language": "bash"}}])
+        assert router.consumers("text") == ["reverser", "echoer"]
+
+    def test_seal_encrypts_next_hop(self):
+        """Test that output envelopes become decryptable input messages."""
+        sealed = Router.seal({"routingkey": "reversed", "payload": "cba"})
+        assert isinstance(sealed["payload"]["encrypted"], str)
+        assert sealed["payload"]["value"] == "cba"
+        assert Utility.decrypt(sealed, "payload.encrypted", ENCRYPTIONKEY)["payload"]["encrypted"] == {}
+
+
+class TestDispatcher:
+    @pytest.mark.filterwarnings("ignore::DeprecationWarning")
+    def test_cascades_through_workers(self):
+        """Test that messages flow through every component across worker processes."""
+        with Dispatcher(CONFIGS, workers=2, window=2) as dispatcher:
+            results = list(dispatcher.dispatch(message(f"abc{number}", f"text.k{number}") for number in range(20)))
+        assert sorted(results) == sorted(f"abc{number}"[::-1].upper() for number in range(20))
+        assert dispatcher.errors == []
+
+    @pytest.mark.filterwarnings("ignore::DeprecationWarning")
+    def test_unrouted_messages_and_errors(self):
+        """Test that unconsumed messages pass through and failures are collected."""
+        configs = [component("failer", f"{HERE}.fail", "text")]
+        with Dispatcher(configs, workers=1) as dispatcher:
+            results = list(dispatcher.dispatch([message("abc"), {"routingkey": "other", "payload": {}}]))
+        assert results == [{"routingkey": "other", "payload": {}}]
+        assert dispatcher.errors == ["failer: cannot handle abc"]
+
+    @pytest.mark.filterwarnings("ignore::DeprecationWarning")
+    def test_shell_components_run_in_workers(self):
+        """Test that a shell command component is executed by the worker."""
+        configs = [{
+            "name": "echoer",
+            "shell": {"language": "bash", "command": ["bash", "-c", "read -r line; echo \"got $line\""],
+                      "mode": "oneshot"},
+            "input": {"keys": ["text"], "bindings": {"string": "{input.payload.text}"}},
+        }]
+        with Dispatcher(configs, workers=1) as dispatcher:
+            assert list(dispatcher.dispatch([message("abc")])) == ['got {"string": "abc"}']
+        assert dispatcher.errors == []
+
+    @pytest.mark.filterwarnings("ignore::DeprecationWarning")
+    def test_busy_worker_does_not_hold_up_others(self):
+        """Test that messages for a worker with window space are sent past those waiting for a busy one."""
+        ring = HashRing([0, 1])
+        busy, idle = (next(f"{name}.k{number}" for number in range(100)
+                           if ring.node(routing.normalize(f"{name}.k{number}")) == node)
+                      for name, node in (("slow", 0), ("text", 1)))
+        configs = [component("sleeper", f"{HERE}.slow", "slow"), component("reverser", "tests.unit.helpers.reverse")]
+        completed = []
+        with Dispatcher(configs, workers=2, window=2) as dispatcher:
+            messages = [message("a", busy), message("b", busy), message("c", busy), message("abc", idle)]
+            assert sorted(dispatcher.dispatch(messages, on_complete=completed.append)) == ["a", "b", "c", "cba"]
+        assert completed[0] == 3
+
+    @pytest.mark.filterwarnings("ignore::DeprecationWarning")
+    def test_journal_acknowledges_every_hop(self, tmp_path):
+        """Test that every routed message is journaled and acknowledged."""
+        with DurableQueue(str(tmp_path / "q.db")) as journal, \
+                Dispatcher(CONFIGS, workers=2, journal=journal) as dispatcher:
+            results = list(dispatcher.dispatch(message("abc", f"text.k{number}") for number in range(5)))
+            assert results == ["CBA"] * 5
+            assert journal.committed("dispatcher") == 10
+            assert list(journal.consume("dispatcher")) == []
+
+    @pytest.mark.filterwarnings("ignore::DeprecationWarning")
+    def test_retries_run_before_the_journal_acknowledges(self, tmp_path):
+        """Test that failed messages are retried by the worker and only acknowledged afterwards."""
+        retry = {"attempts": 3, "backoff": 0.05, "jitter": 0}
+        configs = [{**component("reverser", f"{HERE}.flaky", "text", "reversed.?"), "retry": retry}, CONFIGS[1]]
+        with DurableQueue(str(tmp_path / "q.db")) as journal, \
+                Dispatcher(configs, workers=2, journal=journal) as dispatcher:
+            results = list(dispatcher.dispatch(message(f"abc{number}", f"text.k{number}") for number in range(5)))
+            assert sorted(results) == sorted(f"abc{number}"[::-1].upper() for number in range(5))
+            assert dispatcher.errors == []
+            assert journal.committed("dispatcher") == 10
+
+    @pytest.mark.filterwarnings("ignore::DeprecationWarning")
+    def test_exhausted_retries_are_reported(self):
+        """Test that a message that keeps failing is dead-lettered and reported once."""
+        configs = [{**component("failer", f"{HERE}.fail", "text"), "retry": {"attempts": 2, "backoff": 0, "jitter": 0}}]
+        with Dispatcher(configs, workers=1) as dispatcher:
+            assert list(dispatcher.dispatch([message("abc")])) == []
+        assert dispatcher.errors == ["failer: dead-lettered after 2 attempts"]
+
+    @pytest.mark.filterwarnings("ignore::DeprecationWarning")
+    def test_open_windows_are_flushed_when_the_input_ends(self):
+        """Test that messages waiting in a window at the end of the input still produce results."""
+        configs = [{**component("joiner", "tests.unit.helpers.join"), "aggregate": {"count": 2}}]
+        with Dispatcher(configs, workers=1) as dispatcher:
+            assert list(dispatcher.dispatch(message(text) for text in "abc")) == ["a,b", "c"]
+
+    @pytest.mark.filterwarnings("ignore::DeprecationWarning")
+    def test_journal_holds_windowed_messages_until_emitted(self, tmp_path):
+        """Test that a message waiting in an open window is not acknowledged, and is redelivered."""
+        configs = [{**component("joiner", "tests.unit.helpers.join"), "aggregate": {"count": 2}}]
+
+        def interrupted():
+            yield from (message(text) for text in "abc")
+            time.sleep(0.3)
+            raise ValueError("interrupted")
+
+        path = str(tmp_path / "q.db")
+        with DurableQueue(path) as journal, Dispatcher(configs, workers=1, journal=journal) as dispatcher:
+            with pytest.raises(ValueError):
+                list(dispatcher.dispatch(interrupted()))
+            journal.sync()
+            assert journal.committed("dispatcher") == 2
+        with DurableQueue(path) as journal, Dispatcher(configs, workers=1, journal=journal) as dispatcher:
+            assert list(dispatcher.dispatch([])) == ["c"]
+            assert journal.committed("dispatcher") == 3
+
+    @pytest.mark.filterwarnings("ignore::DeprecationWarning")
+    def test_journal_redelivers_after_restart(self, tmp_path):
+        """Test that messages left unacknowledged are dispatched again."""
+        path = str(tmp_path / "q.db")
+        with DurableQueue(path) as journal:
+            journal.put(message("abc"))
+        with DurableQueue(path) as journal, Dispatcher(CONFIGS, workers=1, journal=journal) as dispatcher:
+            assert list(dispatcher.dispatch([])) == ["CBA"]
+
+    @pytest.mark.filterwarnings("ignore::DeprecationWarning")
+    def test_completion_covers_every_hop(self):
+        """Test that a message completes once, after its follow-ups were handled."""
+        completed = []
+        with Dispatcher(CONFIGS, workers=2) as dispatcher:
+            results = []
+            for result in dispatcher.dispatch(
+                    [message("abc", "text.a"), {"routingkey": "other", "payload": {}}, message("xyz", "text.b")],
+                    on_complete=completed.append):
+                results.append(result)
+        assert sorted(completed) == [0, 1, 2]
+        assert len(results) == 3
+
+    @pytest.mark.filterwarnings("ignore::DeprecationWarning")
+    def test_source_errors_propagate(self):
+        """Test that an exception raised by the input is raised by dispatch."""
+        def broken():
+            yield message("abc")
+            raise ValueError("bad input")
+
+        with Dispatcher(CONFIGS, workers=1) as dispatcher:
+            with pytest.raises(ValueError, match="bad input"):
+                list(dispatcher.dispatch(broken()))
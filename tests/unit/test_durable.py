@@ -0,0 +1,63 @@
+import threading
+
+from openergo.durable import DurableQueue
+from openergo.python_executor import PythonExecutor
+from tests.unit.helpers import message, reverse
+
+
+class TestDurableQueue:
+    def test_put_and_consume(self, tmp_path):
+        """Test that put messages are consumed in order with their offsets."""
+        with DurableQueue(str(tmp_path / "q.db")) as journal:
+            offsets = [journal.put({"routingkey": "a", "payload": {"n": n}}) for n in range(3)]
+            consumed = list(journal.consume("c"))
+        assert offsets == [1, 2, 3]
+        assert [(offset, msg["payload"]["n"]) for offset, msg in consumed] == [(1, 0), (2, 1), (3, 2)]
+
+    def test_group_commit(self, tmp_path):
+        """Test that concurrent producers share commits."""
+        with DurableQueue(str(tmp_path / "q.db"), linger=0.05) as journal:
+            def produce():
+                for n in range(50):
+                    journal.put({"routingkey": "a", "payload": {"n": n}})
+
+            threads = [threading.Thread(target=produce) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            journal.sync()
+            assert journal.commits < 200
+            assert len(list(journal.consume("c"))) == 200
+
+    def test_unacknowledged_messages_are_redelivered(self, tmp_path):
+        """Test at-least-once delivery across a restart."""
+        path = str(tmp_path / "q.db")
+        with DurableQueue(path) as journal:
+            for n in range(4):
+                journal.put({"routingkey": "a", "payload": {"n": n}})
+            journal.ack("c", 1)
+            journal.ack("c", 3)
+        with DurableQueue(path) as journal:
+            assert journal.committed("c") == 1
+            assert [offset for offset, _ in journal.consume("c")] == [2, 3, 4]
+            assert journal.put({"routingkey": "a", "payload": {}}) == 5
+
+    def test_compact_keeps_offsets_growing(self, tmp_path):
+        """Test that compaction drops consumed messages without reusing offsets."""
+        path = str(tmp_path / "q.db")
+        with DurableQueue(path) as journal:
+            for n in range(3):
+                journal.ack("c", journal.put({"routingkey": "a", "payload": {"n": n}}))
+            assert journal.compact() == 3
+        with DurableQueue(path) as journal:
+            assert list(journal.consume("c")) == []
+            assert journal.put({"routingkey": "a", "payload": {}}) == 4
+
+    def test_process_acknowledges_after_execute(self, tmp_path):
+        """Test that processed messages are not delivered again."""
+        executor = PythonExecutor(reverse, {"name": "r", "input": {"bindings": {"string": "{input.payload.text}"}}})
+        with DurableQueue(str(tmp_path / "q.db")) as journal:
+            journal.put(message("abc"))
+            assert journal.process("r", executor) == ["cba"]
+            assert journal.process("r", executor) == []
@@ -0,0 +1,394 @@
+import copy
+import time
+
+import pytest
+from openergo.executor import ENCRYPTIONKEY
+from openergo.python_executor import PythonExecutor
+from openergo.utility import Utility
+from tests.unit.helpers import reverse
+
+
+def message(routingkey, **payload):
+    """Build an input message carrying an (empty) encrypted section."""
+    data = {"routingkey": routingkey, "payload": {"encrypted": {}, **payload}}
+    return Utility.encrypt(data, "payload.encrypted", ENCRYPTIONKEY)
+
+
+def config(**sections):
+    return {
+        "name": "reverser",
+        "input": {"keys": ["text"], "bindings": {"string": "{input.payload.text}"}},
+        **sections,
+    }
+
+
+class TestOutputs:
+    def test_without_output_section_yields_raw_result(self):
+        """Test that configs without an output section yield the procedure result."""
+        executor = PythonExecutor(reverse, config())
+        assert list(executor.execute(message("text", text="abc"))) == ["cba"]
+
+    def test_derives_routing_key_per_output_key(self):
+        """Test that each output key yields an envelope with a derived routing key."""
+        executor = PythonExecutor(reverse, config(output={"keys": ["reversed.?", "done"]}))
+        results = list(executor.execute(message("text.en", text="abc")))
+        assert results == [
+            {"routingkey": "reversed.en", "payload": "cba"},
+            {"routingkey": "done", "payload": "cba"},
+        ]
+
+    def test_projects_only_bound_fields(self):
+        """Test that output bindings select what is shipped downstream."""
+        executor = PythonExecutor(reverse, config(output={
+            "keys": ["reversed.?"],
+            "bindings": {"text": "{output}", "original": "{input.payload.text}"},
+        }))
+        [result] = executor.execute(message("text", text="abc"))
+        assert result == {"routingkey": "reversed", "payload": {"text": "cba", "original": "abc"}}
+        assert "encrypted" not in str(result)
+
+
+class TestConfig:
+    def test_config_templates_are_resolved_at_construction(self):
+        """Test that config-only references are substituted once, up front."""
+        executor = PythonExecutor(reverse, config(
+            name="reverser",
+            output={"keys": ["{config.name}.?"]},
+        ))
+        assert executor.config["output"]["keys"] == ("reverser.?",)
+        assert executor.config["input"]["bindings"]["string"] == "{input.payload.text}"
+
+    def test_config_is_frozen(self):
+        """Test that the config cannot be mutated by per-message stages."""
+        executor = PythonExecutor(reverse, config())
+        with pytest.raises(TypeError):
+            executor.config["input"]["keys"] = []
+
+    def test_message_context_excludes_config(self):
+        """Test that the projected output never carries the config along."""
+        executor = PythonExecutor(reverse, config(output={"keys": ["reversed"], "bindings": "{output}"}))
+        [result] = executor.execute(message("text", text="abc"))
+        assert result == {"routingkey": "reversed", "payload": "cba"}
+
+
+class TestStreaming:
+    @staticmethod
+    def procedure(log):
+        def chars(string):
+            try:
+                for char in string:
+                    log.append(char)
+                    yield char
+            finally:
+                log.append("closed")
+        return chars
+
+    def test_results_are_produced_lazily(self):
+        """Test that the procedure only advances when the consumer asks."""
+        log = []
+        results = PythonExecutor(self.procedure(log), config()).execute(message("text", text="abc"))
+        assert next(results) == "a"
+        assert log == ["a"]
+
+    def test_close_stops_the_procedure(self):
+        """Test that closing the result stream closes the procedure generator."""
+        log = []
+        results = PythonExecutor(self.procedure(log), config()).execute(message("text", text="abc"))
+        next(results)
+        results.close()
+        assert log == ["a", "closed"]
+
+    def test_throw_reaches_the_procedure(self):
+        """Test that exceptions thrown by the consumer are raised inside the procedure."""
+        log = []
+        results = PythonExecutor(self.procedure(log), config()).execute(message("text", text="abc"))
+        next(results)
+        with pytest.raises(KeyError):
+            results.throw(KeyError("stop"))
+        assert log == ["a", "closed"]
+
+    def test_prefetch(self):
+        """Test that a prefetch depth yields the same results in order."""
+        log = []
+        executor = PythonExecutor(self.procedure(log), config(execution={"prefetch": 2}))
+        assert list(executor.execute(message("text", text="abc"))) == ["a", "b", "c"]
+        assert log == ["a", "b", "c", "closed"]
+
+
+class TestPipeline:
+    def test_results_keep_message_order(self):
+        """Test that pipelined execution yields results in message order."""
+        executor = PythonExecutor(reverse, config(execution={"pipeline": {"workers": 4, "queue": 3}}))
+        messages = [message("text", text=f"abc{i}") for i in range(10)]
+        assert list(executor.pipeline(messages)) == [f"{i}cba" for i in range(10)]
+
+    def test_procedure_calls_never_overlap(self):
+        """Test that the procedure is serialized while stages run concurrently."""
+        import time
+        active, overlaps = [], []
+
+        def slow(string):
+            active.append(string)
+            overlaps.append(len(active) > 1)
+            time.sleep(0.01)
+            active.remove(string)
+            return string
+
+        executor = PythonExecutor(slow, config(execution={"pipeline": {"workers": 4}}))
+        list(executor.pipeline(message("text", text=str(i)) for i in range(8)))
+        assert overlaps == [False] * 8
+
+
+class TestMemoization:
+    def test_repeated_messages_skip_the_procedure(self):
+        """Test that a cached result is replayed without calling the procedure."""
+        calls = []
+
+        def counted(string):
+            calls.append(string)
+            return string[::-1]
+
+        executor = PythonExecutor(counted, config(cache={"size": 8}))
+        assert list(executor.execute(message("text", text="abc"))) == ["cba"]
+        assert list(executor.execute(message("text", text="abc"))) == ["cba"]
+        assert calls == ["abc"]
+        assert executor.cache.metrics()["hits"] == 1
+
+    def test_procedures_sharing_a_directory_do_not_share_results(self, tmp_path):
+        """Test that the disk tier is namespaced per procedure."""
+        def upper(string):
+            return string.upper()
+
+        section = {"size": 8, "directory": str(tmp_path)}
+        assert list(PythonExecutor(reverse, config(cache=section)).execute(message("text", text="abc"))) == ["cba"]
+        assert list(PythonExecutor(upper, config(cache=section)).execute(message("text", text="abc"))) == ["ABC"]
+        again = PythonExecutor(reverse, config(cache=section))
+        assert list(again.execute(message("text", text="abc"))) == ["cba"]
+        assert again.cache.metrics()["disk_hits"] == 1
+
+    def test_without_cache_section_nothing_is_cached(self):
+        """Test that memoization is opt-in."""
+        assert PythonExecutor(reverse, config()).cache is None
+
+
+class TestTransport:
+    def test_binary_envelopes_in_and_out(self):
+        """Test that a binary executor accepts and produces envelopes."""
+        from openergo import wire
+        executor = PythonExecutor(reverse, config(
+            output={"keys": ["reversed.?"], "bindings": "{output}"},
+            wire={"format": "binary", "compression": True},
+        ))
+        [packed] = executor.execute(wire.pack(message("text.en", text="abc")))
+        assert wire.unpack(packed) == {"routingkey": "reversed.en", "payload": "cba"}
+
+    def test_binary_skips_dill_serialization(self):
+        """Test that binary mode hands objects through without base64 encoding."""
+        from openergo import wire
+        executor = PythonExecutor(lambda string: string.encode("utf-8"), config(wire={"format": "binary"}))
+        [packed] = executor.execute(wire.pack(message("text", text="abc")))
+        assert wire.unpack(packed) == {"routingkey": "", "payload": b"abc"}
+
+
+class TestRetries:
+    @staticmethod
+    def flaky(failures):
+        def procedure(string):
+            if failures and failures[0] > 0:
+                failures[0] -= 1
+                raise RuntimeError("flaky")
+            return string[::-1]
+        return procedure
+
+    def test_without_policy_errors_propagate(self):
+        """Test that configs without a retry section still raise."""
+        executor = PythonExecutor(self.flaky([1]), config())
+        with pytest.raises(RuntimeError):
+            list(executor.execute(message("text", text="abc")))
+
+    def test_failed_message_is_retried_later(self):
+        """Test that a failure yields nothing now and succeeds on retry."""
+        executor = PythonExecutor(self.flaky([1]), config(retry={"attempts": 3, "backoff": 0, "jitter": 0}))
+        assert list(executor.execute(message("text", text="abc"))) == []
+        assert executor.retry.pending() == 1
+        assert list(executor.drain_retries(wait=True)) == ["cba"]
+
+    def test_exhausted_message_is_dead_lettered(self):
+        """Test that the original envelope and error are kept after the last attempt."""
+        executor = PythonExecutor(self.flaky([5]), config(retry={"attempts": 2, "backoff": 0, "jitter": 0}))
+        original = message("text", text="abc")
+        list(executor.execute(copy.deepcopy(original)))
+        assert list(executor.drain_retries(wait=True)) == []
+        [letter] = executor.retry.dead
+        assert letter["envelope"] == original
+        assert letter["attempts"] == 2
+        assert "flaky" in letter["error"]
+
+    def test_healthy_messages_flow_while_failed_ones_wait(self):
+        """Test that pipelined execution continues past a failing message."""
+        executor = PythonExecutor(self.flaky([1]), config(retry={"attempts": 2, "backoff": 0.05, "jitter": 0}))
+        results = list(executor.pipeline(message("text", text=f"abc{i}") for i in range(3)))
+        assert sorted(results) == ["0cba", "1cba", "2cba"]
+        assert executor.retry.retried == 1
+
+
+class TestTransactions:
+    @staticmethod
+    def counting(calls):
+        def procedure(string):
+            calls.append(string)
+            return string[::-1]
+        return procedure
+
+    def test_duplicates_replay_stored_results(self):
+        """Test that a redelivered message is answered without running the procedure."""
+        calls = []
+        executor = PythonExecutor(self.counting(calls), config(
+            transactions={"key": "{input.payload.id}"}, output={"keys": ["reversed"]}))
+        first = list(executor.execute(message("text", text="abc", id=7)))
+        again = list(executor.execute(message("text", text="abc", id=7)))
+        other = list(executor.execute(message("text", text="abc", id=8)))
+        assert first == again == other == [{"routingkey": "reversed", "payload": "cba"}]
+        assert calls == ["abc", "abc"]
+
+    def test_default_key_is_the_whole_message(self):
+        """Test that without a template identical messages are duplicates."""
+        calls = []
+        executor = PythonExecutor(self.counting(calls), config(transactions={}))
+        list(executor.execute(message("text", text="abc")))
+        list(executor.execute(message("text", text="abd")))
+        list(executor.execute(message("text", text="abc")))
+        assert calls == ["abc", "abd"]
+
+    def test_results_survive_restarts(self, tmp_path):
+        """Test that recorded results are persisted to SQLite."""
+        section = {"key": "{input.payload.id}", "path": str(tmp_path / "tx.db")}
+        calls = []
+        with PythonExecutor(self.counting(calls), config(transactions=section)) as executor:
+            list(executor.execute(message("text", text="abc", id=1)))
+        executor = PythonExecutor(self.counting(calls), config(transactions=section))
+        assert list(executor.execute(message("text", text="abc", id=1))) == ["cba"]
+        assert calls == ["abc"]
+
+
+class TestCapture:
+    def test_messages_are_recorded_as_they_arrived(self, tmp_path):
+        """Test that captured messages are the original, still encrypted, inputs."""
+        from openergo.capture import read_capture
+        path = str(tmp_path / "traffic.capture")
+        executor = PythonExecutor(reverse, config(capture={"path": path}))
+        original = message("text", text="abc")
+        assert list(executor.execute(copy.deepcopy(original))) == ["cba"]
+        executor.recorder.close()
+        [(recorded, captured)] = list(read_capture(path))
+        assert captured == original
+        assert recorded > 0
+
+    def test_sampling_and_retries_are_not_recorded(self, tmp_path):
+        """Test that unsampled messages and retried attempts are skipped."""
+        executor = PythonExecutor(reverse, config(capture={"path": str(tmp_path / "a"), "sample": 0}))
+        list(executor.execute(message("text", text="abc")))
+        assert executor.recorder.recorded == 0
+        executor = PythonExecutor(reverse, config(capture={"path": str(tmp_path / "b")}))
+        list(executor.execute(message("text", text="abc"), 2))
+        assert executor.recorder.recorded == 0
+
+
+class TestVectorized:
+    @staticmethod
+    def reverse_all(string):
+        return [item[::-1] for item in string]
+
+    def test_execute_batch_calls_the_procedure_once(self):
+        """Test that a batch of messages is bound into one columnar call."""
+        calls = []
+
+        def reverse_all(string):
+            calls.append(list(string))
+            return [item[::-1] for item in string]
+
+        executor = PythonExecutor(reverse_all, config(
+            execution={"vectorized": {"size": 3, "linger": 5}}, output={"keys": ["reversed"]}))
+        results = executor.execute_batch([message("text", text=text) for text in ("abc", "def", "ghi")])
+        assert results == [[{"routingkey": "reversed", "payload": text}] for text in ("cba", "fed", "ihg")]
+        assert [sorted(call) for call in calls] == [["abc", "def", "ghi"]]
+
+    def test_pipeline_collates_messages(self):
+        """Test that pipelined messages are vectorized and keep their order."""
+        executor = PythonExecutor(self.reverse_all, config(execution={"vectorized": {"size": 8, "linger": 0.05}}))
+        results = list(executor.pipeline(message("text", text=f"abc{i}") for i in range(16)))
+        assert results == [f"abc{i}"[::-1] for i in range(16)]
+        assert executor.collator.batches < 16
+        assert executor.pipeline_workers == 8
+
+    def test_single_execute_still_works(self):
+        """Test that a lone message runs as a batch of one."""
+        executor = PythonExecutor(self.reverse_all, config(execution={"vectorized": {"linger": 0.001}}))
+        assert list(executor.execute(message("text", text="abc"))) == ["cba"]
+
+
+class TestAggregation:
+    @staticmethod
+    def concatenate(string_list, delimiter="\n"):
+        return delimiter.join(string_list)
+
+    def test_windows_reduce_many_messages_into_one_call(self):
+        """Test that messages are gathered per key and the closing one carries the result."""
+        executor = PythonExecutor(self.concatenate, {
+            "name": "concatenator",
+            "input": {"keys": ["text"], "bindings": {"string_list": "{input.payload.text}", "delimiter": ","}},
+            "output": {"keys": ["concatenated"]},
+            "aggregate": {"count": 2, "key": "{input.payload.user}", "columns": ["string_list"]},
+        })
+        results = [list(executor.execute(message("text", text=text, user=user)))
+                   for text, user in [("a", 1), ("b", 2), ("c", 1), ("d", 1)]]
+        assert results == [[], [], [{"routingkey": "concatenated", "payload": "a,c"}], []]
+        assert sorted(executor.flush_windows()) == ["b", "d"]
+
+    def test_expired_windows_keep_their_own_routing(self):
+        """Test that a window closed by another key's message is routed and substituted as its own."""
+        executor = PythonExecutor(self.concatenate, {
+            "name": "concatenator",
+            "input": {"keys": ["text"], "bindings": {"string_list": "{input.payload.text}"}},
+            "output": {"keys": ["concatenated.?"], "bindings": "{output} by {input.payload.user}"},
+            "aggregate": {"seconds": 0.05, "key": "{input.payload.user}"},
+        })
+        assert list(executor.execute(message("text.alice", text="a", user="alice"))) == []
+        time.sleep(0.1)
+        assert list(executor.execute(message("text.bob", text="b", user="bob"))) == [
+            {"routingkey": "concatenated.alice", "payload": "a by alice"}]
+
+    def test_flush_windows(self):
+        """Test that open windows are handed to the procedure on flush."""
+        executor = PythonExecutor(self.concatenate, {
+            "name": "concatenator",
+            "input": {"keys": ["text"], "bindings": {"string_list": "{input.payload.text}"}},
+            "aggregate": {"count": 10},
+        })
+        for text in "abc":
+            assert list(executor.execute(message("text", text=text))) == []
+        assert list(executor.flush_windows()) == ["a\nb\nc"]
+        assert list(executor.flush_windows()) == []
+
+    def test_close_hands_open_windows_to_the_procedure(self):
+        """Test that windows still open when the executor is closed are not lost."""
+        calls = []
+        executor = PythonExecutor(lambda string_list: calls.append(string_list), {
+            "name": "collector",
+            "input": {"keys": ["text"], "bindings": {"string_list": "{input.payload.text}"}},
+            "aggregate": {"count": 10},
+        })
+        with executor:
+            for text in "ab":
+                list(executor.execute(message("text", text=text)))
+        assert calls == [["a", "b"]]
+
+    def test_pipeline_fills_windows_in_message_order(self):
+        """Test that aggregating configs pipeline on one worker, keeping message order."""
+        executor = PythonExecutor(self.concatenate, {
+            "name": "concatenator",
+            "input": {"keys": ["text"], "bindings": {"string_list": "{input.payload.text}"}},
+            "aggregate": {"count": 4},
+        })
+        assert executor.pipeline_workers == 1
+        assert list(executor.pipeline(message("text", text=str(i)) for i in range(8))) == ["0\n1\n2\n3", "4\n5\n6\n7"]
@@ -0,0 +1,46 @@
+import json
+import sys
+
+import pytest
+
+from openergo.bulk import run_bulk
+from openergo.forkserver import prewarmed_context, procedure_modules
+from tests.unit.helpers import message
+
+
+def loaded(module, results):
+    results.put(module in sys.modules)
+
+
+class TestForkserver:
+    def test_procedure_modules(self, tmp_path):
+        """Test that only Python procedures contribute modules."""
+        configs = [
+            {"name": "a", "shell": {"language": "python", "procedure": "pkg.mod.run"}},
+            {"name": "b", "shell": {"procedure": "pkg.mod.other"}},
+            {"name": "c", "shell": {"language": "bash", "command": "./c.sh"}},
+        ]
+        (tmp_path / "deploy.json").write_text(json.dumps(configs))
+        assert procedure_modules([str(tmp_path)]) == ["pkg.mod"]
+
+    @pytest.mark.filterwarnings("ignore::DeprecationWarning")
+    def test_workers_inherit_preloaded_modules(self):
+        """Test that processes forked from the template already hold the preloaded modules."""
+        context = prewarmed_context(modules=["colorsys"])
+        results = context.Queue()
+        process = context.Process(target=loaded, args=("colorsys", results))
+        process.start()
+        process.join()
+        assert results.get(timeout=5)
+
+    @pytest.mark.filterwarnings("ignore::DeprecationWarning")
+    def test_bulk_runs_on_prewarmed_workers(self, tmp_path):
+        """Test that bulk mode works with a prewarmed context."""
+        input_path = tmp_path / "in.ndjson"
+        input_path.write_text(json.dumps(message("abc")) + "\n")
+        config = {"name": "r", "input": {"bindings": {"string": "{input.payload.text}"}}}
+        context = prewarmed_context(modules=["tests.unit.helpers"])
+        processed = run_bulk("tests.unit.helpers.reverse", config, str(input_path),
+                             str(tmp_path / "out.ndjson"), workers=2, context=context)
+        assert processed == 1
+        assert (tmp_path / "out.ndjson").read_text() == '"cba"\n'
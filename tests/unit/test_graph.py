@@ -0,0 +1,58 @@
+import json
+from xml.etree import ElementTree
+
+from openergo.graph import Topology
+
+
+def component(name, input_keys, output_keys):
+    return {"name": name, "shell": {"procedure": f"{name}.main"},
+            "input": {"keys": input_keys}, "output": {"keys": output_keys}}
+
+
+CONFIGS = [
+    component("reverser", ["text"], ["reversed.?"]),
+    component("uppercaser", ["reversed"], ["upper"]),
+    component("echo", ["upper"], ["text"]),
+]
+
+
+class TestTopology:
+    def test_build_deduplicates_nodes(self):
+        """Test that each routing key and component appears exactly once."""
+        topology = Topology.build(CONFIGS + CONFIGS, ["text.en", "text.en"])
+        assert sorted(node_id for node_id in topology.nodes if node_id.startswith("component/")) == [
+            "component/echo", "component/reverser", "component/uppercaser"]
+        assert topology.adjacency["key/text"] == {"component/reverser"}
+        assert topology.adjacency["component/reverser"] == {"key/?.reversed"}
+        assert "key/en.reversed" in topology.adjacency["key/?.reversed"]
+
+    def test_build_terminates_on_cycles(self):
+        """Test that a cycle back to a seed key is linked but not expanded again."""
+        topology = Topology.build(CONFIGS, ["text"])
+        assert "key/text" in topology.adjacency["component/echo"]
+
+    def test_builds_are_independent(self):
+        """Test that nodes of one build do not leak into the next."""
+        Topology.build(CONFIGS, ["text.en"])
+        assert "key/en.text" not in Topology.build(CONFIGS, ["upper"]).nodes
+
+    def test_subgraph_limits_depth(self):
+        """Test that a subgraph keeps only nodes within the given hops."""
+        topology = Topology.build(CONFIGS, ["text.en"]).subgraph(["text.en"], depth=2)
+        assert set(topology.nodes) == {"key/en.text", "key/text", "component/reverser"}
+        assert topology.adjacency["component/reverser"] == set()
+
+    def test_exports(self, tmp_path):
+        """Test the JSON, GraphML and DOT writers."""
+        topology = Topology.build(CONFIGS, ["upper"])
+        topology.write(str(tmp_path / "g.json"), "json")
+        adjacency = json.loads((tmp_path / "g.json").read_text())["adjacency"]
+        assert adjacency["key/upper"] == ["component/echo"]
+
+        topology.write(str(tmp_path / "g.graphml"), "graphml")
+        root = ElementTree.parse(tmp_path / "g.graphml").getroot()
+        namespace = "{http://graphml.graphdrawing.org/xmlns}"
+        assert len(root.findall(f"{namespace}graph/{namespace}node")) == len(topology.nodes)
+
+        topology.write(str(tmp_path / "g.dot"), "dot")
+        assert '"key/upper" -> "component/echo"' in (tmp_path / "g.dot").read_text()
@@ -0,0 +1,43 @@
+import time
+
+from openergo.idempotency import IdempotencyStore
+
+
+class TestIdempotencyStore:
+    def test_memory_only(self):
+        """Test that a store without a path keeps results in its LRU."""
+        store = IdempotencyStore()
+        assert store.get("a") == (False, None)
+        store.put("a", [1, 2])
+        assert store.get("a") == (True, [1, 2])
+
+    def test_writes_are_batched(self, tmp_path):
+        """Test that puts are committed in batches."""
+        store = IdempotencyStore(str(tmp_path / "tx.db"), batch_size=10, linger=3600)
+        for number in range(25):
+            store.put(str(number), number)
+        assert store.commits == 2
+        store.close()
+        assert store.commits == 3
+
+    def test_pending_and_persisted_lookups(self, tmp_path):
+        """Test that uncommitted and evicted entries are still found."""
+        path = str(tmp_path / "tx.db")
+        store = IdempotencyStore(path, size=1, batch_size=100, linger=3600)
+        store.put("a", "first")
+        store.put("b", "second")
+        assert store.get("a") == (True, "first")
+        store.close()
+        assert IdempotencyStore(path).get("b") == (True, "second")
+
+    def test_lingering_batch_is_committed(self, tmp_path):
+        """Test that a batch that stops filling up is committed without another put."""
+        path = str(tmp_path / "tx.db")
+        store = IdempotencyStore(path, batch_size=100, linger=0.2)
+        store.put("a", "first")
+        assert store.commits == 0
+        deadline = time.monotonic() + 5
+        while store.commits == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert store.commits == 1
+        assert IdempotencyStore(path).get("a") == (True, "first")
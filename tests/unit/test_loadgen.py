@@ -0,0 +1,94 @@
+import itertools
+import random
+
+import pytest
+
+from openergo.capture import replay
+from openergo.executor import ENCRYPTIONKEY
+from openergo.loadgen import Distribution, MessageGenerator, arrivals, generate
+from openergo.python_executor import PythonExecutor
+from openergo.utility import Utility
+
+CONFIG = {
+    "name": "joiner",
+    "input": {
+        "keys": ["text.~skip"],
+        "bindings": {"string": "{input.payload.text}", "secret": "{input.payload.encrypted.token}",
+                     "whole": "{input.payload.meta}", "part": "{input.payload.meta.id}"},
+    },
+}
+
+
+def join(string, secret, whole, part):
+    return f"{string}:{secret}:{part}"
+
+
+class TestDistribution:
+    def test_parse_and_sample(self):
+        """Test that specs parse and samples stay within their bounds."""
+        rng = random.Random(1)
+        assert Distribution.parse("fixed:5").sample(rng) == 5
+        assert all(3 <= Distribution.parse("uniform:3:6").sample(rng) <= 6 for _ in range(100))
+        samples = [Distribution.parse("exponential:10").sample(rng) for _ in range(5000)]
+        assert 9 < sum(samples) / len(samples) < 11
+        with pytest.raises(ValueError):
+            Distribution.parse("uniform:3")
+        with pytest.raises(ValueError):
+            Distribution.parse("zipf:1")
+
+
+class TestMessageGenerator:
+    def test_messages_fit_the_config(self):
+        """Test that keys match the input keys and every bound path is filled."""
+        generator = MessageGenerator(CONFIG, strings=Distribution("fixed", 6), seed=3)
+        for _ in range(20):
+            message = generator.message()
+            assert message["routingkey"].split(".")[0] == "text"
+            assert "skip" not in message["routingkey"]
+            assert len(message["payload"]["text"]) == 6
+            assert len(message["payload"]["meta"]["id"]) == 6
+            decrypted = Utility.decrypt(message, "payload.encrypted", ENCRYPTIONKEY)
+            assert len(decrypted["payload"]["encrypted"]["token"]) == 6
+
+    def test_nesting(self):
+        """Test that values nest as deep and as wide as configured."""
+        generator = MessageGenerator(CONFIG, depth=Distribution("fixed", 2), lists=Distribution("fixed", 3), seed=1)
+        value = generator.value(2)
+        inner = list(value.values()) if isinstance(value, dict) else value
+        assert len(inner) == 3
+        assert all(len(item) == 3 for item in inner)
+
+    def test_seed_is_reproducible(self):
+        """Test that the same seed generates the same messages, keys aside from encryption."""
+        first = MessageGenerator(CONFIG, seed=9).message()
+        second = MessageGenerator(CONFIG, seed=9).message()
+        assert first["payload"]["text"] == second["payload"]["text"]
+        assert first["routingkey"] == second["routingkey"]
+
+    def test_config_without_keys(self):
+        """Test that configs without input keys are rejected."""
+        with pytest.raises(ValueError):
+            MessageGenerator({"name": "empty", "input": {"keys": []}})
+
+
+class TestSchedule:
+    def test_arrivals_are_open_loop(self):
+        """Test that send times follow the rate only."""
+        assert list(itertools.islice(arrivals(4), 3)) == [0, 0.25, 0.5]
+        gaps = list(itertools.islice(arrivals(100, poisson=True, rng=random.Random(2)), 5001))
+        assert 45 < gaps[-1] < 55
+
+    def test_generate_by_count_and_duration(self):
+        """Test that generation stops at the count or the duration."""
+        generator = MessageGenerator(CONFIG, seed=1)
+        assert len(list(generate(generator, 100, count=7))) == 7
+        assert len(list(generate(generator, 100, duration=0.5))) == 50
+        with pytest.raises(ValueError):
+            list(generate(generator, 100))
+
+    def test_generated_load_runs_through_executor(self):
+        """Test that generated messages are accepted by the executor they were made for."""
+        generator = MessageGenerator(CONFIG, seed=5)
+        metrics = replay(generate(generator, 500, count=25), PythonExecutor(join, CONFIG), concurrency=4)
+        assert metrics.summary()["count"] == 25
+        assert metrics.histogram.total == 25
@@ -0,0 +1,68 @@
+import random
+
+import pytest
+
+from openergo.metrics import Histogram, Metrics
+
+
+class TestHistogram:
+    def test_small_values_are_exact(self):
+        """Test that values within the first bucket keep full precision."""
+        histogram = Histogram()
+        for micros in range(1, 101):
+            histogram.record(micros / 1e6)
+        assert histogram.value_at(50) == pytest.approx(50e-6)
+        assert histogram.value_at(99) == pytest.approx(99e-6)
+        assert histogram.value_at(100) == pytest.approx(100e-6)
+        assert Histogram().value_at(50) == 0
+
+    def test_large_values_keep_significant_digits(self):
+        """Test that percentiles of wide-ranging values stay within the precision."""
+        random.seed(7)
+        values = sorted(random.lognormvariate(-6, 2) for _ in range(20000))
+        histogram = Histogram()
+        for value in values:
+            histogram.record(value)
+        for p in (50, 90, 99, 99.9):
+            exact = values[int(p / 100 * len(values)) - 1]
+            assert histogram.value_at(p) == pytest.approx(exact, rel=2e-3, abs=2e-6)
+        assert len(histogram.counts) < 30000
+
+    def test_merge(self):
+        """Test that merged histograms count both sides."""
+        first, second = Histogram(), Histogram()
+        first.record(0.001)
+        second.record(0.003, count=3)
+        first.merge(second)
+        assert first.total == 4
+        assert first.value_at(50) == pytest.approx(0.003)
+        assert first.minimum == 1000
+        with pytest.raises(ValueError):
+            first.merge(Histogram(digits=2))
+
+    def test_distribution_ends_at_the_maximum(self):
+        """Test that the percentile distribution is cumulative and complete."""
+        histogram = Histogram()
+        for micros in range(1, 1001):
+            histogram.record(micros / 1e6)
+        rows = histogram.distribution()
+        assert rows[0][1] == 0
+        assert rows[-1] == (pytest.approx(1000e-6), pytest.approx(100, abs=0.5), 1000)
+        assert [row[2] for row in rows] == sorted(row[2] for row in rows)
+        assert [row[1] for row in rows][:3] == [0, 10, 20]
+
+
+class TestMetrics:
+    def test_summary(self):
+        """Test that the summary holds count, throughput and latencies."""
+        metrics = Metrics()
+        metrics.start(now=10.0)
+        for latency in (0.001, 0.002, 0.003, 0.010):
+            metrics.record(latency)
+        metrics.stop(now=12.0)
+        summary = metrics.summary()
+        assert summary["count"] == 4
+        assert summary["throughput"] == 2.0
+        assert summary["p50"] == pytest.approx(0.002)
+        assert summary["max"] == pytest.approx(0.010)
+        assert Metrics.format(summary)[0] == "4 messages in 2.000s (2.0 msg/s)"
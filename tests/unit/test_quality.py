@@ -0,0 +1,70 @@
+import time
+
+import pytest
+
+from openergo import quality
+
+
+@pytest.fixture
+def tree(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "mod").mkdir()
+    (tmp_path / "mod" / "a.py").write_text("x = 1\n")
+    return tmp_path
+
+
+def steps(monkeypatch, formatters, analyzers):
+    monkeypatch.setattr(quality, "formatters", lambda mod: formatters)
+    monkeypatch.setattr(quality, "analyzers", lambda mod: analyzers)
+
+
+class TestTreeHash:
+    def test_hash_follows_content(self, tree):
+        """Test that the hash changes with file contents and ignores caches."""
+        before = quality.tree_hash(["mod"])
+        (tree / "mod" / "__pycache__").mkdir()
+        (tree / "mod" / "__pycache__" / "a.cpython-312.pyc").write_bytes(b"\0")
+        assert quality.tree_hash(["mod"]) == before
+        (tree / "mod" / "a.py").write_text("x = 2\n")
+        assert quality.tree_hash(["mod"]) != before
+
+
+class TestQualityCheck:
+    def test_analyzers_are_cached_until_the_tree_changes(self, tree, monkeypatch):
+        """Test that an unchanged tree replays results instead of rerunning the analyzers."""
+        steps(monkeypatch, [], [("echo run >> runs.log", "Counting")])
+        quality.quality_check("mod", cache_path="cache.json")
+        quality.quality_check("mod", cache_path="cache.json")
+        assert (tree / "runs.log").read_text().count("run") == 1
+        (tree / "mod" / "a.py").write_text("x = 3\n")
+        quality.quality_check("mod", cache_path="cache.json")
+        assert (tree / "runs.log").read_text().count("run") == 2
+
+    def test_analyzers_run_in_parallel(self, tree, monkeypatch):
+        """Test that analyzers overlap rather than run one after another."""
+        steps(monkeypatch, [], [("sleep 0.5", "A"), ("sleep 0.5", "B"), ("sleep 0.5", "C")])
+        start = time.monotonic()
+        quality.quality_check("mod", cache_path=None)
+        assert time.monotonic() - start < 1.2
+
+    def test_formatters_run_before_analyzers(self, tree, monkeypatch):
+        """Test that analyzers see the tree as the formatters left it."""
+        steps(monkeypatch, [("echo 'x = 9' > mod/a.py", "Format")], [("cat mod/a.py > seen.txt", "Read")])
+        quality.quality_check("mod", cache_path="cache.json")
+        assert (tree / "seen.txt").read_text() == "x = 9\n"
+
+    def test_failures_exit_after_all_analyzers(self, tree, monkeypatch, capsys):
+        """Test that fail_fast reports every analyzer before exiting with the first failure."""
+        steps(monkeypatch, [], [("exit 3", "Broken"), ("echo fine", "Fine")])
+        with pytest.raises(SystemExit) as raised:
+            quality.quality_check("mod", cache_path="cache.json")
+        assert raised.value.code == 3
+        assert "fine" in capsys.readouterr().out
+        with pytest.raises(SystemExit):
+            quality.quality_check("mod", cache_path="cache.json")
+
+    def test_without_fail_fast_failures_do_not_exit(self, tree, monkeypatch, capsys):
+        """Test that fail_fast=False only reports failures."""
+        steps(monkeypatch, [("exit 1", "Format")], [("exit 2", "Broken")])
+        quality.quality_check("mod", fail_fast=False, cache_path=None)
+        assert "Continuing." in capsys.readouterr().out
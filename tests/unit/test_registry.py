@@ -0,0 +1,50 @@
+import json
+import sys
+from unittest.mock import patch
+
+from openergo.registry import ProcedureRegistry
+
+
+def write_config(folder, name, procedure, language="python"):
+    config = {"name": name, "shell": {"language": language, "procedure": procedure}}
+    with open(folder / f"{name}.json", "w", encoding="utf-8") as stream:
+        json.dump(config, stream)
+
+
+class TestProcedureRegistry:
+    def test_resolve_imports_once(self):
+        """Test that a resolved procedure is reused while its module is loaded."""
+        registry = ProcedureRegistry()
+        first = registry.resolve("os.path.join")
+        with patch("importlib.import_module") as mock_import_module:
+            assert registry.resolve("os.path.join") is first
+            mock_import_module.assert_not_called()
+        assert "os.path.join" in registry.timings
+
+    def test_resolve_reimports_replaced_modules(self):
+        """Test that a module no longer in sys.modules is imported again."""
+        registry = ProcedureRegistry()
+        registry.resolve("json.dumps")
+        with patch.dict(sys.modules, {"json": None}), \
+             patch("importlib.import_module") as mock_import_module:
+            registry.resolve("json.dumps")
+            mock_import_module.assert_called_once_with("json")
+
+    def test_lazy_defers_import_until_first_call(self):
+        """Test that a lazy procedure is imported on first call only."""
+        registry = ProcedureRegistry()
+        procedure = registry.lazy("os.path.basename")
+        assert registry.timings == {}
+        assert procedure("/a/b") == "b"
+        assert "os.path.basename" in registry.timings
+
+    def test_preload_deploy_folder(self, tmp_path):
+        """Test that preload imports every Python procedure and collects failures."""
+        write_config(tmp_path, "joiner", "os.path.join")
+        write_config(tmp_path, "broken", "no.such.module")
+        write_config(tmp_path, "shell", "./script.sh", language="bash")
+        registry = ProcedureRegistry()
+        timings = registry.preload([str(tmp_path)], workers=2)
+        assert list(timings) == ["os.path.join"]
+        assert list(registry.errors) == ["no.such.module"]
+        assert registry.report()[0][0] == "os.path.join"
@@ -0,0 +1,130 @@
+import json
+import os
+import sys
+from unittest.mock import patch
+
+import pytest
+
+from openergo.dispatcher import Dispatcher
+from openergo.graph import load_configs
+from openergo.registry import ProcedureRegistry
+from openergo.reload import HotReloader
+from tests.unit.helpers import component, message
+
+
+def write_config(folder, name, procedure):
+    (folder / f"{name}.json").write_text(json.dumps(component(name, procedure)))
+
+
+def write_module(folder, module, body, mtime):
+    path = folder / f"{module}.py"
+    path.write_text(body)
+    os.utime(path, ns=(mtime, mtime))
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    """A deploy folder and a source folder holding the module `hot_reload_procedures`."""
+    deploy, src = tmp_path / "deploy", tmp_path / "src"
+    deploy.mkdir()
+    src.mkdir()
+    monkeypatch.syspath_prepend(str(src))
+    monkeypatch.setattr(sys, "dont_write_bytecode", True)
+    write_module(src, "hot_reload_procedures", "def shout(string):\n    return string.upper()\n", 10**18)
+    write_config(deploy, "shouter", "hot_reload_procedures.shout")
+    yield deploy, src
+    sys.modules.pop("hot_reload_procedures", None)
+
+
+class TestHotReloader:
+    def test_builds_executor_per_component(self, project):
+        """Test that every Python component gets an executor."""
+        deploy, _ = project
+        reloader = HotReloader([str(deploy)], registry=ProcedureRegistry())
+        assert reloader.names() == ["shouter"]
+        assert list(reloader.execute("shouter", message("abc"))) == ["ABC"]
+
+    def test_unchanged_tree_rebuilds_nothing(self, project):
+        """Test that a check without changes keeps the executors."""
+        deploy, _ = project
+        reloader = HotReloader([str(deploy)], registry=ProcedureRegistry())
+        executor = reloader.executor("shouter")
+        assert reloader.check() == []
+        assert reloader.executor("shouter") is executor
+
+    def test_reloads_changed_module(self, project):
+        """Test that editing a procedure module swaps in the new code."""
+        deploy, src = project
+        reloader = HotReloader([str(deploy)], registry=ProcedureRegistry())
+        write_module(src, "hot_reload_procedures", "def shout(string):\n    return string.upper() + '!'\n", 2 * 10**18)
+        assert reloader.check() == ["shouter"]
+        assert list(reloader.execute("shouter", message("abc"))) == ["ABC!"]
+
+    def test_reloads_changed_config_and_removes_deleted(self, project):
+        """Test that added, changed and deleted configs are picked up."""
+        deploy, src = project
+        reloader = HotReloader([str(deploy)], registry=ProcedureRegistry())
+        write_module(src, "hot_reload_procedures",
+                     "def shout(string):\n    return string.upper()\n\n\ndef whisper(string):\n    return string.lower()\n",
+                     2 * 10**18)
+        write_config(deploy, "whisperer", "hot_reload_procedures.whisper")
+        assert reloader.check() == ["shouter", "whisperer"]
+        os.remove(deploy / "shouter.json")
+        assert reloader.check() == ["shouter"]
+        assert reloader.names() == ["whisperer"]
+        assert list(reloader.execute("whisperer", message("ABC"))) == ["abc"]
+
+    def test_in_flight_messages_finish_on_old_executor(self, project):
+        """Test that a swap drains rather than interrupts running messages."""
+        deploy, src = project
+        reloader = HotReloader([str(deploy)], registry=ProcedureRegistry())
+        running = reloader.execute("shouter", message("abc"))
+        assert next(running) == "ABC"
+        write_module(src, "hot_reload_procedures", "def shout(string):\n    return string\n", 2 * 10**18)
+        reloader.check()
+        assert list(reloader.execute("shouter", message("abc"))) == ["abc"]
+        assert not reloader.drain(timeout=0)
+        running.close()
+        assert reloader.drain(timeout=0)
+
+    def test_retired_and_stopped_executors_are_closed(self, project):
+        """Test that drained and stopped executors commit and release what they hold."""
+        deploy, src = project
+        reloader = HotReloader([str(deploy)], registry=ProcedureRegistry())
+        old = reloader.executor("shouter")
+        write_module(src, "hot_reload_procedures", "def shout(string):\n    return string\n", 2 * 10**18)
+        reloader.check()
+        new = reloader.executor("shouter")
+        with patch.object(old, "close") as closed_old, patch.object(new, "close") as closed_new:
+            assert reloader.drain(timeout=0)
+            closed_old.assert_called_once_with()
+            reloader.stop()
+            closed_new.assert_called_once_with()
+        assert reloader.names() == []
+
+    def test_broken_module_keeps_old_executor(self, project):
+        """Test that a failing reload leaves the component running."""
+        deploy, src = project
+        reloader = HotReloader([str(deploy)], registry=ProcedureRegistry())
+        write_module(src, "hot_reload_procedures", "def shout(string)\n", 2 * 10**18)
+        assert reloader.check() == []
+        assert "hot_reload_procedures" in reloader.errors
+        assert list(reloader.execute("shouter", message("abc"))) == ["ABC"]
+
+
+class TestDispatcherReload:
+    @pytest.mark.filterwarnings("ignore::DeprecationWarning")
+    def test_workers_pick_up_changes(self, project):
+        """Test that a reloading dispatcher runs changed procedures and routes to added components."""
+        deploy, src = project
+        with Dispatcher(load_configs([str(deploy)]), workers=1, reload_folders=[str(deploy)],
+                        reload_interval=0) as dispatcher:
+            assert list(dispatcher.dispatch([message("abc")])) == ["ABC"]
+            write_module(src, "hot_reload_procedures",
+                         "def shout(string):\n    return string.upper() + '!'\n\n\n"
+                         "def whisper(string):\n    return string.lower()\n", 2 * 10**18)
+            (deploy / "whisperer.json").write_text(json.dumps(
+                component("whisperer", "hot_reload_procedures.whisper", "quiet")))
+            assert list(dispatcher.dispatch([message("abc")])) == ["ABC!"]
+            assert list(dispatcher.dispatch([message("ABC", "quiet")])) == ["abc"]
+        assert dispatcher.errors == []
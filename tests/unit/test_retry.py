@@ -0,0 +1,58 @@
+from openergo.durable import DurableQueue
+from openergo.retry import RetryPolicy, RetryScheduler, TimerWheel
+
+
+class TestTimerWheel:
+    def test_items_expire_when_due(self):
+        """Test that items come out at their tick and not before."""
+        wheel = TimerWheel(tick=1.0, slots=8)
+        start = wheel._current * 1.0
+        wheel.schedule(2.0, "a", now=start)
+        wheel.schedule(5.0, "b", now=start)
+        assert wheel.expire(start + 1) == []
+        assert wheel.expire(start + 2) == ["a"]
+        assert wheel.expire(start + 5) == ["b"]
+        assert len(wheel) == 0
+
+    def test_items_beyond_one_revolution(self):
+        """Test that items wait the right number of rounds."""
+        wheel = TimerWheel(tick=1.0, slots=4)
+        start = wheel._current * 1.0
+        wheel.schedule(10.0, "late", now=start)
+        wheel.schedule(2.0, "early", now=start)
+        for step in range(1, 10):
+            assert "late" not in wheel.expire(start + step)
+        assert wheel.expire(start + 10) == ["late"]
+
+    def test_long_pause_releases_everything_due(self):
+        """Test that skipping many revolutions expires exactly the due items."""
+        wheel = TimerWheel(tick=1.0, slots=4)
+        start = wheel._current * 1.0
+        for delay in (1, 6, 13, 40):
+            wheel.schedule(float(delay), delay, now=start)
+        assert sorted(wheel.expire(start + 20)) == [1, 6, 13]
+        assert wheel.expire(start + 40) == [40]
+
+
+class TestRetryPolicy:
+    def test_exponential_backoff_is_capped(self):
+        """Test the delay progression without jitter."""
+        policy = RetryPolicy(backoff=1, multiplier=2, max_backoff=5, jitter=0)
+        assert [policy.delay(attempt) for attempt in range(1, 5)] == [1, 2, 4, 5]
+
+    def test_jitter_stays_in_bounds(self):
+        """Test that jitter spreads delays by at most its fraction."""
+        policy = RetryPolicy(backoff=1, jitter=0.2)
+        assert all(0.8 <= policy.delay(1) <= 1.2 for _ in range(100))
+
+
+class TestRetryScheduler:
+    def test_dead_letters_go_to_durable_sink(self, tmp_path):
+        """Test that a configured dead-letter queue receives exhausted messages."""
+        scheduler = RetryScheduler.from_config({"attempts": 1, "deadletter": str(tmp_path / "dead.db")})
+        scheduler.fail({"routingkey": "a", "payload": b"\x00"}, 1, ValueError("bad"))
+        [(_, letter)] = scheduler.sink.consume("inspector")
+        scheduler.sink.close()
+        assert letter["envelope"] == {"routingkey": "a", "payload": b"\x00"}
+        assert letter["error"] == "ValueError('bad')"
+        assert scheduler.dead == []
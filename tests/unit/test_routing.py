@@ -0,0 +1,34 @@
+from openergo import routing
+from openergo.routing import RoutingKeyTemplate
+
+
+class TestRouting:
+    def test_matches_required_parts(self):
+        """Test that all required parts must be present in the routing key."""
+        assert routing.matches("text", "text.en")
+        assert routing.matches("text.en", "en.text")
+        assert not routing.matches("text.fr", "text.en")
+
+    def test_matches_negated_parts(self):
+        """Test that negated parts exclude routing keys containing them."""
+        assert routing.matches("text.~reversed", "text.en")
+        assert not routing.matches("text.~reversed", "text.reversed")
+
+    def test_match_returns_first_accepting_key(self):
+        """Test that match returns the first accepting input key or None."""
+        assert routing.match(["quoted", "text"], "text.en") == "text"
+        assert routing.match(["quoted"], "text.en") is None
+
+    def test_derive_replaces_placeholder_with_remainder(self):
+        """Test that `?` expands to the unconsumed parts of the routing key."""
+        assert routing.derive("text", "reversed.?", "text.en.uk") == "reversed.en.uk"
+
+    def test_derive_with_empty_remainder(self):
+        """Test that an empty remainder leaves no dangling separator."""
+        assert routing.derive("text", "reversed.?", "text") == "reversed"
+
+    def test_template_without_placeholder(self):
+        """Test that a literal output key is returned unchanged."""
+        template = RoutingKeyTemplate("done")
+        assert not template.is_derived
+        assert template.derive("text", "text.en") == "done"
@@ -22,32 +22,56 @@ class TestSpooler:
 
     def test_setup_project_structure(self, spooler):
         """Test that the project structure is correctly set up."""
-        with patch("shutil.copytree") as mock_copytree, \
-             patch("os.makedirs") as mock_makedirs, \
-             patch("builtins.open", mock_open()) as mock_file, \
-             patch("shutil.ignore_patterns") as mock_ignore_patterns:
-
-            # Simulate the ignore_patterns function returned by shutil
-            mock_ignore = MagicMock()
-            mock_ignore_patterns.return_value = mock_ignore
-
-            spooler.setup_project_structure()
-
-            # Assert directories were created
-            mock_makedirs.assert_any_call(spooler.spool_dir, exist_ok=True)
-            mock_makedirs.assert_any_call(spooler.project_spool_path, exist_ok=True)
-
-            # Capture the actual ignore_patterns function used
-            mock_copytree.assert_called_once_with(
-                spooler.folder_path,
-                spooler.package_dir,
-                ignore=mock_ignore,  # Ensure the mocked ignore_patterns function is used
-                dirs_exist_ok=True,
-            )
-
-            # Assert __init__.py was created
-            init_file = os.path.join(spooler.package_dir, "__init__.py")
-            mock_file.assert_called_once_with(init_file, "w", encoding="utf-8")
+        with open(os.path.join(spooler.folder_path, "__main__.py"), "w") as f:
+            f.write("print('hello')")
+        with open(os.path.join(spooler.folder_path, "README.md"), "w") as f:
+            f.write("ignored")
+
+        spooler.setup_project_structure()
+
+        assert os.path.isdir(spooler.spool_dir)
+        assert os.path.exists(os.path.join(spooler.package_dir, "__main__.py"))
+        assert not os.path.exists(os.path.join(spooler.package_dir, "README.md"))
+        # Assert __init__.py was created
+        assert os.path.exists(os.path.join(spooler.package_dir, "__init__.py"))
+
+    def test_setup_project_structure_copies_only_changed_files(self, spooler):
+        """Test that unchanged files are not copied again and removed files are dropped."""
+        for name in ("a.py", "b.py"):
+            with open(os.path.join(spooler.folder_path, name), "w") as f:
+                f.write(name)
+        spooler.spool()
+
+        with open(os.path.join(spooler.folder_path, "a.py"), "w") as f:
+            f.write("changed")
+        os.remove(os.path.join(spooler.folder_path, "b.py"))
+        with patch("shutil.copy2", wraps=shutil.copy2) as mock_copy:
+            spooler.spool()
+            assert [os.path.basename(c.args[0]) for c in mock_copy.call_args_list] == ["a.py"]
+        assert not os.path.exists(os.path.join(spooler.package_dir, "b.py"))
+
+    def test_spool_is_a_no_op_when_nothing_changed(self, spooler):
+        """Test that re-spooling unchanged sources skips all work."""
+        with open(os.path.join(spooler.folder_path, "a.py"), "w") as f:
+            f.write("a")
+        spooler.spool()
+        with patch.object(spooler, "setup_project_structure") as mock_setup_structure, \
+             patch.object(spooler, "create_setup_file") as mock_create_setup:
+            spooler.spool()
+            mock_setup_structure.assert_not_called()
+            mock_create_setup.assert_not_called()
+
+    def test_setup_file_not_regenerated_when_inputs_unchanged(self, spooler):
+        """Test that setup.py is only rewritten when its inputs change."""
+        with open(os.path.join(spooler.folder_path, "a.py"), "w") as f:
+            f.write("a")
+        spooler.spool()
+        with open(os.path.join(spooler.folder_path, "a.py"), "w") as f:
+            f.write("b")
+        with patch("builtins.open", wraps=open) as mock_file:
+            spooler.spool()
+            setup_file_path = os.path.join(spooler.project_spool_path, "setup.py")
+            assert call(setup_file_path, "w", encoding="utf-8") not in mock_file.call_args_list
 
     def test_load_requirements_with_existing_file(self, spooler, tmp_path):
         """Test loading requirements when a requirements.txt file exists."""
@@ -106,3 +130,41 @@ class TestSpooler:
             from openergo import spooler
             spooler.main()
             mock_spool.assert_called_once()
+
+
+class TestSpoolAll:
+    @pytest.fixture
+    def src_dir(self, tmp_path):
+        """Fixture to provide a src tree with two components and a non-component folder."""
+        for name, requirements in (("alpha", "pydash\ndill==0.3.8\n"), ("beta", "PyDash\ndill==0.3.8\nclick\n")):
+            os.makedirs(tmp_path / name)
+            (tmp_path / name / "__main__.py").write_text("def main():\n    pass\n")
+            (tmp_path / name / "requirements.txt").write_text(requirements)
+        os.makedirs(tmp_path / "assets")
+        (tmp_path / "assets" / "logo.txt").write_text("")
+        return tmp_path
+
+    def test_discover(self, src_dir):
+        """Test that only folders holding Python files are components."""
+        from openergo.spooler import discover
+        assert [os.path.basename(p) for p in discover(src_dir)] == ["alpha", "beta"]
+
+    def test_spool_all(self, src_dir):
+        """Test that every component is spooled and requirements are deduplicated."""
+        from openergo.spooler import spool_all
+        spoolers = spool_all(str(src_dir), workers=2)
+        assert [s.project_name for s in spoolers] == ["alpha", "beta"]
+        for name in ("alpha", "beta"):
+            assert os.path.exists(src_dir / ".spool" / name / "setup.py")
+        requirements = (src_dir / ".spool" / "requirements.txt").read_text().splitlines()
+        assert requirements == ["click", "dill==0.3.8", "pydash"]
+
+    def test_spool_all_builds_wheels(self, src_dir, tmp_path):
+        """Test that shared requirements are built once and projects without dependencies."""
+        from openergo.spooler import spool_all
+        wheelhouse = str(tmp_path / "wheels")
+        with patch("subprocess.run") as mock_run:
+            spool_all(str(src_dir), workers=2, wheelhouse=wheelhouse)
+        commands = [c.args[0] for c in mock_run.call_args_list]
+        assert sum("--requirement" in command for command in commands) == 1
+        assert sorted(os.path.basename(command[-1]) for command in commands if "--no-deps" in command) == ["alpha", "beta"]
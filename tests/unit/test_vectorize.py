@@ -0,0 +1,79 @@
+import threading
+
+import pytest
+
+from openergo.vectorize import Collator, collate, scatter
+
+
+class TestColumns:
+    def test_collate(self):
+        """Test that keyword arguments become one column per argument."""
+        columns = collate([{"a": "x", "b": True}, {"a": "y", "b": False}], arrays=False)
+        assert columns == {"a": ["x", "y"], "b": [True, False]}
+
+    def test_numeric_columns_become_arrays(self):
+        """Test that numbers are collated into NumPy arrays when NumPy is installed."""
+        numpy = pytest.importorskip("numpy")
+        columns = collate([{"n": 1, "s": "a"}, {"n": 2.5, "s": "b"}])
+        assert isinstance(columns["n"], numpy.ndarray)
+        assert columns["s"] == ["a", "b"]
+        assert scatter(columns["n"] * 2, 2) == [2.0, 5.0]
+
+    def test_scatter(self):
+        """Test that result columns split into per-message results."""
+        assert scatter(("a", "b"), 2) == ["a", "b"]
+        assert scatter({"x": [1, 2], "y": ["a", "b"]}, 2) == [{"x": 1, "y": "a"}, {"x": 2, "y": "b"}]
+        assert scatter((item for item in [1, 2]), 2) == [1, 2]
+        with pytest.raises(ValueError):
+            scatter([1], 2)
+        with pytest.raises(ValueError):
+            scatter("ab", 2)
+
+
+class TestCollator:
+    @staticmethod
+    def call_concurrently(collator, values, **kwargs):
+        results = [None] * len(values)
+        errors = []
+
+        def call(index):
+            try:
+                results[index] = collator(string=values[index], **kwargs)
+            except ValueError as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=call, args=(index,)) for index in range(len(values))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results, errors
+
+    def test_full_batches_run_once(self):
+        """Test that concurrent calls share one procedure call and get their own result."""
+        seen = []
+
+        def reverse(string):
+            seen.append(len(string))
+            return [item[::-1] for item in string]
+
+        collator = Collator(reverse, size=4, linger=5)
+        results, errors = self.call_concurrently(collator, ["ab", "cd", "ef", "gh"])
+        assert results == ["ba", "dc", "fe", "hg"]
+        assert errors == []
+        assert seen == [4]
+        assert collator.batches == 1
+
+    def test_partial_batch_runs_after_linger(self):
+        """Test that a lone call is not held longer than the linger."""
+        collator = Collator(lambda string: [item.upper() for item in string], size=64, linger=0.01)
+        assert collator(string="abc") == "ABC"
+        assert collator.calls == 1
+
+    def test_errors_reach_every_caller(self):
+        """Test that a failing batch fails each of its messages."""
+        def broken(string):
+            raise ValueError("no")
+
+        _, errors = self.call_concurrently(Collator(broken, size=3, linger=5), ["a", "b", "c"])
+        assert len(errors) == 3
@@ -0,0 +1,52 @@
+import io
+from datetime import datetime
+
+import pytest
+from cryptography.fernet import Fernet
+
+from openergo import wire
+
+
+class TestWire:
+    def test_round_trip(self):
+        """Test that a message survives packing and unpacking."""
+        message = {"routingkey": "text.en", "schema": "v1", "payload": {"text": "hello", "n": [1, 2.5, None]}}
+        assert wire.unpack(wire.pack(message)) == message
+
+    def test_binary_leaves_are_not_base64_encoded(self):
+        """Test that bytes travel as raw segments."""
+        blob = bytes(range(256)) * 4
+        packed = wire.pack({"routingkey": "blob", "payload": {"data": blob}})
+        assert blob in packed
+        assert len(packed) < len(blob) + 100
+        assert wire.unpack(packed)["payload"]["data"] == blob
+
+    def test_non_json_leaves_are_pickled(self):
+        """Test that values JSON cannot represent are restored as objects."""
+        moment = datetime(2024, 1, 2, 3, 4, 5)
+        assert wire.unpack(wire.pack({"payload": {"when": moment}}))["payload"]["when"] == moment
+
+    def test_compression_and_encryption(self):
+        """Test that flagged envelopes are compressed, encrypted and restored."""
+        key = Fernet.generate_key().decode("utf-8")
+        message = {"routingkey": "text", "payload": "x" * 10000}
+        packed = wire.pack(message, compress=True, encryptkey=key)
+        assert len(packed) < 1000
+        assert b"xxxx" not in packed
+        assert wire.unpack(packed, key) == message
+        with pytest.raises(ValueError, match="encrypted"):
+            wire.unpack(packed)
+
+    def test_rejects_foreign_data(self):
+        """Test that data without the envelope header is refused."""
+        assert not wire.is_envelope(b'{"payload": 1}')
+        with pytest.raises(ValueError):
+            wire.unpack(b"not an envelope at all")
+
+    def test_frames(self):
+        """Test that frames are read back as written."""
+        stream = io.BytesIO()
+        for frame in (b"one", b"", b"three"):
+            wire.write_frame(stream, frame)
+        stream.seek(0)
+        assert list(wire.read_frames(stream)) == [b"one", b"", b"three"]
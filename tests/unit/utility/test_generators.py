@@ -0,0 +1,69 @@
+import pytest
+from openergo.utility import Utility
+
+
+def counter(log, limit=5):
+    try:
+        for i in range(limit):
+            log.append(i)
+            yield i
+    finally:
+        log.append("closed")
+
+
+class TestRelay:
+    def test_transforms_lazily(self):
+        """Test that items are only pulled when the consumer asks for them."""
+        log = []
+        relay = Utility.relay(counter(log), lambda item: iter([item * 10]))
+        assert next(relay) == 0
+        assert log == [0]
+
+    def test_flat_maps_results(self):
+        """Test that a transform may yield zero or several results per item."""
+        relay = Utility.relay(counter([], 3), lambda item: iter([item] * item))
+        assert list(relay) == [1, 2, 2]
+
+    def test_close_propagates(self):
+        """Test that closing the relay closes the wrapped generator."""
+        log = []
+        relay = Utility.relay(counter(log), lambda item: iter([item]))
+        next(relay)
+        relay.close()
+        assert log == [0, "closed"]
+
+    def test_throw_propagates(self):
+        """Test that exceptions thrown into the relay reach the wrapped generator."""
+        def resilient():
+            try:
+                yield 1
+            except KeyError:
+                yield "recovered"
+
+        relay = Utility.relay(resilient(), lambda item: iter([item]))
+        next(relay)
+        assert relay.throw(KeyError()) == "recovered"
+
+
+class TestPrefetch:
+    def test_preserves_order(self):
+        """Test that prefetched items arrive in order."""
+        assert list(Utility.prefetch(counter([], 20), 4)) == list(range(20))
+
+    def test_reraises_producer_errors(self):
+        """Test that errors from the generator surface to the consumer."""
+        def failing():
+            yield 1
+            raise ValueError("boom")
+
+        with pytest.raises(ValueError, match="boom"):
+            list(Utility.prefetch(failing(), 2))
+
+    def test_close_stops_producer(self):
+        """Test that closing the prefetcher closes the wrapped generator."""
+        log = []
+        prefetcher = Utility.prefetch(counter(log, 1000), 2)
+        next(prefetcher)
+        prefetcher.close()
+        assert log[-1] == "closed"
+        assert len(log) < 1000
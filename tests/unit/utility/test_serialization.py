@@ -21,3 +21,8 @@ class TestSerialization:
         serialized = Utility.serialize(data)
         deserialized = Utility.deserialize(serialized)  # Call the static method from Utility
         assert deserialized == data
+
+    def test_deserialize_base64_looking_text(self):
+        """Test that plain text which happens to be valid base64 is passed through."""
+        text = "gJpwdShVuKNE25ru2iAz8hOUTX3Fgzob"
+        assert Utility.deserialize(text) == text
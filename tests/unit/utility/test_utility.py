@@ -52,3 +52,16 @@ class TestUtilities:
         assert Utility.safecast(str, 123) == "123"
         with pytest.raises(TypeError):
             Utility.safecast(tuple, "not a tuple")
+
+    def test_freeze(self):
+        """Test that freezing yields read-only, equal-looking structures."""
+        frozen = Utility.freeze({"a": {"b": [1, 2]}})
+        assert frozen["a"]["b"] == (1, 2)
+        with pytest.raises(TypeError):
+            frozen["a"]["c"] = 3
+
+    def test_fast_hash(self):
+        """Test that the fast hash is stable, prefixed and accepts bytes."""
+        result = Utility.fast_hash("hello", "hash")
+        assert result.startswith("hash_")
+        assert Utility.fast_hash(b"hello", "hash") == result